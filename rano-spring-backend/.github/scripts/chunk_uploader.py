@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+백엔드 업로드용 chunk 업로더
+- 페이지를 파싱하는 즉시 add_*() 로 넘기면 chunk_size 단위로 잘라서 바로 전송 (수집 완료를 기다리지 않음)
+- chunk 마다 gzip 압축 (Content-Encoding: gzip, 백엔드 GzipRequestFilter 가 해제)
+- 동시에 보내는 요청 수 제한 (max_in_flight)
+- chunk 단위 재시도: 백엔드 저장은 uq_vending_listing 기준 upsert/delete 라 같은 chunk 를 다시 보내도 안전
+
+delta 모드면 {upload_url}/delta 로 {"upserts": [...], "removals": [...]} 를,
+전체 모드면 {upload_url} 로 아이템 배열을 보낸다.
+"""
+import gzip
+import json
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor
+
+CHUNK_SIZE = 200        # 백엔드 MAX_UPLOAD_ITEMS(2000) 보다 충분히 작게
+MAX_IN_FLIGHT = 2
+MAX_RETRIES = 3
+RETRY_BACKOFF = 1.0     # 1s → 2s → 4s
+UPLOAD_TIMEOUT = 30
+
+
+class ChunkUploader:
+    """업로드 chunk 를 모아서 백그라운드 스레드로 전송"""
+
+    def __init__(self, upload_url, upload_key, server, delta=False,
+                 chunk_size=CHUNK_SIZE, max_in_flight=MAX_IN_FLIGHT):
+        self.url = f"{upload_url}/delta?server={server}" if delta else f"{upload_url}?server={server}"
+        self.delta = delta
+        self.chunk_size = chunk_size
+        self.headers = {
+            "Content-Type": "application/json",
+            "Content-Encoding": "gzip",
+            "X-API-KEY": upload_key
+        }
+        self.session = requests.Session()
+        self.executor = ThreadPoolExecutor(max_workers=max_in_flight)
+        self.futures = []
+        self.upserts = []
+        self.removals = []
+
+    def add_items(self, items):
+        """업로드할 아이템 추가 (chunk_size 가 차면 바로 전송)"""
+        self.upserts.extend(items)
+        while len(self.upserts) >= self.chunk_size:
+            chunk, self.upserts = self.upserts[:self.chunk_size], self.upserts[self.chunk_size:]
+            self._submit(chunk, [])
+
+    def add_removals(self, removals):
+        """사라진 목록 추가 (delta 모드 전용)"""
+        self.removals.extend(removals)
+        while len(self.removals) >= self.chunk_size:
+            chunk, self.removals = self.removals[:self.chunk_size], self.removals[self.chunk_size:]
+            self._submit([], chunk)
+
+    def _submit(self, upserts, removals):
+        self.futures.append(self.executor.submit(self._send, upserts, removals))
+
+    def _send(self, upserts, removals):
+        """chunk 1개 전송. 반환: (저장/삭제 건수, 에러 메시지 or None)"""
+        payload = {"upserts": upserts, "removals": removals} if self.delta else upserts
+        body = gzip.compress(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+
+        error = None
+        for attempt in range(MAX_RETRIES + 1):
+            if attempt:
+                time.sleep(RETRY_BACKOFF * (2 ** (attempt - 1)))
+            try:
+                resp = self.session.post(self.url, data=body, headers=self.headers, timeout=UPLOAD_TIMEOUT)
+            except requests.exceptions.RequestException as e:
+                error = str(e)
+                continue
+
+            if resp.status_code == 200:
+                # 200 이어도 프록시/에러 HTML 페이지일 수 있음 → 예외 대신 chunk 에러로 (state 저장까지 진행)
+                try:
+                    result = resp.json()
+                except ValueError:
+                    error = f"bad JSON: {resp.text[:100]}"
+                    print(f"[Upload] Chunk failed ({len(upserts)} upserts, {len(removals)} removals): {error}")
+                    return 0, error
+                return result.get("savedCount", 0) + result.get("removedCount", 0), None
+
+            error = f"HTTP {resp.status_code}: {resp.text[:200]}"
+            # 4xx (429 제외) 는 다시 보내도 같은 결과라 재시도하지 않음
+            if resp.status_code < 500 and resp.status_code != 429:
+                break
+
+        print(f"[Upload] Chunk failed ({len(upserts)} upserts, {len(removals)} removals): {error}")
+        return 0, error
+
+    def close(self):
+        """남은 버퍼 전송 후 모든 chunk 완료 대기. 반환: (총 건수, 실패한 chunk 에러 목록)"""
+        if self.upserts or self.removals:
+            self._submit(self.upserts, self.removals)
+            self.upserts, self.removals = [], []
+
+        saved = 0
+        errors = []
+        for future in self.futures:
+            count, error = future.result()
+            saved += count
+            if error:
+                errors.append(error)
+
+        self.executor.shutdown(wait=True)
+        self.session.close()
+        return saved, errors
@@ -2,8 +2,12 @@
 """
 Vending Data Collector for GitHub Actions
 - targets.json 기반 로테이션 수집
-- 순차 startPage 로테이션 (state 파일 기반)
+- 적응형 페이지 구간 스케줄링 (키워드별 페이지 수/변동률 기반, state 파일에 보관)
 - 429 발생 시 해당 target만 스킵
+- 서버별 worker 동시 실행 (서버마다 독립적인 요청 간격 + 429 circuit breaker)
+- 변경분(delta)만 업로드 (fingerprint 는 state 파일에 보관, --full-upload 로 전체 업로드)
+- 페이지 단위 gzip chunk 스트리밍 업로드 (chunk 별 재시도)
+- item_id 는 이미지 src 에서 추출, 없으면 item_index 파일로 이름 매칭 (백엔드는 이름 매칭 생략)
 """
 import os
 import sys
@@ -12,12 +16,23 @@ import time
 import random
 import argparse
 import datetime
+import threading
 import requests
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# 공용 수집 모듈(scripts/) 경로 추가
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+import gnjoy_client
+import gnjoy_cache
+from vending_parser import parse_vending_page, parse_total
+from item_index import load_item_index
+from listing_fingerprints import build_delta, commit_delta, pending_upserts
+from chunk_uploader import ChunkUploader
+from page_scheduler import plan_run, record_visit, ROWS_PER_PAGE
+
 # 공홈 URL 패턴
-GNJOY_BASE_URL = "https://ro.gnjoy.com/itemdeal/itemDealList.asp"
+GNJOY_BASE_URL = gnjoy_client.GNJOY_DEAL_URL
 
 # 서버 ID 매핑
 SERVER_IDS = {
@@ -26,12 +41,24 @@ SERVER_IDS = {
     "ifrit": "131"
 }
 
+# 요청 간격 (공홈 부하 방지): 페이지 사이 3~6초, 같은 서버의 target 사이 2초
+PAGE_DELAY_RANGE = (3, 6)
+TARGET_DELAY_SECONDS = 2
+
+# 서버별 연속 429 허용 횟수 (도달하면 해당 서버만 이번 run 에서 중단)
+MAX_CONSECUTIVE_429 = 3
+
+# 서버 worker 들이 같은 state dict 를 갱신하므로 잠금 사용
+STATE_LOCK = threading.Lock()
+
+# 이름 → item_id 인덱스 (scripts/item_index.tsv.gz, 처음 필요할 때 한 번 로드)
+_item_index = None
+_item_index_loaded = False
+_item_index_lock = threading.Lock()
+
 # 상태 파일 경로 (GitHub Actions cache로 유지)
 STATE_FILE = Path(__file__).parent / ".collector_state.json"
 
-# startPage 순환 설정
-PAGE_STEP = 3  # 3페이지씩 이동
-MAX_START_PAGE = 15  # startPage 최대값 (이후 1로 리셋)
 
 
 def load_state():
@@ -54,28 +81,6 @@ def save_state(state):
         print(f"[State] Save error: {e}")
 
 
-def get_next_start_page(state, target_key):
-    """
-    순차 startPage 반환 (1 → 4 → 7 → 10 → 13 → 1 ...)
-    """
-    targets_state = state.get("targets", {})
-    current = targets_state.get(target_key, {}).get("startPage", 1)
-    
-    # 다음 startPage 계산
-    next_page = current + PAGE_STEP
-    if next_page > MAX_START_PAGE:
-        next_page = 1
-    
-    # 상태 업데이트
-    if target_key not in targets_state:
-        targets_state[target_key] = {}
-    targets_state[target_key]["startPage"] = next_page
-    targets_state[target_key]["lastRun"] = datetime.datetime.now().isoformat()
-    state["targets"] = targets_state
-    
-    return current  # 현재 값 반환 (다음 run에서 next_page 사용)
-
-
 def load_targets():
     """targets.json 로드"""
     script_dir = Path(__file__).parent
@@ -91,6 +96,7 @@ def load_targets():
 def get_rotation_targets(targets, count=3):
     """
     시간 기반 deterministic 로테이션
+    (스케줄러에서 점수가 같은 target 끼리의 우선순위로 사용)
     """
     now = datetime.datetime.now()
     time_slot = (now.hour * 6) + (now.minute // 10)
@@ -104,71 +110,39 @@ def get_rotation_targets(targets, count=3):
     return selected, time_slot
 
 
-def parse_vending_page(html_content, server):
-    """공홈 HTML에서 노점 데이터 파싱"""
-    soup = BeautifulSoup(html_content, 'html.parser')
-    items = []
-    
-    table = soup.select_one('table.listTypeOfDefault.dealList')
-    if not table:
-        return items
-    
-    rows = table.select('tr')[1:]
-    
-    for row in rows:
-        cols = row.select('td')
-        if len(cols) < 5:
-            continue
-        
-        try:
-            item_elem = cols[1].select_one('a')
-            if not item_elem:
-                continue
-            
-            onclick = item_elem.get('onclick', '')
-            ssi = ""
-            map_id = ""
-            if 'popup_info' in onclick:
-                parts = onclick.split("'")
-                if len(parts) >= 4:
-                    ssi = parts[1]
-                    map_id = parts[3]
-            
-            img = cols[1].select_one('img')
-            if img and img.get('alt'):
-                item_name = img['alt']
+def get_item_index():
+    """공용 ItemIndex (파일이 없으면 None)"""
+    global _item_index, _item_index_loaded
+    with _item_index_lock:
+        if not _item_index_loaded:
+            _item_index = load_item_index()
+            _item_index_loaded = True
+            if _item_index is None:
+                print("[ItemIndex] index file not found - item_id from image src only")
             else:
-                item_name = cols[1].get_text(strip=True)
-            
-            qty_text = cols[2].get_text(strip=True).replace(',', '')
-            quantity = int(qty_text) if qty_text.isdigit() else 1
-            
-            price_text = cols[3].get_text(strip=True).replace(',', '').replace('z', '')
-            price = int(price_text) if price_text.isdigit() else 0
-            
-            vendor_info_elem = cols[4].select_one('a')
-            vendor_info = vendor_info_elem.get_text(strip=True) if vendor_info_elem else ""
-            
-            items.append({
-                "item_name": item_name,
-                "price": price,
-                "quantity": quantity,
-                "vendor_info": vendor_info,
-                "vendor_name": "",
-                "ssi": ssi,
-                "map_id": map_id,
-                "server_name": server
-            })
-            
-        except Exception as e:
-            print(f"[Parser] Error: {e}")
-            continue
-    
-    return items
+                print(f"[ItemIndex] Loaded {len(_item_index):,} names")
+        return _item_index
+
+
+def resolve_item_ids(items):
+    """이미지 src 로 못 채운 item_id 를 이름 인덱스로 채움. 반환: 인덱스로 채운 건수"""
+    index = get_item_index()
+    if index is None:
+        return 0
+    resolved = 0
+    with _item_index_lock:  # memo dict 를 서버 worker 들이 같이 씀
+        for item in items:
+            if item.get("item_id") is None:
+                item["item_id"] = index.resolve(item["item_name"])
+                resolved += item["item_id"] is not None
+    return resolved
 
 
 def fetch_page(server, keyword, page):
-    """공홈에서 페이지 데이터 수집"""
+    """
+    공홈에서 페이지 데이터 수집 (gnjoy_cache 조건부 요청)
+    반환: (response, error) - response.unchanged 면 지난번과 본문이 같은 페이지
+    """
     server_id = SERVER_IDS.get(server, "129")
     
     params = {
@@ -177,13 +151,9 @@ def fetch_page(server, keyword, page):
         "curpage": str(page)
     }
     
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-        "Accept-Language": "ko-KR,ko;q=0.9"
-    }
-    
     try:
-        resp = requests.get(GNJOY_BASE_URL, params=params, headers=headers, timeout=15)
+        # 공유 keep-alive 세션 + 디스크 응답 캐시 (ETag/Last-Modified 가 있으면 조건부 요청)
+        resp = gnjoy_cache.fetch(GNJOY_BASE_URL, params=params, timeout=15)
         
         if resp.status_code == 429:
             print(f"[Fetch] 429 Rate Limited on page {page}")
@@ -193,50 +163,36 @@ def fetch_page(server, keyword, page):
             print(f"[Fetch] HTTP {resp.status_code} on page {page}")
             return None, f"{resp.status_code}"
         
-        return resp.text, None
+        return resp, None
         
     except requests.exceptions.RequestException as e:
         print(f"[Fetch] Network error: {e}")
         return None, "network_error"
 
 
-def upload_to_server(items, server, upload_url, upload_key):
-    """Render 백엔드로 데이터 업로드"""
-    headers = {
-        "Content-Type": "application/json",
-        "X-API-KEY": upload_key
-    }
-    
-    try:
-        resp = requests.post(
-            f"{upload_url}?server={server}",
-            json=items,
-            headers=headers,
-            timeout=30
-        )
-        
-        if resp.status_code == 200:
-            result = resp.json()
-            return result.get("savedCount", 0), None
-        else:
-            return 0, f"HTTP {resp.status_code}: {resp.text[:200]}"
-            
-    except Exception as e:
-        return 0, str(e)
-
-
-def collect_and_upload(server, keyword, start_page, max_pages, upload_url, upload_key):
-    """수집 + 업로드. 반환: (saved_count, is_429)"""
+def collect_and_upload(server, keyword, start_page, max_pages, upload_url, upload_key, state=None):
+    """
+    수집 + 업로드. 반환: (saved_count, is_429, visit)
+    - 페이지를 파싱하는 즉시 ChunkUploader 로 넘겨서 수집과 업로드를 겹쳐서 진행
+    - state 를 넘기면 fingerprint 와 비교해서 변경분만 업로드 (incremental 모드)
+    - visit 은 page_scheduler.record_visit 에 넘길 수집 결과 요약
+    """
     end_page = start_page + max_pages - 1
     print(f"[Collector] {server}|{keyword} pages {start_page}~{end_page}")
     
+    target_key = f"{server}|{keyword}"
+    delta = state is not None
+    uploader = ChunkUploader(upload_url, upload_key, server, delta=delta)
+    
     all_items = []
     hit_429 = False
+    reached_end = False  # 마지막 페이지까지 확인했는지 (사라진 목록 판단용)
+    visit = {"pages": [], "total": None, "end_page": None, "changed": None, "observed": 0}
     
     for page in range(start_page, end_page + 1):
         print(f"[Collector] Fetching page {page}...")
         
-        html, error = fetch_page(server, keyword, page)
+        resp, error = fetch_page(server, keyword, page)
         
         if error == "429":
             print(f"[Collector] 429 on {server}|{keyword}, skipping this target")
@@ -247,29 +203,105 @@ def collect_and_upload(server, keyword, start_page, max_pages, upload_url, uploa
             print(f"[Collector] Error: {error}")
             break
         
-        items = parse_vending_page(html, server)
-        print(f"[Collector] Page {page}: {len(items)} items")
+        # 본문 해시가 지난번과 같으면 저장된 파싱 결과 사용 (파서 생략)
+        parsed = gnjoy_cache.parse(
+            resp,
+            lambda html: {
+                "items": parse_vending_page(html, server),
+                "total": parse_total(html) if page == 1 else None
+            },
+            f"vending:v2:{server}"  # v2: item_id 추가
+        )
+        items = parsed["items"]
+        resolve_item_ids(items)
+        print(f"[Collector] Page {page}: {len(items)} items" + (" (unchanged)" if resp.unchanged else ""))
+        
+        if page == 1:
+            visit["total"] = parsed["total"]
         
         if not items:
+            reached_end = True
+            visit["end_page"] = page - 1
             break
         
         all_items.extend(items)
+        visit["pages"].append(page)
+        
+        # 페이지 단위로 바로 업로드 버퍼에 추가 (delta 모드면 바뀐 목록만)
+        if delta:
+            with STATE_LOCK:
+                items = pending_upserts(state, target_key, server, items)
+        uploader.add_items(items)
+        
+        # 꽉 차지 않은 페이지가 마지막 → 다음 페이지(항상 빈 페이지)는 요청하지 않음
+        if len(parsed["items"]) < ROWS_PER_PAGE:
+            reached_end = True
+            visit["end_page"] = page
+            break
         
         if page < end_page:
-            delay = 3 + random.random() * 3
-            time.sleep(delay)
+            low, high = PAGE_DELAY_RANGE
+            time.sleep(low + random.random() * (high - low))
+    
+    visit["observed"] = len(all_items)
     
-    if not all_items:
-        return 0, hit_429
+    new_store = None
+    if delta and all_items:
+        with STATE_LOCK:
+            upserts, removals, new_store, changed = build_delta(state, target_key, server, all_items, start_page, reached_end)
+        visit["changed"] = changed
+        print(f"[Collector] Delta: {len(upserts)} upserts, {len(removals)} removals, "
+              f"{len(all_items) - len(upserts)} unchanged")
+        # upserts 는 페이지별로 이미 보냈으므로 사라진 목록만 추가
+        uploader.add_removals(removals)
     
-    saved, error = upload_to_server(all_items, server, upload_url, upload_key)
+    saved, errors = uploader.close()
     
-    if error:
-        print(f"[Collector] Upload error: {error}")
-        return 0, hit_429
+    if errors:
+        print(f"[Collector] Upload error: {len(errors)} chunk(s) failed - {errors[0]}")
+        return saved, hit_429, visit
     
-    print(f"[Collector] Uploaded: {saved} items")
-    return saved, hit_429
+    # 모든 chunk 업로드 성공 시에만 fingerprint 반영 (실패하면 다음 run 에서 다시 delta 로 잡힘)
+    if new_store is not None:
+        with STATE_LOCK:
+            commit_delta(state, target_key, new_store)
+    
+    print(f"[Collector] Uploaded: {saved} rows")
+    return saved, hit_429, visit
+
+
+def run_server_worker(server, plan, pages, upload_url, upload_key, state, delta_state):
+    """
+    한 서버의 target 들을 순차 수집 (서버마다 별도 스레드에서 실행)
+    - 페이지/타겟 간 딜레이는 서버 단위로만 적용 → 다른 서버 수집을 막지 않음
+    - 연속 429 가 MAX_CONSECUTIVE_429 회면 이 서버만 중단 (circuit open)
+    """
+    total_saved = 0
+    consecutive_429 = 0
+    
+    for i, (target, start_page) in enumerate(plan):
+        keyword = target.get("keyword", "천공")
+        target_key = f"{server}|{keyword}"
+        
+        saved, hit_429, visit = collect_and_upload(server, keyword, start_page, pages, upload_url, upload_key, delta_state)
+        with STATE_LOCK:
+            record_visit(state, target_key, visit)
+        total_saved += saved
+        
+        if hit_429:
+            consecutive_429 += 1
+            print(f"[Collector] {server} 429 count: {consecutive_429}/{MAX_CONSECUTIVE_429}")
+            if consecutive_429 >= MAX_CONSECUTIVE_429:
+                print(f"[Collector] {server}: {MAX_CONSECUTIVE_429} consecutive 429s, circuit open - stopping this server")
+                break
+        else:
+            consecutive_429 = 0  # 리셋
+        
+        # 타겟 간 딜레이 (같은 서버 안에서만)
+        if i < len(plan) - 1:
+            time.sleep(TARGET_DELAY_SECONDS)
+    
+    return total_saved
 
 
 def main():
@@ -278,6 +310,7 @@ def main():
     parser.add_argument('--keyword', default='', help='Search keyword (empty = use targets.json)')
     parser.add_argument('--pages', type=int, default=3, help='Max pages per target')
     parser.add_argument('--targets-count', type=int, default=3, help='Number of targets per run')
+    parser.add_argument('--full-upload', action='store_true', help='Upload every scraped row (disable delta mode)')
     args = parser.parse_args()
     
     upload_url = os.environ.get('UPLOAD_URL', 'https://rano.onrender.com/api/vending/upload')
@@ -292,43 +325,39 @@ def main():
     print(f"[State] Loaded: {len(state.get('targets', {}))} targets tracked")
     
     total_saved = 0
-    consecutive_429 = 0
+    delta_state = None if args.full_upload else state
     
     if args.keyword:
-        # 단일 키워드 수집
-        target_key = f"{args.server or 'baphomet'}|{args.keyword}"
-        start_page = get_next_start_page(state, target_key)
-        saved, hit_429 = collect_and_upload(args.server or 'baphomet', args.keyword, start_page, args.pages, upload_url, upload_key)
+        # 단일 키워드 수집 (해당 키워드 안에서 가장 낡은 구간 선택)
+        target = {"server": args.server or 'baphomet', "keyword": args.keyword}
+        [(_, start_page)] = plan_run(state, [target], 1, args.pages)
+        saved, hit_429, visit = collect_and_upload(target["server"], args.keyword, start_page, args.pages, upload_url, upload_key, delta_state)
+        record_visit(state, f"{target['server']}|{args.keyword}", visit)
         total_saved = saved
     else:
-        # targets.json 기반 로테이션 수집
+        # targets.json 전체 중 staleness 가 큰 구간 순으로 예산(targets-count 구간) 배정
         all_targets = load_targets()
-        selected, time_slot = get_rotation_targets(all_targets, args.targets_count)
+        ordered, time_slot = get_rotation_targets(all_targets, len(all_targets))
+        plan = plan_run(state, ordered, args.targets_count, args.pages)
         
-        print(f"[Collector] Time slot: {time_slot}, Targets: {len(selected)}")
+        # 서버별로 묶어서 서버마다 worker 하나씩 동시 실행
+        by_server = {}
+        for target, start_page in plan:
+            by_server.setdefault(target.get("server", "baphomet"), []).append((target, start_page))
         
-        for target in selected:
-            server = target.get("server", "baphomet")
-            keyword = target.get("keyword", "천공")
-            target_key = f"{server}|{keyword}"
-            
-            # 순차 startPage
-            start_page = get_next_start_page(state, target_key)
-            
-            saved, hit_429 = collect_and_upload(server, keyword, start_page, args.pages, upload_url, upload_key)
-            total_saved += saved
-            
-            if hit_429:
-                consecutive_429 += 1
-                print(f"[Collector] 429 count: {consecutive_429}/3")
-                if consecutive_429 >= 3:
-                    print("[Collector] 3 consecutive 429s, stopping")
-                    break
-            else:
-                consecutive_429 = 0  # 리셋
-            
-            # 타겟 간 딜레이
-            time.sleep(2)
+        print(f"[Collector] Time slot: {time_slot}, Targets: {len(plan)}, Servers: {list(by_server)}")
+        
+        with ThreadPoolExecutor(max_workers=len(by_server) or 1) as executor:
+            futures = [
+                executor.submit(run_server_worker, server, server_plan, args.pages,
+                                upload_url, upload_key, state, delta_state)
+                for server, server_plan in by_server.items()
+            ]
+            for future in futures:
+                total_saved += future.result()
+    
+    gnjoy_client.close_session()
+    gnjoy_cache.get_cache().prune()
     
     # 상태 저장
     save_state(state)
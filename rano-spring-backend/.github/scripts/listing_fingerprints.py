@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+노점 목록 변경 감지 (incremental 업로드용 fingerprint 저장소)
+- 키: (server, map_id, ssi, item_name, price) → 백엔드 uq_vending_listing 제약과 동일
+- target(server|keyword) 별로 마지막으로 업로드한 목록을 .collector_state.json 에 보관
+- 이번 수집 결과와 비교해서 delta 만 만든다
+    upserts : 신규 / 가격 변경 / 수량 변경 / 오래되어 scraped_at 갱신이 필요한 목록
+    removals: 사라진 목록 (가격 변경으로 이전 가격 키가 없어진 경우 포함)
+
+공홈 목록은 가격 오름차순이라, 이번 run 에서 수집한 페이지 구간의 가격 범위 안에 있는데
+보이지 않은 목록만 "사라짐" 으로 판단한다 (다른 페이지로 밀려난 목록을 지우지 않도록).
+"""
+import time
+import hashlib
+
+# 변경이 없어도 이 시간이 지나면 다시 업로드해서 백엔드 scraped_at 을 갱신
+REFRESH_SECONDS = 6 * 60 * 60
+
+# 한 target 당 보관하는 fingerprint 최대 개수 (오래 업로드 안 된 것부터 버림)
+MAX_FINGERPRINTS_PER_TARGET = 2000
+
+
+def listing_key(server, item):
+    """uq_vending_listing 과 같은 필드로 만든 짧은 fingerprint"""
+    raw = "\x1f".join([
+        server,
+        item.get("map_id", ""),
+        item.get("ssi", ""),
+        item.get("item_name", ""),
+        str(item.get("price", 0))
+    ])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def needs_upload(entry, item, now):
+    """저장된 fingerprint(entry) 기준으로 이 목록을 다시 보내야 하는지"""
+    # entry: [map_id, ssi, item_name, price, quantity, uploaded_at]
+    return (
+        entry is None
+        or entry[4] != item.get("quantity", 1)
+        or now - entry[5] >= REFRESH_SECONDS
+    )
+
+
+def pending_upserts(state, target_key, server, items, now=None):
+    """
+    페이지 단위 스트리밍용: 이 페이지에서 업로드가 필요한 목록만 반환
+    (state 는 읽기만 함, 최종 반영은 build_delta + commit_delta)
+    """
+    now = now or time.time()
+    store = state.get("fingerprints", {}).get(target_key, {})
+    return [item for item in items if needs_upload(store.get(listing_key(server, item)), item, now)]
+
+
+def _removal(entry):
+    map_id, ssi, item_name, price = entry[:4]
+    return {"map_id": map_id, "ssi": ssi, "item_name": item_name, "price": price}
+
+
+def build_delta(state, target_key, server, items, start_page, reached_end, now=None):
+    """
+    이번 수집 결과(items)로 delta 생성
+    반환: (upserts, removals, new_store, changed) - 업로드 성공 후 commit_delta(new_store) 로 반영
+      changed: 실제로 바뀐 목록 수 (신규/수량 변경/사라짐, 단순 scraped_at 갱신은 제외)
+    """
+    now = now or time.time()
+    store = state.get("fingerprints", {}).get(target_key, {})
+
+    upserts = []
+    seen = {}
+    changed = 0
+    for item in items:
+        fp = listing_key(server, item)
+        if fp in seen:
+            continue
+        entry = store.get(fp)
+        if not needs_upload(entry, item, now):
+            seen[fp] = entry
+        else:
+            if entry is None or entry[4] != item.get("quantity", 1):
+                changed += 1
+            upserts.append(item)
+            seen[fp] = [
+                item.get("map_id", ""), item.get("ssi", ""), item.get("item_name", ""),
+                item.get("price", 0), item.get("quantity", 1), now
+            ]
+
+    # 이번에 확인한 가격 구간 (첫 페이지부터면 하한 없음, 마지막 페이지까지 봤으면 상한 없음)
+    removals = []
+    new_store = {}
+    if items:
+        prices = [item.get("price", 0) for item in items]
+        low = float("-inf") if start_page <= 1 else min(prices)
+        high = float("inf") if reached_end else max(prices)
+    else:
+        # 아무것도 못 봤으면 판단 불가 → 삭제하지 않음
+        low = high = None
+
+    for fp, entry in store.items():
+        if fp in seen:
+            continue
+        if low is not None and low < entry[3] < high:
+            removals.append(_removal(entry))
+        else:
+            new_store[fp] = entry
+
+    new_store.update(seen)
+
+    # 크기 제한: 오래 업로드 안 된 fingerprint 부터 정리
+    if len(new_store) > MAX_FINGERPRINTS_PER_TARGET:
+        keep = sorted(new_store.items(), key=lambda kv: kv[1][5], reverse=True)
+        new_store = dict(keep[:MAX_FINGERPRINTS_PER_TARGET])
+
+    return upserts, removals, new_store, changed + len(removals)
+
+
+def commit_delta(state, target_key, new_store):
+    """업로드 성공 후 fingerprint 저장소 갱신"""
+    state.setdefault("fingerprints", {})[target_key] = new_store
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+적응형 페이지 구간 스케줄러 (collector 요청 예산 배분)
+- 고정 startPage 로테이션(1 → 4 → 7 ...) 대신, 키워드별 실제 페이지 수와 변동률(churn)을 보고
+  "지금 가장 낡았을 것 같은" 페이지 구간에 요청 예산을 우선 배정
+- 페이지 수: 1페이지의 '#searchResult strong' (검색결과 N건) / 마지막 페이지 도달 시 갱신
+- churn: 목록 1개가 1시간 동안 바뀔 확률 추정치 (delta 결과로 EWMA 갱신)
+- 페이지 staleness = min(1, churn × 마지막 방문 후 경과 시간), 한 번도 안 본 페이지는 1
+
+상태는 .collector_state.json 의 targets[server|keyword] 에 함께 저장된다.
+"""
+import math
+import time
+import datetime
+
+ROWS_PER_PAGE = 10
+
+# 처음 보는 target 의 churn (시간당 변경 비율) 초기값
+DEFAULT_CHURN = 0.5
+CHURN_ALPHA = 0.3      # EWMA 가중치 (새 관측값 비중)
+MIN_CHURN = 0.02
+MAX_CHURN = 4.0
+
+MAX_TOTAL_PAGES = 50   # 너무 큰 키워드도 앞쪽 50페이지까지만 스케줄링
+
+# 이 시간 이상 방문하지 않은 target 은 점수와 무관하게 우선 배정 (작은 키워드 기아 방지)
+STARVATION_HOURS = 12
+
+
+def target_state(state, target_key):
+    """target 상태 dict 반환 (없으면 생성)"""
+    return state.setdefault("targets", {}).setdefault(target_key, {})
+
+
+def page_staleness(tstate, page, now):
+    """해당 페이지가 마지막 방문 이후 바뀌었을 기대값 (0~1)"""
+    visited = tstate.get("pageVisits", {}).get(str(page))
+    if visited is None:
+        return 1.0
+    hours = max(0.0, now - visited) / 3600
+    return min(1.0, tstate.get("churn", DEFAULT_CHURN) * hours)
+
+
+def total_pages(tstate, default=1):
+    """알려진 전체 페이지 수 (모르면 default)"""
+    pages = tstate.get("totalPages") or default
+    return max(1, min(pages, MAX_TOTAL_PAGES))
+
+
+def best_window(tstate, pages_per_window, now):
+    """target 안에서 staleness 합이 가장 큰 연속 구간 (start_page, score)"""
+    # 페이지 수를 모르면 첫 구간이 꽉 차 있다고 가정 (처음 보는 target 이 밀리지 않도록)
+    last_page = total_pages(tstate, default=pages_per_window)
+    best = (1, -1.0)
+    for start in range(1, last_page + 1):
+        end = min(last_page, start + pages_per_window - 1)
+        score = sum(page_staleness(tstate, p, now) for p in range(start, end + 1))
+        if score > best[1]:
+            best = (start, score)
+
+    last_visit = tstate.get("lastVisitAt")
+    if last_visit is not None and now - last_visit > STARVATION_HOURS * 3600:
+        best = (best[0], best[1] + pages_per_window)
+    return best
+
+
+def plan_run(state, targets, budget, pages_per_window, now=None):
+    """
+    이번 run 에서 수집할 (target, start_page) 목록
+    - budget: 이번 run 에서 방문할 target 수 (요청 수 ≈ budget × pages_per_window, 기존과 동일)
+    - target 당 한 구간만 배정 (같은 키워드 연속 요청 방지)
+    - 점수가 같으면 targets 순서 유지 (호출부에서 시간 기반 로테이션 순서로 넘겨줌)
+    """
+    now = now or time.time()
+    scored = []
+    for order, target in enumerate(targets):
+        key = f"{target.get('server', 'baphomet')}|{target.get('keyword', '천공')}"
+        start, score = best_window(target_state(state, key), pages_per_window, now)
+        scored.append((-score, order, target, start))
+
+    scored.sort(key=lambda x: (x[0], x[1]))
+    return [(target, start) for _, _, target, start in scored[:budget]]
+
+
+def record_visit(state, target_key, visit, now=None):
+    """
+    수집 결과를 target 상태에 반영
+    visit: {pages, total, end_page, changed, observed}
+      pages    : 실제로 파싱한 페이지 번호 목록
+      total    : 1페이지의 검색결과 건수 (1페이지를 안 읽었으면 None)
+      end_page : 마지막 페이지를 확인했다면 그 번호 (빈 페이지면 직전 페이지)
+      changed  : delta 모드에서 바뀐 목록 수 (신규/가격·수량 변경/삭제), 모르면 None
+      observed : 이번에 본 목록 수
+    """
+    now = now or time.time()
+    tstate = target_state(state, target_key)
+    visits = tstate.setdefault("pageVisits", {})
+
+    # churn 갱신: 이번 구간의 이전 방문 시각 기준으로 시간당 변경 비율 계산
+    previous = [visits[str(p)] for p in visit.get("pages", []) if str(p) in visits]
+    changed = visit.get("changed")
+    observed = visit.get("observed") or 0
+    if changed is not None and observed > 0 and previous:
+        hours = max(now - min(previous), 60) / 3600
+        observed_churn = (changed / observed) / hours
+        churn = tstate.get("churn", DEFAULT_CHURN)
+        churn = (1 - CHURN_ALPHA) * churn + CHURN_ALPHA * observed_churn
+        tstate["churn"] = round(min(MAX_CHURN, max(MIN_CHURN, churn)), 4)
+
+    for page in visit.get("pages", []):
+        visits[str(page)] = now
+
+    # 전체 페이지 수 갱신
+    if visit.get("total") is not None:
+        tstate["totalPages"] = max(1, math.ceil(visit["total"] / ROWS_PER_PAGE))
+    elif visit.get("end_page") is not None:
+        tstate["totalPages"] = max(1, visit["end_page"])
+
+    # 범위를 벗어난 오래된 페이지 방문 기록 정리
+    last_page = total_pages(tstate)
+    for page in [p for p in visits if int(p) > last_page]:
+        del visits[page]
+
+    tstate["lastVisitAt"] = now
+    tstate["lastRun"] = datetime.datetime.now().isoformat()
@@ -0,0 +1,16 @@
+"""
+WSGI 진입점 (파일 이름에 '-' 가 있어서 python-crawler-server.py 를 직접 import 할 수 없음)
+
+    gunicorn -c gunicorn.conf.py crawler_wsgi:app
+"""
+import os
+import importlib.util
+
+_spec = importlib.util.spec_from_file_location(
+    "python_crawler_server",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "python-crawler-server.py")
+)
+_module = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_module)
+
+app = _module.app
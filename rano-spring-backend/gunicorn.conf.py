@@ -0,0 +1,29 @@
+"""
+python-crawler-server.py 운영 설정 (gunicorn)
+
+    gunicorn -c gunicorn.conf.py crawler_wsgi:app
+    python python-crawler-server.py --workers 4 --threads 8   # 같은 설정 + CLI 덮어쓰기
+
+- gthread 워커: 크롤링 완료를 기다리는 요청(최대 CRAWL_WAIT_SECONDS)이 스레드 하나만 잡고 있도록
+- preload_app: 스키마 생성(market_db.init_db, crawl_queue.init_db)은 master 에서 한 번만, 연결은 fork 전에 닫음
+- 응답 캐시는 워커 프로세스 단위, 크롤링 중복 제거는 crawl_jobs 테이블(UNIQUE 인덱스)로 프로세스 간 공통
+  (같은 검색어 동시 요청은 워커 수와 상관없이 크롤링 1번)
+"""
+import os
+
+bind = os.environ.get("CRAWLER_BIND", "0.0.0.0:5002")
+workers = int(os.environ.get("CRAWLER_WORKERS", 2))
+threads = int(os.environ.get("CRAWLER_THREADS", 8))
+worker_class = "gthread"
+
+# 크롤링 대기(60초) + 여유
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
+
+preload_app = True
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("LOG_LEVEL", "info").lower()
+access_log_format = '%(h)s "%(r)s" %(s)s %(b)s %(M)sms'
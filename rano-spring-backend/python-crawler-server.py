@@ -1,142 +1,222 @@
-import requests
-from bs4 import BeautifulSoup
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
-import sqlite3
-import time
+import os
 import sys
+import json
+import logging
+import argparse
+import runpy
+import queue
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+# 공용 수집 모듈(scripts/) 경로 추가
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+import gnjoy_cache
+import market_db
+from crawl_jobs import CrawlJobQueue, PRIORITY_USER, PRIORITY_BACKGROUND
+from swr_cache import SWRCache
+from gnjoy_client import GNJOY_DEAL_URL
+from gnjoy_fetcher import PageResult, fetch_pages
+from vending_parser import parse_deal_row_texts, parse_int, parse_total
+
+CRAWL_CONCURRENCY = 4  # 동시에 요청할 페이지 수 (실제 요청 속도는 svrID 별 token-bucket 이 제한)
+CRAWL_WORKERS = int(os.environ.get('CRAWL_WORKERS', 2))  # 동시에 실행하는 크롤링 작업 수 (검색어 단위)
+CRAWL_WAIT_SECONDS = 60  # 데이터가 없을 때 요청이 크롤링 완료를 기다리는 최대 시간
+DEAL_ROWS_PER_PAGE = 10  # 공홈 노점 목록 한 페이지 행 수 (짧은 페이지 = 마지막 페이지)
+
+# 로그: LOG_LEVEL 환경변수 (기본 INFO), 요청 단위 디버그 로그는 DEBUG
+LOG_FORMAT = '%(asctime)s %(levelname)s %(name)s [%(threadName)s] %(message)s'
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO').upper(), format=LOG_FORMAT)
+log = logging.getLogger('crawler')
 
 app = Flask(__name__)
 CORS(app)  # 모든 도메인 허용
 
-def crawl_item_internal(item_name, server='baphomet'):
-    """내부 크롤링 함수 (Requests + BeautifulSoup 사용)"""
-    print(f"\n{'='*50}")
-    print(f"Requests 크롤링 시작: {item_name}")
-    print(f"{'='*50}")
+# 스키마/WAL 설정은 시작 시 한 번만
+market_db.init_db()
+
+# /api/vending 응답 캐시 (soft TTL 지나면 기존 응답 + 백그라운드 갱신, 크롤링 완료 시 해당 검색어만 무효화)
+vending_cache = SWRCache()
+
+def invalidate_vending_cache(job):
+    """크롤링이 끝난 서버의 같은 검색어 응답과 전체 목록(검색어 없음) 응답만 무효화"""
+    if job is None:
+        return
+    vending_cache.invalidate(lambda key: key[0] == job['server'] and key[1] in (job['keyword'], ''))
+
+# 크롤링 작업 큐 (crawl_jobs 테이블): (server, 검색어) 중복 제거, 우선순위, 재시도
+# 같은 검색어 동시 요청은 작업 1개에 합류, 크롤링은 CRAWL_WORKERS 개 워커 스레드에서만 실행
+crawl_queue = CrawlJobQueue(
+    lambda item_name, server, on_page: crawl_item_internal(item_name, server, on_page),
+    workers=CRAWL_WORKERS,
+    on_finish=invalidate_vending_cache
+)
+crawl_queue.init_db()
+
+@app.before_request
+def start_crawl_workers():
+    # gunicorn preload 시 fork 이후 각 워커 프로세스에서 스레드 시작
+    crawl_queue.ensure_started()
+
+def request_crawl(item_name, server, on_page=None, priority=PRIORITY_USER):
+    """
+    크롤링 작업 등록 (같은 검색어 작업이 대기/실행 중이면 합류)
+    반환: (Future, 작업 dict) - Future 결과는 크롤링 결과 목록 (다른 프로세스가 실행했으면 None)
+    on_page 는 이 프로세스에서 실행될 때 페이지마다 호출됨
+    """
+    return crawl_queue.submit(server, item_name, priority=priority, on_page=on_page)
+
+def listing_dicts(item_name, server):
+    """DB 에 저장된 검색어 목록을 크롤링 결과와 같은 형태로 (다른 프로세스가 크롤링한 경우)"""
+    server_display = "바포메트" if server == "baphomet" else "이프리트"
+    rows = market_db.fetch_items(item=item_name, server_display=server_display, limit=10000)
+    return [
+        {
+            'vendor_name': row[4],
+            'server_name': row[0],
+            'coordinates': 'Unknown',
+            'item_name': row[1],
+            'quantity': row[2],
+            'price': row[3],
+            'vendor_info': row[4],
+            'category': 'Unknown',
+            'rarity': 'Common'
+        }
+        for row in rows if row[0] == server_display
+    ]
+
+def parse_deal_page(html):
+    """첫 페이지용: 행 + 검색 결과 전체 건수 (마지막 페이지 계산)"""
+    return {'rows': parse_deal_row_texts(html), 'total': parse_total(html)}
+
+def fetch_deal_page(item_name, svr_id, page):
+    """
+    공홈 노점 목록 한 페이지 요청 + 행 파싱 (gnjoy_fetcher 워커 스레드에서 실행)
+    1페이지는 전체 건수도 같이 돌려줌 (PageResult) → 나머지 페이지를 건수만큼만 요청
+    """
+    log.debug("page request: item=%s svr=%s page=%d", item_name, svr_id, page)
+    params = {
+        'itemFullName': item_name,
+        'curpage': page, # page -> curpage 로 수정
+        'svrID': svr_id,
+        'itemOrder': '',
+        'inclusion': ''
+    }
+    
+    # 공유 keep-alive 세션 + 디스크 응답 캐시 (기본 헤더/재시도는 gnjoy_client 에서 처리)
+    response = gnjoy_cache.fetch(GNJOY_DEAL_URL, params=params, timeout=5)
+    response.raise_for_status()
+    
+    log.debug("fetched url=%s not_modified=%s", response.url, response.not_modified)
+    
+    # 페이지 소스에서 데이터 추출 (lxml XPath 파서, 미설치 시 BeautifulSoup)
+    # 본문이 지난번과 같으면 저장된 파싱 결과를 그대로 사용
+    # 수량/가격은 '1,000z' 같은 표시 문자열이라 여기서 정수로 정규화
+    total = None
+    if page == 1:
+        parsed = gnjoy_cache.parse(response, parse_deal_page, 'deal_page')
+        row_texts, total = parsed['rows'], parsed['total']
+    else:
+        row_texts = gnjoy_cache.parse(response, parse_deal_row_texts, 'deal_rows')
+    rows = [
+        (server_text, item, parse_int(quantity, 1), parse_int(price, 0), shop_name)
+        for server_text, item, quantity, price, shop_name in row_texts
+    ]
+    log.debug("page %d: %d rows (total=%s)", page, len(rows), total)
+    return PageResult(rows, total) if page == 1 else rows
+
+def crawl_item_internal(item_name, server='baphomet', on_page=None):
+    """
+    내부 크롤링 함수 (Requests + BeautifulSoup 사용, 페이지 병렬 수집)
+    on_page(page, items): 페이지를 파싱하는 즉시 그 페이지의 신규 목록으로 호출 (스트리밍용)
+    """
+    log.info("crawl start: item=%s server=%s", item_name, server)
     
     all_results = []
     
     try:
-        base_url = "https://ro.gnjoy.com/itemdeal/itemDealList.asp"
         # server_display = "바포메트" if server == "baphomet" else "이프리트" # 이제 크롤링 결과에서 직접 가져옴
         svr_id = "129" if server == "baphomet" else "729" # 바포메트: 129, 이프리트: 729 (추정, HTML select 옵션 확인 필요)
         # HTML에서 확인한 값: 바포메트(129), 이프리트(729)
         
-        current_page = 1
         max_pages = 20  # 최대 20페이지로 증가
         seen_items = set()
+        failed_pages = []
         
-        while current_page <= max_pages:
+        def fetch(page):
             try:
-                print(f"\n페이지 {current_page} 요청 중...")
-                params = {
-                    'itemFullName': item_name,
-                    'curpage': current_page, # page -> curpage 로 수정
-                    'svrID': svr_id,
-                    'itemOrder': '',
-                    'inclusion': ''
-                }
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                }
-                
-                response = requests.get(base_url, params=params, headers=headers, timeout=5)
-                response.raise_for_status()
-                
-                print(f"Requesting URL: {response.url}")
-                print(f"Params: {params}")
-                
-                # 페이지 소스에서 데이터 추출
-                soup = BeautifulSoup(response.text, 'html.parser')
-                item_rows = soup.select('#divItemDealList > table > tbody > tr')
-                print(f"Found {len(item_rows)} rows")
-                
-                if not item_rows:
-                    print("더 이상 데이터 없음")
-                    break
-                
-                page_items = 0
-                duplicates = 0
-                
-                for row in item_rows:
-                    columns = row.select('td')
-                    if len(columns) >= 5:
-                        server_text = columns[0].get_text(strip=True) # 0번 인덱스가 서버명
-                        item = columns[1].get_text(strip=True)
-                        quantity = columns[2].get_text(strip=True)
-                        price = columns[3].get_text(strip=True)
-                        shop_name = columns[4].get_text(strip=True) # 4번 인덱스가 상점명(판매자)
-                        
-                        # 중복 체크
-                        item_key = f"{shop_name}|{item}|{price}"
-                        if item_key in seen_items:
-                            duplicates += 1
-                            continue
-                        
-                        seen_items.add(item_key)
-                        
-                        item_info = {
-                            'vendor_name': shop_name, # 상점명으로 수정
-                            'server_name': server_text, # 서버명으로 수정
-                            'coordinates': 'Unknown',
-                            'item_name': item,
-                            'quantity': quantity,
-                            'price': price,
-                            'vendor_info': shop_name,
-                            'category': 'Unknown',
-                            'rarity': 'Common'
-                        }
-                        all_results.append(item_info)
-                        page_items += 1
-                
-                print(f"페이지 {current_page}: {page_items}개 신규, {duplicates}개 중복 (총 {len(all_results)}개)")
-                
-                # 데이터가 없으면 종료
-                if page_items == 0 and duplicates == 0:
-                    break
-                
-                # 다음 페이지 확인 (간단히 행 개수로 판단하거나, 최대 페이지 도달 시 종료)
-                if current_page >= max_pages:
-                    print("최대 페이지 도달")
-                    break
+                return fetch_deal_page(item_name, svr_id, page)
+            except Exception:
+                failed_pages.append(page)
+                raise
+        
+        def handle_page(current_page, rows):
+            """페이지가 도착하는 대로 (페이지 순서) 중복 제거 후 결과에 추가, on_page 로 바로 전달"""
+            page_results = []
+            duplicates = 0
+            
+            for server_text, item, quantity, price, shop_name in rows:
+                # 중복 체크
+                item_key = f"{shop_name}|{item}|{price}"
+                if item_key in seen_items:
+                    duplicates += 1
+                    continue
                 
-                current_page += 1
-                time.sleep(0.5) # 너무 빠른 요청 방지
+                seen_items.add(item_key)
                 
-            except Exception as e:
-                print(f"페이지 {current_page} 크롤링 오류: {e}")
-                break
+                item_info = {
+                    'vendor_name': shop_name, # 상점명으로 수정
+                    'server_name': server_text, # 서버명으로 수정
+                    'coordinates': 'Unknown',
+                    'item_name': item,
+                    'quantity': quantity,
+                    'price': price,
+                    'vendor_info': shop_name,
+                    'category': 'Unknown',
+                    'rarity': 'Common'
+                }
+                page_results.append(item_info)
+            
+            all_results.extend(page_results)
+            log.debug("page %d: new=%d duplicates=%d total=%d", current_page, len(page_results), duplicates, len(all_results))
+            if on_page is not None:
+                on_page(current_page, page_results)
+        
+        # 1페이지로 전체 건수를 확인한 뒤 2..마지막 페이지를 동시에 요청 (svrID 별 rate limit 적용, 짧은/빈 페이지에서 중단)
+        # 1페이지부터 실패하면 예외 → 작업 큐에서 backoff 후 재시도
+        pages = fetch_pages(
+            fetch,
+            svr_id,
+            start_page=1,
+            max_pages=max_pages,
+            concurrency=CRAWL_CONCURRENCY,
+            on_page=handle_page,
+            page_size=DEAL_ROWS_PER_PAGE
+        )
         
-        # DB에 저장
-        if all_results:
-            conn = sqlite3.connect('ro_market.db')
-            cur = conn.cursor()
-            cur.execute('''
-                CREATE TABLE IF NOT EXISTS items (
-                    server TEXT, item_name TEXT, quantity TEXT, price TEXT, vendor_info TEXT
-                )
-            ''')
-            cur.execute("DELETE FROM items WHERE item_name LIKE ?", (f'%{item_name}%',))
-            for item in all_results:
-                cur.execute("INSERT INTO items VALUES (?, ?, ?, ?, ?)", (
-                    item['server_name'],
-                    item['item_name'],
-                    item['quantity'],
-                    item['price'],
-                    item['vendor_info']
-                ))
-            conn.commit()
-            conn.close()
-            print(f"\n최종: {len(all_results)}개 아이템 DB 저장 완료")
+        if failed_pages and not pages:
+            raise RuntimeError(f"page {min(failed_pages)} fetch failed")
+        
+        if len(pages) >= max_pages:
+            log.info("crawl reached max pages: item=%s max_pages=%d", item_name, max_pages)
+        
+        # DB에 저장 (writer 스레드에서 UPSERT 한 트랜잭션, 저장 중에도 조회는 기존 목록을 봄)
+        # 끝까지 수집한 경우에만 이번에 안 보인 목록 삭제 (최대 페이지 도달/오류로 중단되면 유지)
+        complete = not failed_pages and len(pages) < max_pages
+        server_display = "바포메트" if server == "baphomet" else "이프리트"
+        if all_results or complete:
+            saved, removed = market_db.submit_listings(item_name, server_display, [
+                (item['server_name'], item['item_name'], item['quantity'], item['price'], item['vendor_info'])
+                for item in all_results
+            ], complete=complete).result()
+            log.info("crawl saved: item=%s server=%s saved=%d removed=%d complete=%s",
+                     item_name, server, saved, removed, complete)
         
         return all_results
         
-    except Exception as e:
-        print(f"크롤링 오류: {e}")
-        import traceback
-        traceback.print_exc()
-        return []
+    except Exception:
+        log.exception("crawl failed: item=%s server=%s", item_name, server)
+        raise
 
 @app.route('/api/crawl', methods=['POST'])
 def crawl_item():
@@ -145,113 +225,287 @@ def crawl_item():
     item_name = data.get('item', '')
     server = data.get('server', 'baphomet')
     
-    results = crawl_item_internal(item_name, server)
+    future, _ = request_crawl(item_name, server)
+    try:
+        results = future.result()
+    except Exception as e:
+        return jsonify({'error': str(e)}), 502
+    if results is None:
+        results = listing_dicts(item_name, server)
     return jsonify(results)
 
+@app.route('/api/crawl/jobs', methods=['GET'])
+def get_crawl_jobs():
+    """크롤링 작업 상태 (?status=queued|running|done|failed, ?limit=)"""
+    status = request.args.get('status')
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+    return jsonify({
+        'counts': crawl_queue.counts(),
+        'jobs': crawl_queue.list_jobs(status=status, limit=limit)
+    })
+
+@app.route('/api/crawl/jobs/<int:job_id>', methods=['GET'])
+def get_crawl_job(job_id):
+    job = crawl_queue.get_job(job_id)
+    if job is None:
+        return jsonify({'error': 'job not found'}), 404
+    return jsonify(job)
+
+def stream_crawl_events(item_name, server):
+    """
+    크롤링 진행 이벤트 generator
+    {"type": "page", "page": n, "items": [...]} (페이지마다) → {"type": "done", "total": N}
+    같은 검색어 크롤링이 이미 진행 중이었거나 다른 프로세스가 실행했으면 끝난 뒤 전체 목록을 한 번에 보냄
+    """
+    events = queue.Queue()
+    
+    def on_page(page, items):
+        events.put({'type': 'page', 'page': page, 'items': items})
+    
+    future, job = request_crawl(item_name, server, on_page=on_page)
+    future.add_done_callback(lambda f: events.put(None))
+    try:
+        yield {'type': 'job', 'job': job}
+        
+        # 이미 실행 중인 작업에 합류했으면 앞 페이지를 놓쳤으므로 페이지 이벤트는 쓰지 않음
+        joined_running = job['status'] == 'running'
+        total = 0
+        while True:
+            event = events.get()
+            if event is None:
+                break
+            if not joined_running:
+                total += len(event['items'])
+                yield event
+        
+        try:
+            results = future.result()
+        except Exception as e:
+            yield {'type': 'error', 'message': str(e)}
+            return
+        if joined_running or (total == 0 and results is None):
+            results = results if results is not None else listing_dicts(item_name, server)
+            total = len(results)
+            yield {'type': 'page', 'page': None, 'items': results}
+        yield {'type': 'done', 'total': total}
+    finally:
+        # 클라이언트가 끊겨도 (GeneratorExit) 작업은 계속, 이 연결의 페이지 전달만 중단
+        crawl_queue.remove_listener(job['id'], on_page)
+
+@app.route('/api/crawl/stream', methods=['GET', 'POST'])
+def crawl_item_stream():
+    """
+    크롤링 스트리밍 API (페이지를 파싱하는 즉시 전송)
+    - GET ?item=&server= (EventSource) 또는 POST {"item", "server"}
+    - format=sse (기본, text/event-stream) / format=ndjson (application/x-ndjson)
+    """
+    data = request.get_json(silent=True) or {}
+    item_name = data.get('item') or request.args.get('item', '')
+    server = data.get('server') or request.args.get('server', 'baphomet')
+    fmt = request.args.get('format', data.get('format', 'sse'))
+    
+    if fmt == 'ndjson':
+        lines = (json.dumps(event, ensure_ascii=False) + '\n' for event in stream_crawl_events(item_name, server))
+        return Response(stream_with_context(lines), mimetype='application/x-ndjson')
+    
+    lines = (f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+             for event in stream_crawl_events(item_name, server))
+    return Response(stream_with_context(lines), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def load_vending_page(server, item, page, size, after=None, position=0, refresh=False,
+                      sort='name', min_price=None, max_price=None, allow_crawl=True):
+    """
+    /api/vending 응답 본문 생성 (DB 조회, 필요하면 크롤링)
+    - allow_crawl=False: DB 조회만 (응답 캐시의 백그라운드 갱신용, 크롤링으로 갱신 스레드를 막지 않음)
+    - sort / min_price / max_price 는 모두 SQL 에서 처리 (INTEGER price 인덱스)
+    - 데이터 없음: 크롤링 완료까지 대기 (같은 검색어 동시 요청은 한 크롤링에 합류)
+    - refresh: 백그라운드 크롤링만 걸고 기존 데이터로 바로 응답 (refreshTriggered)
+    """
+    server_display = "바포메트" if server == "baphomet" else "이프리트"
+    
+    # 아이템 검색 시 DB에 데이터가 없거나 refresh=true면 크롤링
+    refresh_triggered = False
+    if item and allow_crawl:
+        count = market_db.count_items(item=item)
+        
+        if count == 0 or refresh:
+            # 데이터가 없으면 사용자가 기다리는 작업, refresh 는 백그라운드 갱신
+            future, job = request_crawl(item, server,
+                                        priority=PRIORITY_USER if count == 0 else PRIORITY_BACKGROUND)
+            log.info("crawl job %d (%s): item=%s server=%s reason=%s", job['id'], job['status'],
+                     item, server, 'empty' if count == 0 else 'refresh')
+            
+            if count == 0:
+                try:
+                    future.result(timeout=CRAWL_WAIT_SECONDS)
+                except FutureTimeoutError:
+                    log.warning("crawl wait timed out, serving current rows: item=%s", item)
+                    refresh_triggered = True
+                except Exception as e:
+                    log.warning("crawl failed, serving current rows: item=%s error=%s", item, e)
+            else:
+                refresh_triggered = True
+    
+    # 전체 개수 조회 (데이터가 바뀌지 않았으면 캐시된 값)
+    total_count = market_db.count_items(item=item, server_display=server_display,
+                                        min_price=min_price, max_price=max_price)
+    total_pages = (total_count + size - 1) // size
+    
+    # 페이지네이션 데이터 조회 (다음 페이지 존재 여부 확인용으로 1개 더)
+    offset = position if after is not None else (page - 1) * size
+    rows = market_db.fetch_items(item=item, server_display=server_display,
+                                 limit=size + 1, after=after, offset=offset,
+                                 sort=sort, min_price=min_price, max_price=max_price)
+    has_next = len(rows) > size
+    rows = rows[:size]
+    next_cursor = market_db.encode_cursor(rows[-1], offset + len(rows), sort) if has_next else None
+    
+    results = []
+    for i, row in enumerate(rows):
+        item_info = {
+            'id': offset + i + 1,
+            'vendor_name': row[4] if len(row) > 4 else 'Unknown',
+            'server_name': row[0] if len(row) > 0 else server,
+            'coordinates': 'Unknown',
+            'item_name': row[1] if len(row) > 1 else 'Unknown',
+            'quantity': row[2] if len(row) > 2 else 1,
+            'price': row[3] if len(row) > 3 else 0,
+            'vendor_info': row[4] if len(row) > 4 else 'Unknown',
+            'category': 'Unknown',
+            'rarity': 'Common'
+        }
+        results.append(item_info)
+    
+    log.debug("vending page: item=%s total=%d page=%d/%d rows=%d", item, total_count, page, total_pages, len(results))
+    
+    return {
+        'data': results,
+        'pagination': {
+            'total': total_count,
+            'page': page,
+            'size': size,
+            'total_pages': total_pages,
+            'next_cursor': next_cursor
+        },
+        'refreshTriggered': refresh_triggered
+    }
+
 @app.route('/api/vending', methods=['GET'])
 def get_vending_data():
     server = request.args.get('server', 'baphomet')
     item = request.args.get('item', '')
     page = int(request.args.get('page', 1))
     size = int(request.args.get('size', 10))
-    print(f"DEBUG: Request received. Item: {item}, Refresh: {request.args.get('refresh')}")
-    sys.stdout.flush()
+    cursor = request.args.get('cursor')
+    sort = request.args.get('sort', 'name')
+    min_price = request.args.get('minPrice', type=int)
+    max_price = request.args.get('maxPrice', type=int)
     refresh = request.args.get('refresh', 'false').lower() == 'true'
-    print(f"DEBUG: Parsed refresh: {refresh}")
-    sys.stdout.flush()
+    log.debug("vending request: item=%s server=%s refresh=%s", item, server, refresh)
     
     # 유효성 검사
     if page < 1:
         page = 1
     if size < 1 or size > 100:
         size = 10
+    if sort not in market_db.SORT_COLUMNS:
+        sort = 'name'
+    
+    # 커서가 있으면 keyset 페이지네이션 (page 는 무시하고 커서 위치로 계산)
+    after = None
+    position = 0
+    if cursor:
+        try:
+            sort, after, position = market_db.decode_cursor(cursor)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        page = position // size + 1
     
     try:
-        conn = sqlite3.connect('ro_market.db')
-        cur = conn.cursor()
-        cur.execute('''
-            CREATE TABLE IF NOT EXISTS items (
-                server TEXT, item_name TEXT, quantity TEXT, price TEXT, vendor_info TEXT
+        # refresh 요청은 캐시를 거치지 않음 (크롤링을 걸어야 하므로)
+        if refresh:
+            body = json.dumps(load_vending_page(server, item, page, size, after, position, refresh=True,
+                                                sort=sort, min_price=min_price, max_price=max_price),
+                              ensure_ascii=False)
+        else:
+            body = vending_cache.get(
+                (server, item, page, size, cursor or '', sort, min_price, max_price),
+                lambda: json.dumps(load_vending_page(server, item, page, size, after, position,
+                                                     sort=sort, min_price=min_price, max_price=max_price),
+                                   ensure_ascii=False),
+                refresh_loader=lambda: json.dumps(load_vending_page(server, item, page, size, after, position,
+                                                                    sort=sort, min_price=min_price,
+                                                                    max_price=max_price, allow_crawl=False),
+                                                  ensure_ascii=False)
             )
-        ''')
+        return Response(body, mimetype='application/json')
         
-        # 아이템 검색 시 DB에 데이터가 없거나 refresh=true면 크롤링
-        if item:
-            cur.execute("SELECT COUNT(*) FROM items WHERE item_name LIKE ?", (f'%{item}%',))
-            count = cur.fetchone()[0]
+    except Exception as e:
+        log.exception("vending query failed: item=%s server=%s", item, server)
+        return jsonify({'data': [], 'pagination': {'total': 0, 'page': 1, 'size': size, 'total_pages': 0, 'next_cursor': None},
+                        'refreshTriggered': False})
+
+@app.route('/api/vending/cache/stats', methods=['GET'])
+def get_vending_cache_stats():
+    """응답 캐시 hit/miss 통계"""
+    return jsonify(vending_cache.snapshot())
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='RO 노점 크롤러 서버')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5002)
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('CRAWLER_WORKERS', 2)),
+                        help='프로세스 수 (gunicorn 에서만 사용)')
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('CRAWLER_THREADS', 8)),
+                        help='프로세스당 요청 처리 스레드 수')
+    parser.add_argument('--dev', action='store_true', help='Werkzeug 개발 서버 (debugger/reloader)')
+    return parser.parse_args(argv)
+
+def serve(args):
+    """
+    운영 서버 실행
+    - gunicorn 이 있으면 gunicorn.conf.py 설정 + --workers/--threads (gthread 워커)
+    - 없으면 (Windows 등) waitress, 그것도 없으면 Werkzeug threaded 모드 (debug 끔)
+    """
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        BaseApplication = None
+    
+    if BaseApplication is not None:
+        class CrawlerApplication(BaseApplication):
+            def load_config(self):
+                config_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gunicorn.conf.py')
+                for key, value in runpy.run_path(config_file).items():
+                    if key in self.cfg.settings and value is not None:
+                        self.cfg.set(key, value)
+                self.cfg.set('bind', f'{args.host}:{args.port}')
+                self.cfg.set('workers', args.workers)
+                self.cfg.set('threads', args.threads)
             
-            if count == 0 or refresh:
-                print(f"\n'{item}' 데이터가 없거나 새로고침 요청으로 크롤링 시작...")
-                conn.close()
-                
-                # 크롤링 실행
-                crawl_result = crawl_item_internal(item, server)
-                
-                # 다시 DB 연결
-                conn = sqlite3.connect('ro_market.db')
-                cur = conn.cursor()
-        
-        # 전체 개수 조회
-        if item:
-            cur.execute("SELECT COUNT(*) FROM items WHERE item_name LIKE ?", (f'%{item}%',))
-        else:
-            server_display = "바포메트" if server == "baphomet" else "이프리트"
-            cur.execute("SELECT COUNT(*) FROM items WHERE server = ?", (server_display,))
-        
-        total_count = cur.fetchone()[0]
-        total_pages = (total_count + size - 1) // size
-        
-        # 페이지네이션 데이터 조회
-        offset = (page - 1) * size
-        
-        if item:
-            cur.execute("SELECT * FROM items WHERE item_name LIKE ? LIMIT ? OFFSET ?", 
-                       (f'%{item}%', size, offset))
-        else:
-            server_display = "바포메트" if server == "baphomet" else "이프리트"
-            cur.execute("SELECT * FROM items WHERE server = ? LIMIT ? OFFSET ?", 
-                       (server_display, size, offset))
+            def load(self):
+                return app
         
-        rows = cur.fetchall()
-        conn.close()
-        
-        results = []
-        for i, row in enumerate(rows):
-            item_info = {
-                'id': offset + i + 1,
-                'vendor_name': row[4] if len(row) > 4 else 'Unknown',
-                'server_name': row[0] if len(row) > 0 else server,
-                'coordinates': 'Unknown',
-                'item_name': row[1] if len(row) > 1 else 'Unknown',
-                'quantity': row[2] if len(row) > 2 else '1',
-                'price': row[3] if len(row) > 3 else '0',
-                'vendor_info': row[4] if len(row) > 4 else 'Unknown',
-                'category': 'Unknown',
-                'rarity': 'Common'
-            }
-            results.append(item_info)
-        
-        response = {
-            'data': results,
-            'pagination': {
-                'total': total_count,
-                'page': page,
-                'size': size,
-                'total_pages': total_pages
-            }
-        }
-        
-        print(f"페이지네이션 응답: 전체 {total_count}개, {page}/{total_pages} 페이지, {len(results)}개 반환")
-        
-        return jsonify(response)
-        
-    except Exception as e:
-        print(f"DB 조회 오류: {e}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({'data': [], 'pagination': {'total': 0, 'page': 1, 'size': size, 'total_pages': 0}})
+        log.info("serving with gunicorn: workers=%d threads=%d", args.workers, args.threads)
+        CrawlerApplication().run()
+        return
+    
+    try:
+        from waitress import serve as waitress_serve
+    except ImportError:
+        log.warning("gunicorn/waitress not installed, using Werkzeug threaded server (single process)")
+        app.run(host=args.host, port=args.port, debug=False, threaded=True)
+        return
+    
+    log.info("serving with waitress: threads=%d (single process)", args.threads)
+    waitress_serve(app, host=args.host, port=args.port, threads=args.threads)
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5002, debug=True)
+    args = parse_args()
+    if args.dev:
+        app.run(host=args.host, port=args.port, debug=True)
+    else:
+        serve(args)
 
 
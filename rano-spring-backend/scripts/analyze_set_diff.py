@@ -7,6 +7,7 @@ import requests
 from bs4 import BeautifulSoup
 import urllib.parse
 import json
+import gnjoy_cache
 
 # Configuration
 SOURCE_URL = "https://ro.gnjoy.com/itemdeal/itemDealList.asp"
@@ -29,16 +30,10 @@ def crawl_source_page(page):
         "curpage": str(page)
     }
     
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-        "Referer": "https://ro.gnjoy.com/",
-        "Accept-Language": "ko-KR,ko;q=0.9"
-    }
-    
     full_url = SOURCE_URL + "?" + urllib.parse.urlencode(params)
     print(f"[SOURCE] Crawling: {full_url}")
     
-    response = requests.get(SOURCE_URL, params=params, headers=headers, timeout=15)
+    response = gnjoy_cache.fetch(SOURCE_URL, params=params, timeout=15)
     response.encoding = 'utf-8'
     
     soup = BeautifulSoup(response.text, 'html.parser')
@@ -12,6 +12,8 @@ import csv
 import re
 from datetime import datetime
 
+from iteminfo_lua import read_items
+
 DB_PATH = "ro_market.db"
 LUA_FILE = "scripts/extracted/iteminfo.lua"
 REMAINING_CSV = "scripts/remaining_items_verified.csv"
@@ -74,23 +76,6 @@ NAME_TEMPLATES = {
 DEFAULT_TEMPLATE = '시스템 아이템입니다.'
 DEFAULT_TEMPLATE_NO_NAME = '미확인 아이템입니다.'
 
-def decode_euckr_escape(text):
-    """Lua escape sequence를 EUC-KR로 디코딩"""
-    if not text:
-        return text
-    
-    def replace_escape(match):
-        byte_val = int(match.group(1))
-        return chr(byte_val)
-    
-    decoded = re.sub(r'\\(\d{1,3})', replace_escape, text)
-    
-    try:
-        byte_seq = decoded.encode('latin-1')
-        return byte_seq.decode('euc-kr', errors='replace')
-    except:
-        return decoded
-
 def load_remaining_items():
     """remaining_items_verified.csv에서 75건 item_id 로드"""
     items = []
@@ -105,49 +90,14 @@ def load_remaining_items():
             })
     return items
 
-def search_lua_for_description(item_id, lua_content):
-    """iteminfo.lua에서 특정 아이템의 설명 재추출 시도"""
-    # [item_id] = { ... } 블록 찾기
-    pattern = rf'\[{item_id}\]\s*=\s*\{{([^}}]+(?:\{{[^}}]*\}}[^}}]*)*)\}}'
-    match = re.search(pattern, lua_content, re.DOTALL)
-    
-    if not match:
-        return None
-    
-    block = match.group(1)
-    
-    # identifiedDescriptionName 추출
-    desc_start_match = re.search(r'identifiedDescriptionName\s*=\s*\{', block)
-    if not desc_start_match:
-        # unidentifiedDescriptionName 시도
-        desc_start_match = re.search(r'unidentifiedDescriptionName\s*=\s*\{', block)
-    
-    if not desc_start_match:
-        return None
-    
-    # 브레이스 매칭으로 설명 블록 추출
-    desc_start = desc_start_match.end()
-    brace_count = 1
-    desc_end = desc_start
-    
-    for j in range(desc_start, len(block)):
-        if block[j] == '{':
-            brace_count += 1
-        elif block[j] == '}':
-            brace_count -= 1
-            if brace_count == 0:
-                desc_end = j
-                break
-    
-    desc_block = block[desc_start:desc_end]
-    
-    # 문자열 추출
-    desc_lines = re.findall(r'"([^"]*)"', desc_block)
-    if not desc_lines:
+def search_lua_for_description(item_id, lua_items):
+    """iteminfo.lua 파싱 결과(read_items)에서 특정 아이템의 설명 재추출 시도"""
+    record = lua_items.get(item_id)
+    if record is None:
         return None
     
-    decoded_lines = [decode_euckr_escape(line) for line in desc_lines]
-    description = '\n'.join(decoded_lines)
+    # identifiedDescriptionName, 없으면 unidentifiedDescriptionName
+    description = record.description_text(fallback=True)
     
     # 빈 설명 체크
     if not description or not description.strip():
@@ -191,8 +141,7 @@ def main():
     
     # 2) Lua 파일 로드
     print(f"\n[2] Loading Lua file: {LUA_FILE}")
-    with open(LUA_FILE, 'r', encoding='utf-8', errors='ignore') as f:
-        lua_content = f.read()
+    lua_items, _ = read_items(LUA_FILE)
     
     # 3) DB 연결
     conn = sqlite3.connect(DB_PATH)
@@ -209,7 +158,7 @@ def main():
         name = item['name']
         
         # 1차: Lua에서 재추출 시도
-        lua_desc = search_lua_for_description(item_id, lua_content)
+        lua_desc = search_lua_for_description(item_id, lua_items)
         
         if lua_desc:
             if update_item_description(conn, item_id, lua_desc, 'LUA_REPARSE'):
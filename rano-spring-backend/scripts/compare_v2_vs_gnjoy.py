@@ -5,6 +5,7 @@ V2 검색 결과 vs 공홈 비교 분석
 import requests
 import json
 from bs4 import BeautifulSoup
+import gnjoy_cache
 
 # 1. V2 API 결과 가져오기
 print("=" * 60)
@@ -39,7 +40,7 @@ gnjoy_items = []
 # 여러 페이지 수집 시도 (1~10 페이지)
 for page in range(1, 11):
     try:
-        resp = requests.get(gnjoy_url, params={
+        resp = gnjoy_cache.fetch(gnjoy_url, params={
             'svrID': '1',  # baphomet
             'itemFullName': '천공',
             'curpage': str(page)
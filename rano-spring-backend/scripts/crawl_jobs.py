@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+크롤링 작업 큐 (ro_market.db 의 crawl_jobs 테이블)
+- (server, keyword) 당 대기/실행 중인 작업은 1개 (부분 UNIQUE 인덱스로 중복 제거)
+  이미 있으면 합류하고, 우선순위가 더 높으면 올린다
+- 우선순위: 사용자가 기다리는 크롤링(PRIORITY_USER) > 백그라운드 갱신(PRIORITY_BACKGROUND)
+- 워커 스레드 N개가 우선순위 → 등록 순으로 작업을 가져가서 실행 (BEGIN IMMEDIATE 로 원자적 claim)
+- 실패하면 지수 backoff 후 재시도 (RETRY_BACKOFF_SECONDS × 2^(시도-1)), MAX_ATTEMPTS 번까지
+- 서버가 죽어서 running 으로 남은 작업은 STALE_SECONDS 가 지나면 다시 가져감
+- 같은 프로세스의 호출자는 submit() 이 돌려주는 Future 로 완료를 기다림
+  (다른 프로세스가 실행한 작업은 DB 상태를 폴링해서 Future 를 완료 처리)
+
+Flask 크롤러 서버에서 사용 (웹 요청 처리 스레드 수와 크롤링 동시 실행 수를 따로 조절).
+"""
+import time
+import logging
+import threading
+from concurrent.futures import Future
+
+import market_db
+
+PRIORITY_USER = 10
+PRIORITY_BACKGROUND = 0
+
+MAX_ATTEMPTS = 3
+RETRY_BACKOFF_SECONDS = 5.0
+STALE_SECONDS = 600
+POLL_SECONDS = 1.0
+KEEP_FINISHED_DAYS = 7
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS crawl_jobs (
+        id INTEGER PRIMARY KEY,
+        server TEXT NOT NULL,
+        keyword TEXT NOT NULL,
+        priority INTEGER NOT NULL DEFAULT 0,
+        status TEXT NOT NULL DEFAULT 'queued',   -- queued / running / done / failed
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_run_at REAL NOT NULL,
+        created_at REAL NOT NULL,
+        started_at REAL,
+        finished_at REAL,
+        result_count INTEGER,
+        last_error TEXT
+    )
+    """,
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS uq_crawl_jobs_active ON crawl_jobs (server, keyword)
+    WHERE status IN ('queued', 'running')
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_crawl_jobs_claim ON crawl_jobs (status, priority DESC, id)",
+]
+
+JOB_COLUMNS = ("id", "server", "keyword", "priority", "status", "attempts", "next_run_at",
+               "created_at", "started_at", "finished_at", "result_count", "last_error")
+
+log = logging.getLogger("crawler.jobs")
+
+
+class CrawlJobError(Exception):
+    """재시도를 모두 실패한 작업"""
+
+
+def _row_to_job(row):
+    return dict(zip(JOB_COLUMNS, row)) if row else None
+
+
+class CrawlJobQueue:
+    """SQLite 기반 크롤링 작업 큐 + 워커 스레드"""
+
+    def __init__(self, run_fn, workers=2, on_finish=None):
+        """
+        run_fn(keyword, server, on_page) → 결과 목록 (예외면 재시도)
+        on_finish(job): 이 프로세스에서 작업이 끝날 때마다 호출 (캐시 무효화 등)
+        """
+        self.run_fn = run_fn
+        self.workers = workers
+        self.on_finish = on_finish
+        self.lock = threading.Lock()
+        self.wakeup = threading.Condition(self.lock)
+        self.futures = {}     # job_id → Future (이 프로세스에서 기다리는 작업)
+        self.listeners = {}   # job_id → [on_page, ...]
+        self.running = set()  # 이 프로세스에서 실행 중인 job_id
+        self.pending = 0      # submit 후 아직 워커가 확인하지 않은 알림 수 (claim 중에 온 notify 유실 방지)
+        self.threads = []
+        self.stopping = False
+
+    # ---------- 스키마 / 시작 ----------
+
+    def init_db(self):
+        """crawl_jobs 스키마 생성 + 오래된 완료 작업 정리 (서버 시작 시 1회)"""
+        conn = market_db.get_conn()
+        with conn:
+            for statement in SCHEMA:
+                conn.execute(statement)
+            conn.execute(
+                "DELETE FROM crawl_jobs WHERE status IN ('done', 'failed') AND finished_at < ?",
+                (time.time() - KEEP_FINISHED_DAYS * 86400,)
+            )
+        # market_db.init_db 와 같이 gunicorn preload master 의 연결은 fork 전에 닫음
+        market_db.close_conn()
+
+    def ensure_started(self):
+        """워커 스레드 시작 (fork 이후 각 프로세스에서 첫 요청 때 호출)"""
+        if self.threads:
+            return
+        with self.lock:
+            if self.threads:
+                return
+            for n in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"crawl-worker-{n}", daemon=True)
+                thread.start()
+                self.threads.append(thread)
+            poller = threading.Thread(target=self._poll_remote, name="crawl-job-poller", daemon=True)
+            poller.start()
+            self.threads.append(poller)
+
+    # ---------- 등록 ----------
+
+    def submit(self, server, keyword, priority=PRIORITY_BACKGROUND, on_page=None):
+        """
+        작업 등록 (같은 server/keyword 작업이 대기/실행 중이면 합류)
+        반환: (Future, job dict) - job['status'] 가 'running' 이면 이미 실행 중인 작업에 합류한 것
+        """
+        self.ensure_started()
+        now = time.time()
+        conn = market_db.get_conn()
+        with conn:
+            conn.execute("""
+                INSERT INTO crawl_jobs (server, keyword, priority, next_run_at, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (server, keyword) WHERE status IN ('queued', 'running')
+                DO UPDATE SET priority = MAX(priority, excluded.priority)
+            """, (server, keyword, priority, now, now))
+            job = _row_to_job(conn.execute(
+                f"SELECT {', '.join(JOB_COLUMNS)} FROM crawl_jobs "
+                "WHERE server = ? AND keyword = ? AND status IN ('queued', 'running')",
+                (server, keyword)
+            ).fetchone())
+
+        with self.wakeup:
+            future = self.futures.get(job["id"])
+            if future is None:
+                future = Future()
+                self.futures[job["id"]] = future
+            if on_page is not None:
+                self.listeners.setdefault(job["id"], []).append(on_page)
+            self.pending += 1
+            self.wakeup.notify()
+        return future, job
+
+    def remove_listener(self, job_id, on_page):
+        """submit 때 넘긴 on_page 제거 (스트리밍 클라이언트가 끊겼을 때)"""
+        with self.lock:
+            listeners = self.listeners.get(job_id)
+            if listeners and on_page in listeners:
+                listeners.remove(on_page)
+                if not listeners:
+                    del self.listeners[job_id]
+
+    # ---------- 조회 ----------
+
+    def get_job(self, job_id):
+        return _row_to_job(market_db.get_conn().execute(
+            f"SELECT {', '.join(JOB_COLUMNS)} FROM crawl_jobs WHERE id = ?", (job_id,)
+        ).fetchone())
+
+    def list_jobs(self, status=None, limit=50):
+        """최근 작업 목록 (status 지정 시 해당 상태만)"""
+        where, params = ("WHERE status = ?", (status,)) if status else ("", ())
+        rows = market_db.get_conn().execute(
+            f"SELECT {', '.join(JOB_COLUMNS)} FROM crawl_jobs {where} "
+            "ORDER BY CASE status WHEN 'running' THEN 0 WHEN 'queued' THEN 1 ELSE 2 END, "
+            "priority DESC, id DESC LIMIT ?",
+            params + (limit,)
+        ).fetchall()
+        return [_row_to_job(row) for row in rows]
+
+    def counts(self):
+        return dict(market_db.get_conn().execute(
+            "SELECT status, COUNT(*) FROM crawl_jobs GROUP BY status"
+        ).fetchall())
+
+    # ---------- 실행 ----------
+
+    def _claim(self):
+        """실행할 작업 1개를 running 으로 바꿔서 가져옴 (없으면 None)"""
+        now = time.time()
+        conn = market_db.get_conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(f"""
+                SELECT {', '.join(JOB_COLUMNS)} FROM crawl_jobs
+                WHERE (status = 'queued' AND next_run_at <= ?)
+                   OR (status = 'running' AND started_at < ?)
+                ORDER BY priority DESC, id
+                LIMIT 1
+            """, (now, now - STALE_SECONDS)).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE crawl_jobs SET status = 'running', started_at = ?, attempts = attempts + 1 WHERE id = ?",
+                    (now, row[0])
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        job = _row_to_job(row)
+        if job is not None:
+            job["status"] = "running"
+            job["attempts"] += 1
+        return job
+
+    def _worker(self):
+        while not self.stopping:
+            try:
+                job = self._claim()
+            except Exception:
+                log.exception("job claim failed")
+                job = None
+            if job is None:
+                # claim 하는 사이에 submit 이 있었으면 기다리지 않고 바로 다시 claim
+                with self.wakeup:
+                    if not self.pending:
+                        self.wakeup.wait(POLL_SECONDS)
+                    self.pending = max(self.pending - 1, 0)
+                continue
+            self._run(job)
+
+    def _run(self, job):
+        job_id = job["id"]
+        with self.lock:
+            self.running.add(job_id)
+        try:
+            self._execute(job)
+        finally:
+            with self.lock:
+                self.running.discard(job_id)
+
+    def _execute(self, job):
+        job_id = job["id"]
+
+        def on_page(page, items):
+            with self.lock:
+                listeners = list(self.listeners.get(job_id, ()))
+            for listener in listeners:
+                listener(page, items)
+
+        log.info("job %d start: server=%s keyword=%s priority=%d attempt=%d",
+                 job_id, job["server"], job["keyword"], job["priority"], job["attempts"])
+        try:
+            result = self.run_fn(job["keyword"], job["server"], on_page)
+        except Exception as e:
+            self._fail(job, e)
+            return
+
+        conn = market_db.get_conn()
+        with conn:
+            conn.execute(
+                "UPDATE crawl_jobs SET status = 'done', finished_at = ?, result_count = ?, last_error = NULL "
+                "WHERE id = ?",
+                (time.time(), len(result or []), job_id)
+            )
+        log.info("job %d done: %d rows", job_id, len(result or []))
+        self._finish(job_id, result=result)
+
+    def _fail(self, job, error):
+        job_id = job["id"]
+        now = time.time()
+        retry = job["attempts"] < MAX_ATTEMPTS
+        conn = market_db.get_conn()
+        with conn:
+            if retry:
+                delay = RETRY_BACKOFF_SECONDS * (2 ** (job["attempts"] - 1))
+                conn.execute(
+                    "UPDATE crawl_jobs SET status = 'queued', next_run_at = ?, last_error = ? WHERE id = ?",
+                    (now + delay, str(error), job_id)
+                )
+            else:
+                conn.execute(
+                    "UPDATE crawl_jobs SET status = 'failed', finished_at = ?, last_error = ? WHERE id = ?",
+                    (now, str(error), job_id)
+                )
+        if retry:
+            log.warning("job %d failed (attempt %d), retry in %.0fs: %s", job_id, job["attempts"], delay, error)
+        else:
+            log.error("job %d failed permanently: %s", job_id, error)
+            self._finish(job_id, error=CrawlJobError(str(error)))
+
+    def _finish(self, job_id, result=None, error=None):
+        with self.lock:
+            future = self.futures.pop(job_id, None)
+            self.listeners.pop(job_id, None)
+        if self.on_finish is not None:
+            try:
+                self.on_finish(self.get_job(job_id))
+            except Exception:
+                log.exception("on_finish hook failed")
+        if future is not None and not future.done():
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def _poll_remote(self):
+        """다른 프로세스가 끝낸 작업을 기다리는 Future 완료 처리 (결과 목록은 None)"""
+        while not self.stopping:
+            time.sleep(POLL_SECONDS)
+            with self.lock:
+                waiting = [job_id for job_id in self.futures if job_id not in self.running]
+            for job_id in waiting:
+                try:
+                    job = self.get_job(job_id)
+                except Exception:
+                    log.exception("job poll failed")
+                    break
+                if job is None or job["status"] == "done":
+                    self._finish(job_id, result=None)
+                elif job["status"] == "failed":
+                    self._finish(job_id, error=CrawlJobError(job["last_error"] or "failed"))
+
+    def stop(self):
+        self.stopping = True
+        with self.wakeup:
+            self.wakeup.notify_all()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+크롤러 수집 처리량 벤치마크 (gnjoy_standin.py 대역 서버 대상, 공홈에 요청하지 않음)
+
+    python scripts/debug/bench_crawler.py --concurrency 1 2 4 8 --latency-ms 80
+    python scripts/debug/bench_crawler.py --target crawl --rows 195 --throttle-rate 0.05 --rate 2
+
+- collector : .github/scripts/collect_and_upload.collect_and_upload() 를 target(server|검색어) 단위로 N개 동시 실행
+              (업로드도 대역 서버로 보냄, 페이지/target 간 딜레이는 --collector-delays 를 주지 않으면 0)
+- crawl     : python-crawler-server.crawl_item_internal() 을 검색어마다 실행, 동시 요청 페이지 수(CRAWL_CONCURRENCY)를 N 으로
+              (svrID 별 token-bucket 은 --rate 로 지정, 0 이면 제한 없음)
+- 결과: 설정별 pages/s, rows/s, 소요 시간, 받은 429 수 (대역 서버 통계 기준)
+
+응답 캐시(GNJOY_CACHE_PATH)와 ro_market.db(RO_MARKET_DB)는 임시 디렉터리를 쓰고 실행마다 캐시를 새로 만든다
+(--warm-cache 면 같은 캐시를 유지해서 파싱 memo 가 적용된 경우를 측정).
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import contextlib
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+
+from gnjoy_standin import StandinServer, DEFAULT_ROWS
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SCRIPTS_DIR = os.path.join(BACKEND_DIR, "scripts")
+COLLECTOR_PATH = os.path.join(BACKEND_DIR, ".github", "scripts", "collect_and_upload.py")
+SERVER_PATH = os.path.join(BACKEND_DIR, "python-crawler-server.py")
+
+DEFAULT_KEYWORDS = ["천공", "진노", "포링 카드", "데프트"]
+COLLECTOR_SERVERS = ["baphomet", "yggdrasil", "ifrit"]
+
+
+def load_module(name, path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class Bench:
+    """대역 서버 + 임시 캐시/DB 환경에서 수집 함수를 실행하고 처리량 측정"""
+
+    def __init__(self, args, workdir):
+        self.args = args
+        self.workdir = workdir
+        self.server = StandinServer(total_rows=args.rows, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                                    throttle_rate=args.throttle_rate, rate_limit=args.rate_limit,
+                                    retry_after=args.retry_after).start()
+
+        # gnjoy_client / gnjoy_cache / market_db 는 import 시점에 환경변수를 읽으므로 먼저 설정
+        os.environ["GNJOY_DEAL_URL"] = self.server.deal_url
+        os.environ["GNJOY_CACHE_PATH"] = os.path.join(workdir, "gnjoy_cache.db")
+        os.environ["RO_MARKET_DB"] = os.path.join(workdir, "ro_market.db")
+        os.environ.setdefault("LOG_LEVEL", "WARNING")
+        sys.path.insert(0, SCRIPTS_DIR)
+
+        import gnjoy_client
+        import gnjoy_cache
+        import gnjoy_fetcher
+        self.gnjoy_client = gnjoy_client
+        self.gnjoy_cache = gnjoy_cache
+        self.gnjoy_fetcher = gnjoy_fetcher
+        self.cache_runs = 0
+
+        # 동시 요청 수를 재려면 연결 풀도 그만큼 있어야 함 (기본 4개에서 막힘)
+        gnjoy_client.MAX_CONNECTIONS_PER_HOST = max(gnjoy_client.MAX_CONNECTIONS_PER_HOST, max(args.concurrency))
+        gnjoy_client.close_session()
+
+    def reset_cache(self):
+        """실행마다 빈 응답 캐시로 교체 (--warm-cache 면 유지)"""
+        if self.args.warm_cache and self.gnjoy_cache._cache is not None:
+            return
+        self.cache_runs += 1
+        path = os.path.join(self.workdir, f"gnjoy_cache_{self.cache_runs}.db")
+        self.gnjoy_cache._cache = self.gnjoy_cache.ResponseCache(path)
+
+    def measure(self, fn):
+        """fn() 실행 시간과 그동안의 대역 서버 통계"""
+        self.reset_cache()
+        self.server.stats.reset()
+        started = time.perf_counter()
+        with contextlib.ExitStack() as stack:
+            if not self.args.verbose:
+                stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, "w"))))
+            fn()
+        elapsed = time.perf_counter() - started
+        stats = self.server.stats.snapshot()
+        return {
+            "seconds": round(elapsed, 3),
+            "pages": stats["pages"],
+            "rows": stats["rows"],
+            "pages_per_s": round(stats["pages"] / elapsed, 1),
+            "rows_per_s": round(stats["rows"] / elapsed, 1),
+            "throttled": stats["throttled"],
+            "uploaded": stats["uploaded_rows"],
+        }
+
+    # ---------- collector ----------
+
+    def bench_collector(self, concurrency):
+        collector = self.collector
+        upload_url = f"{self.server.base_url}/api/vending/upload"
+        targets = [(server, keyword) for server in COLLECTOR_SERVERS for keyword in self.args.keywords]
+        pages = -(-self.args.rows // 10) + 1  # 마지막 빈 페이지까지
+
+        def run():
+            state = {"targets": {}}
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                futures = [
+                    executor.submit(collector.collect_and_upload, server, keyword, 1, pages,
+                                    upload_url, "bench", None if self.args.full_upload else state)
+                    for server, keyword in targets
+                ]
+                for future in futures:
+                    future.result()
+
+        return self.measure(run)
+
+    @property
+    def collector(self):
+        if not hasattr(self, "_collector"):
+            sys.path.insert(0, os.path.dirname(COLLECTOR_PATH))
+            self._collector = load_module("collect_and_upload", COLLECTOR_PATH)
+            if not self.args.collector_delays:
+                self._collector.PAGE_DELAY_RANGE = (0, 0)
+                self._collector.TARGET_DELAY_SECONDS = 0
+        return self._collector
+
+    # ---------- Flask crawl_item_internal ----------
+
+    def bench_crawl(self, concurrency):
+        crawler = self.crawler
+        crawler.CRAWL_CONCURRENCY = concurrency
+
+        def run():
+            for keyword in self.args.keywords:
+                crawler.crawl_item_internal(keyword, "baphomet")
+
+        return self.measure(run)
+
+    @property
+    def crawler(self):
+        if not hasattr(self, "_crawler"):
+            # svrID 별 token-bucket 을 먼저 만들어 두면 크롤러가 같은 버킷을 사용
+            rate = self.args.rate or 1e9
+            self.gnjoy_fetcher.get_bucket("129", rate, rate if self.args.rate else 1e9)
+            self._crawler = load_module("python_crawler_server", SERVER_PATH)
+        return self._crawler
+
+    def close(self):
+        self.gnjoy_client.close_session()
+        self.server.stop()
+
+
+def print_table(title, results):
+    print(f"\n[Bench] {title}")
+    print(f"  {'conc':>4} {'sec':>8} {'pages':>6} {'rows':>6} {'pages/s':>9} {'rows/s':>9} {'429':>5} {'upload':>7}")
+    for concurrency, r in results:
+        print(f"  {concurrency:>4} {r['seconds']:>8} {r['pages']:>6} {r['rows']:>6} {r['pages_per_s']:>9} "
+              f"{r['rows_per_s']:>9} {r['throttled']:>5} {r['uploaded']:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="collector / crawl_item_internal 수집 처리량 벤치마크 (로컬 대역 서버)")
+    parser.add_argument("--target", choices=["collector", "crawl", "all"], default="all")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="collector: 동시 target 수 / crawl: 동시 요청 페이지 수")
+    parser.add_argument("--keywords", nargs="+", default=DEFAULT_KEYWORDS)
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="검색어마다 대역 서버가 만드는 목록 수")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="429 주입 확률")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="대역 서버 초당 요청 제한 (초과 시 429)")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--rate", type=float, default=0.0, help="crawl: svrID 별 token-bucket 초당 요청 수 (0 = 제한 없음)")
+    parser.add_argument("--collector-delays", action="store_true", help="collector 페이지/target 간 딜레이 유지")
+    parser.add_argument("--full-upload", action="store_true", help="collector delta 모드 대신 전체 업로드")
+    parser.add_argument("--warm-cache", action="store_true", help="실행 간 응답 캐시 유지 (파싱 memo 적용)")
+    parser.add_argument("--verbose", action="store_true", help="수집 스크립트 출력 표시")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_crawler_") as workdir:
+        bench = Bench(args, workdir)
+        print(f"[Bench] standin={bench.server.deal_url} rows={args.rows} latency={args.latency_ms}±{args.jitter_ms}ms "
+              f"throttle={args.throttle_rate} keywords={len(args.keywords)}")
+        try:
+            if args.target in ("collector", "all"):
+                print_table("collector (collect_and_upload, 동시 target 수)",
+                            [(c, bench.bench_collector(c)) for c in args.concurrency])
+            if args.target in ("crawl", "all"):
+                print_table("crawl_item_internal (동시 요청 페이지 수)",
+                            [(c, bench.bench_crawl(c)) for c in args.concurrency])
+        finally:
+            bench.close()
+
+
+if __name__ == "__main__":
+    main()
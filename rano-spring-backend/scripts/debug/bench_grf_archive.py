@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+GRF 리더 벤치마크 / 검증 (grf_archive.GrfArchive)
+
+    python scripts/debug/bench_grf_archive.py                       # 합성 GRF (기본 200,000 엔트리)
+    python scripts/debug/bench_grf_archive.py --grf data.grf         # 실제 data.grf (읽기만)
+
+- 합성 GRF: 0x200 형식으로 직접 써서 만든다 (iteminfo/skillinfolist/skilldescript .lub + 아이콘 bmp/spr + 더미 파일)
+- open   : mmap + 파일 테이블 해제 + 인덱스 생성 시간
+- lookup : 기존 extract_iteminfo 방식 (target 마다 grf.files 전체를 돌며 equals/endswith) vs 인덱스 (find_name)
+           find_name 의 이름 인덱스는 첫 호출 때 만들어지므로 첫 호출 시간도 따로 출력
+- extract: 아이콘 전부 + Lua 파일을 worker 1개 vs N개로 추출, 합성 GRF 면 내용이 원본과 같은지 확인 (다르면 exit 1)
+"""
+import os
+import sys
+import time
+import zlib
+import random
+import struct
+import argparse
+import tempfile
+
+DEBUG_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.dirname(DEBUG_DIR)
+sys.path.insert(0, SCRIPTS_DIR)
+from grf_archive import GrfArchive, HEADER_SIZE, GRF_FLAG_FILE
+from grf_item_extractor import CLIENT_FILE_NAMES, ICON_FOLDERS
+
+LEGACY_TARGETS = [
+    'data\\lua files\\datainfo\\iteminfo.lub',
+    'data\\lua files\\datainfo\\iteminfo.lua',
+    'data\\luafiles514\\lua files\\datainfo\\iteminfo.lub',
+    'data\\luafiles514\\lua files\\datainfo\\iteminfo.lua',
+    'System\\iteminfo.lub',
+    'System\\iteminfo.lua',
+]
+
+
+def write_grf(path, files):
+    """files: [(GRF 내부 경로, bytes)] → 0x200 GRF"""
+    table = bytearray()
+    with open(path, 'wb') as f:
+        f.write(b'\0' * HEADER_SIZE)
+        offset = 0
+        for name, content in files:
+            packed = zlib.compress(content, 1)
+            f.write(packed)
+            table += name.encode('cp949') + b'\0'
+            table += struct.pack('<iiiBI', len(packed), len(packed), len(content), GRF_FLAG_FILE, offset)
+            offset += len(packed)
+        compressed = zlib.compress(bytes(table))
+        f.write(struct.pack('<II', len(compressed), len(table)))
+        f.write(compressed)
+        f.seek(0)
+        f.write(struct.pack('<15sx14sIIII', b'Master of Magic', b'\0' * 14, offset, 0, len(files) + 7, 0x200))
+
+
+def synthetic_files(count, seed=1):
+    rng = random.Random(seed)
+    files = []
+    for kind, names in CLIENT_FILE_NAMES.items():
+        files.append((f"data\\luafiles514\\lua files\\datainfo\\{names[0]}", f"-- {kind}\n".encode() * 2000))
+    for i in range(2000):
+        prefix, suffix = ICON_FOLDERS[i % len(ICON_FOLDERS)]
+        files.append((f"{prefix}아이콘_{i}{suffix}", bytes(rng.getrandbits(8) for _ in range(64)) * 20))
+    folders = ["data\\texture\\effect", "data\\sprite\\몬스터", "data\\wav", "data\\model\\프론테라"]
+    while len(files) < count:
+        n = len(files)
+        files.append((f"{folders[n % len(folders)]}\\file_{n}.bin", b"x" * (n % 97)))
+    rng.shuffle(files)
+    return files
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def legacy_lookup(grf):
+    """기존 extract_iteminfo 의 target × 전체 파일 루프 (찾기만)"""
+    found = []
+    for target in LEGACY_TARGETS:
+        for file_path in grf.files:
+            if file_path.lower() == target.lower() or file_path.lower().endswith(target.lower().split('\\')[-1]):
+                found.append(file_path)
+    return found
+
+
+def indexed_lookup(grf):
+    return [entry.path for names in CLIENT_FILE_NAMES.values() for name in names for entry in grf.find_name(name)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GRF 리더 벤치마크")
+    parser.add_argument("--grf", help="실제 GRF 파일 (없으면 합성)")
+    parser.add_argument("--entries", type=int, default=200000, help="합성 GRF 엔트리 수")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_grf_") as workdir:
+        files = None
+        path = args.grf
+        if path is None:
+            files = synthetic_files(args.entries)
+            path = os.path.join(workdir, "data.grf")
+            elapsed, _ = timed(write_grf, path, files)
+            print(f"[Bench] 합성 GRF {len(files):,} entries ({os.path.getsize(path) / 1e6:.1f} MB), 쓰기 {elapsed:.2f}s")
+
+        elapsed, grf = timed(GrfArchive, path)
+        with grf:
+            print(f"  open (mmap + table + index): {elapsed:.3f}s  {len(grf):,} files")
+
+            legacy_time, legacy = timed(legacy_lookup, grf)
+            first_time, _ = timed(indexed_lookup, grf)
+            index_time, indexed = timed(indexed_lookup, grf)
+            print(f"  lookup legacy (target × files): {legacy_time * 1000:.1f} ms  {len(legacy)} hits")
+            print(f"  lookup index  (find_name)     : {index_time * 1000:.3f} ms  {len(indexed)} hits"
+                  f"  ({legacy_time / max(index_time, 1e-9):,.0f}x, 첫 호출은 이름 인덱스 생성 포함 {first_time * 1000:.1f} ms)")
+
+            targets = [grf.find(p) for p in indexed] + [e for prefix, suffix in ICON_FOLDERS for e in grf.match(prefix, suffix)]
+            results = {}
+            for workers in sorted({1, args.workers}):
+                out_dir = os.path.join(workdir, f"out_{workers}")
+                elapsed, results[workers] = timed(grf.extract_many, targets, out_dir, workers)
+                errors = sum(1 for _, _, error in results[workers] if error is not None)
+                print(f"  extract {len(targets):,} files, workers={workers}: {elapsed:.3f}s  errors {errors}")
+
+            if files is not None:
+                expected = dict(files)
+                wrong = 0
+                for path_in_grf, output_path, _ in results[args.workers]:
+                    with open(output_path, 'rb') as f:
+                        wrong += f.read() != expected[path_in_grf]
+                print(f"  내용 비교: {len(targets) - wrong:,}/{len(targets):,} 일치")
+                sys.exit(1 if wrong else 0)
+
+
+if __name__ == "__main__":
+    main()
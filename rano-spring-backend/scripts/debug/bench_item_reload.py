@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+items 증분 재적재 벤치마크 / 검증 (load_items_from_lua v4 + item_sync)
+
+    python scripts/debug/bench_item_reload.py                    # 합성 iteminfo 30,000개, 패치 1%
+    python scripts/debug/bench_item_reload.py --items 50000 --changed 500 --added 200 --removed 50
+
+- 임시 SQLite DB 에 items 테이블을 만들고 합성 iteminfo.lua (bench_iteminfo_parser.write_synthetic) 로 진행
+- full      : --full (백업 + 전체 삭제/재삽입, 기존 방식)
+- unchanged : 같은 파일로 다시 실행 → 파일 SHA-256 이 같아서 파싱 없이 종료
+- patch     : 일부 아이템 변경(slotCount) / 추가 / 삭제한 파일로 증분 재적재
+- 검증: 증분 결과 items 가 패치 파일을 --full 로 새로 적재한 DB 와 같은지,
+        updated_at 이 바뀐 행 수가 추가 + 변경 수와 같은지 (다르면 exit 1)
+"""
+import io
+import os
+import re
+import sys
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+import contextlib
+
+DEBUG_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.dirname(DEBUG_DIR)
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, DEBUG_DIR)
+import load_items_from_lua
+from bench_iteminfo_parser import write_synthetic
+
+ITEMS_TABLE = """
+    CREATE TABLE items (
+        id INTEGER PRIMARY KEY, name_kr TEXT, description TEXT, slots INTEGER,
+        raw_data TEXT, parsed_data TEXT, buy_price INTEGER, sell_price INTEGER, updated_at TIMESTAMP
+    )
+"""
+
+_BLOCK_RE = re.compile(r'\t\[(\d+)\] = \{\n.*?\n\t\},\n', re.S)
+
+
+def patch_lua(src, dst, changed, added, removed, seed=2):
+    """changed 개 slotCount 변경, removed 개 블록 삭제, added 개 새 ID 블록 추가 (기존 블록 복사)"""
+    with open(src, encoding='ascii') as f:
+        text = f.read()
+    blocks = list(_BLOCK_RE.finditer(text))
+    rng = random.Random(seed)
+    picked = rng.sample(range(len(blocks)), changed + removed)
+    change_at, remove_at = set(picked[:changed]), set(picked[changed:])
+    last_id = int(blocks[-1].group(1))
+
+    out = [text[:blocks[0].start()]]
+    for i, match in enumerate(blocks):
+        block = match.group(0)
+        if i in remove_at:
+            continue
+        if i in change_at:
+            block = re.sub(r'slotCount = (\d+)', lambda m: f"slotCount = {int(m.group(1)) + 5}", block)
+        out.append(block)
+    for n in range(added):
+        source = blocks[rng.randrange(len(blocks))]
+        out.append(source.group(0).replace(f"[{source.group(1)}]", f"[{last_id + 1 + n}]", 1))
+    out.append(text[blocks[-1].end():])
+    with open(dst, 'w', encoding='ascii') as f:
+        f.write("".join(out))
+
+
+def run(lua_path, db_path, workdir, **kwargs):
+    """load_items_from_lua.main (출력 숨김) → (걸린 시간, 결과)"""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = load_items_from_lua.main(
+            lua_path, db_path, index_path=os.path.join(workdir, "item_index.tsv.gz"), **kwargs
+        )
+    return time.perf_counter() - start, result
+
+
+def snapshot(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("SELECT id, name_kr, description, slots, updated_at FROM items").fetchall()
+    finally:
+        conn.close()
+    return {row[0]: row[1:] for row in rows}
+
+
+def new_db(path):
+    conn = sqlite3.connect(path)
+    conn.execute(ITEMS_TABLE)
+    conn.commit()
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="items 증분 재적재 벤치마크")
+    parser.add_argument("--items", type=int, default=30000)
+    parser.add_argument("--changed", type=int, default=300)
+    parser.add_argument("--added", type=int, default=100)
+    parser.add_argument("--removed", type=int, default=30)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_reload_") as workdir:
+        base_lua = os.path.join(workdir, "iteminfo.lua")
+        patched_lua = os.path.join(workdir, "iteminfo_patched.lua")
+        write_synthetic(base_lua, args.items)
+        patch_lua(base_lua, patched_lua, args.changed, args.added, args.removed)
+        print(f"[Bench] 합성 iteminfo {args.items:,}개, 패치: 변경 {args.changed} / 추가 {args.added} / 삭제 {args.removed}")
+
+        db_path = os.path.join(workdir, "incremental.db")
+        new_db(db_path)
+        elapsed, _ = run(base_lua, db_path, workdir, full=True)
+        print(f"  full (초기 적재)           : {elapsed:.3f}s")
+
+        elapsed, result = run(base_lua, db_path, workdir)
+        print(f"  unchanged (파일 해시 같음) : {elapsed:.3f}s  {'skip' if result is None else 'reloaded'}")
+
+        before = snapshot(db_path)
+        time.sleep(0.01)  # updated_at 구분
+        elapsed, _ = run(patched_lua, db_path, workdir)
+        after = snapshot(db_path)
+        touched = sum(1 for item_id, row in after.items() if item_id not in before or before[item_id][3] != row[3])
+        print(f"  patch (증분)               : {elapsed:.3f}s  updated_at 바뀐 행 {touched:,}, "
+              f"삭제 {len(set(before) - set(after)):,}")
+
+        reference_path = os.path.join(workdir, "full.db")
+        new_db(reference_path)
+        full_time, _ = run(patched_lua, reference_path, workdir, full=True)
+        print(f"  patch (--full, 비교 기준)  : {full_time:.3f}s  {len(snapshot(reference_path)):,} rows")
+
+        reference = {item_id: row[:3] for item_id, row in snapshot(reference_path).items()}
+        incremental = {item_id: row[:3] for item_id, row in after.items()}
+        wrong = [item_id for item_id in set(reference) | set(incremental)
+                 if reference.get(item_id) != incremental.get(item_id)]
+        expected_touched = args.changed + args.added
+        print(f"  내용 비교: 다른 행 {len(wrong)}, 쓴 행 {touched:,} (기대 {expected_touched:,})")
+        sys.exit(1 if wrong or touched != expected_touched else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+iteminfo.lua 파서 벤치마크: 기존 아이템 블록별 정규식 방식 vs iteminfo_lua 단일 통과 토크나이저
+
+    python scripts/debug/bench_iteminfo_parser.py                       # scripts/extracted/iteminfo.lua
+    python scripts/debug/bench_iteminfo_parser.py --synthetic 30000     # 파일이 없을 때: unluac 출력 형식으로 합성
+
+- legacy    : load_items_from_lua.parse_lua_items (v2) 와 같은 알고리즘 ([ID] = { 위치를 찾고 블록마다 re.search + 중괄호 루프)
+              identifiedDisplayName / identifiedDescriptionName 정규식이 unidentified* 에 먼저 매칭되므로
+              실제로는 미감정 이름/설명을 읽고, 긴 감정 설명은 디코딩하지 않음 (그래서 빠르지만 결과가 틀림)
+- legacy \\b : 위 정규식 앞에 \\b 만 붙인 것 (감정 설명을 제대로 디코딩하는 경우의 기존 방식 비용)
+- single    : iteminfo_lua.read_items (토큰 정규식 한 번 통과 + 아이템 묶음 단위 escape 일괄 디코딩)
+- sharded N : read_items(path, N) (아이템 경계에서 샤드로 나눠 ProcessPoolExecutor + SharedMemory), --workers 로 지정
+              결과가 single 과 (순서, 중복 수까지) 같아야 함. 코어 수보다 많은 worker 는 빨라지지 않음
+- 합성 파일이면 생성한 정답(이름/설명/슬롯)과 각각 비교하고, single 이 하나라도 틀리면 exit 1
+"""
+import os
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+
+DEBUG_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.dirname(DEBUG_DIR)
+sys.path.insert(0, SCRIPTS_DIR)
+from iteminfo_lua import read_items
+
+DEFAULT_LUA = os.path.join(SCRIPTS_DIR, "extracted", "iteminfo.lua")
+NAMES_JSON = os.path.join(SCRIPTS_DIR, "extracted", "items_parsed.json")
+
+
+# ---------- 기존 방식 (비교용 사본) ----------
+
+def legacy_decode(text):
+    decoded = re.sub(r'\\(\d{1,3})', lambda m: chr(int(m.group(1))), text)
+    try:
+        return decoded.encode('latin-1').decode('euc-kr', errors='replace')
+    except UnicodeEncodeError:
+        return decoded
+
+
+def legacy_parse(path, strict_names=False):
+    """strict_names: identified* 필드 정규식 앞에 \\b 를 붙여서 unidentified* 에 매칭되지 않게 (정답과 같은 결과)"""
+    prefix = r'\b' if strict_names else ''
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        content = f.read()
+    items = {}
+    starts = [(m.group(1), m.start(), m.end()) for m in re.finditer(r'\[(\d+)\]\s*=\s*\{', content)]
+    for i, (item_id, start, block_start) in enumerate(starts):
+        item_id = int(item_id)
+        if item_id in items:
+            continue
+        block = content[block_start:starts[i + 1][1]] if i + 1 < len(starts) else content[block_start:]
+        name_match = re.search(prefix + r'identifiedDisplayName\s*=\s*"([^"]*)"', block)
+        description = None
+        desc_match = re.search(prefix + r'identifiedDescriptionName\s*=\s*\{', block)
+        if desc_match:
+            depth, end = 1, desc_match.end()
+            for j in range(desc_match.end(), len(block)):
+                if block[j] == '{':
+                    depth += 1
+                elif block[j] == '}':
+                    depth -= 1
+                    if depth == 0:
+                        end = j
+                        break
+            lines = re.findall(r'"([^"]*)"', block[desc_match.end():end])
+            description = '\n'.join(legacy_decode(line) for line in lines) or None
+        slot_match = re.search(r'slotCount\s*=\s*(\d+)', block)
+        items[item_id] = {
+            'name_kr': legacy_decode(name_match.group(1)) if name_match else None,
+            'description': description,
+            'slots': int(slot_match.group(1)) if slot_match else 0,
+        }
+    return items
+
+
+# ---------- 합성 파일 ----------
+
+def lua_escape(text):
+    """unluac 처럼 ASCII 가 아닌 바이트를 \\NNN(10진수) 로"""
+    out = []
+    for byte in text.encode('cp949'):
+        if byte == 0x22:
+            out.append('\\"')
+        elif byte == 0x5c:
+            out.append('\\\\')
+        elif 0x20 <= byte < 0x7f:
+            out.append(chr(byte))
+        else:
+            out.append(f'\\{byte}')
+    return ''.join(out)
+
+
+def write_synthetic(path, count, seed=1):
+    """items_parsed.json 이름으로 iteminfo.lua 형식 파일 생성. 반환: {id: (name, description, slots)}"""
+    rng = random.Random(seed)
+    with open(NAMES_JSON, encoding='utf-8') as f:
+        names = [item['name'] for item in json.load(f).values() if item.get('name')]
+    words = ["공격력", "방어력", "+10", "재련", "시", "추가로", "증가한다.", "^ffffff_^000000", "{세트}", '"강화"']
+
+    truth = {}
+    with open(path, 'w', encoding='ascii') as f:
+        f.write("tbl = {\n")
+        for n in range(count):
+            item_id = 500 + n
+            name = f"{rng.choice(names)} {n}"
+            unidentified = "투구" if n % 3 == 0 else name
+            lines = [" ".join(rng.choice(words) for _ in range(rng.randint(3, 10))) for _ in range(rng.randint(2, 9))]
+            slots = rng.randint(0, 4)
+            truth[item_id] = (name, "\n".join(lines), slots)
+
+            f.write(f"\t[{item_id}] = {{\n")
+            f.write(f'\t\tunidentifiedDisplayName = "{lua_escape(unidentified)}",\n')
+            f.write(f'\t\tunidentifiedResourceName = "{lua_escape(unidentified)}",\n')
+            f.write('\t\tunidentifiedDescriptionName = {\n')
+            f.write(f'\t\t\t"{lua_escape("감정되지 않은 아이템")}",\n\t\t\t""\n\t\t}},\n')
+            f.write(f'\t\tidentifiedDisplayName = "{lua_escape(name)}",\n')
+            f.write(f'\t\tidentifiedResourceName = "{lua_escape(name)}",\n')
+            f.write('\t\tidentifiedDescriptionName = {\n')
+            f.write(",\n".join(f'\t\t\t"{lua_escape(line)}"' for line in lines))
+            f.write('\n\t\t},\n')
+            f.write(f'\t\tslotCount = {slots},\n\t\tClassNum = {rng.randint(0, 2000)},\n\t\tcostume = false\n')
+            f.write("\t},\n")
+        f.write("}\n\nmain = function()\n\tfor ItemID, DESC in pairs(tbl) do\n\t\tresult, msg = AddItem(ItemID, DESC)\n\tend\n\treturn true, \"good\"\nend\n")
+    return truth
+
+
+def mismatches(truth, result):
+    """정답과 (이름, 설명, 슬롯)이 다른 ID 목록"""
+    return [
+        item_id for item_id, expected in truth.items()
+        if item_id not in result
+        or (result[item_id]['name_kr'], result[item_id]['description'], result[item_id]['slots']) != expected
+    ]
+
+
+def as_rows(items):
+    """{id: ItemRecord} → legacy_parse 와 같은 dict 형태"""
+    return {
+        item_id: {'name_kr': record.identified_name, 'description': record.description_text(), 'slots': record.slots}
+        for item_id, record in items.items()
+    }
+
+
+def timed(fn, *args, rounds=3):
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = fn(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="iteminfo.lua 파서 벤치마크")
+    parser.add_argument("--lua", default=DEFAULT_LUA)
+    parser.add_argument("--synthetic", type=int, default=0, help="합성 파일 아이템 수 (--lua 가 없으면 기본 30000)")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--workers", type=int, nargs="*", default=[2, 4], help="sharded 파싱 worker 수 (여러 개 가능)")
+    args = parser.parse_args()
+
+    truth = None
+    tmp = None
+    path = args.lua
+    if args.synthetic or not os.path.exists(path):
+        count = args.synthetic or 30000
+        tmp = tempfile.NamedTemporaryFile(suffix=".lua", delete=False)
+        tmp.close()
+        path = tmp.name
+        print(f"[Bench] {args.lua} 없음 → 합성 파일 {count:,}개 아이템")
+        truth = write_synthetic(path, count)
+
+    try:
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        print(f"[Bench] {path} ({size_mb:.1f} MB), best of {args.rounds}")
+
+        legacy_time, legacy = timed(legacy_parse, path, rounds=args.rounds)
+        strict_time, strict = timed(legacy_parse, path, True, rounds=args.rounds)
+        single_time, (items, duplicates) = timed(read_items, path, rounds=args.rounds)
+        single = as_rows(items)
+
+        rows = [
+            ("legacy (블록별 정규식)", legacy_time, legacy),
+            ("legacy \\b (이름 정규식 수정)", strict_time, strict),
+            ("single (토크나이저)", single_time, single),
+        ]
+        sharded_wrong = 0
+        notes = []
+        for workers in args.workers:
+            sharded_time, (sharded_items, sharded_duplicates) = timed(read_items, path, workers, rounds=args.rounds)
+            same = list(sharded_items.items()) == list(items.items()) and sharded_duplicates == duplicates
+            sharded_wrong += not same
+            rows.append((f"sharded (workers={workers})", sharded_time, as_rows(sharded_items)))
+            notes.append(f"  sharded workers={workers}: single 과 동일 {same}, "
+                         f"speedup vs single {single_time / sharded_time:.2f}x (CPU {os.cpu_count()})")
+        for label, elapsed, result in rows:
+            line = f"  {label:<26} {elapsed:7.3f}s  {len(result):,} items  {size_mb / elapsed:5.1f} MB/s"
+            if truth is not None:
+                line += f"  정답 일치 {len(truth) - len(mismatches(truth, result)):,}/{len(truth):,}"
+            print(line)
+        print(f"  single duplicates {duplicates}, speedup vs legacy {legacy_time / single_time:.2f}x, "
+              f"vs legacy \\b {strict_time / single_time:.2f}x")
+        for note in notes:
+            print(note)
+
+        if sharded_wrong:
+            sys.exit(1)
+        if truth is not None:
+            wrong = mismatches(truth, single)
+            for item_id in wrong[:5]:
+                print(f"    [{item_id}] expected {truth[item_id]!r}")
+                print(f"    [{item_id}] got      {items.get(item_id)!r}")
+            sys.exit(1 if wrong else 0)
+    finally:
+        if tmp is not None:
+            os.unlink(tmp.name)
+
+
+if __name__ == "__main__":
+    main()
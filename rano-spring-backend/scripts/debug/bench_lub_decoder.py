@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+.lub (Lua 5.1 bytecode) 디코더 벤치마크 / 검증
+
+    python scripts/debug/bench_lub_decoder.py --lub itemInfo_true.lub skilldescript.lub
+    python scripts/debug/bench_lub_decoder.py --synthetic 5000      # lupa(lua51) 가 있을 때: 합성 iteminfo.lua 를 컴파일해서 비교
+
+- decoder : lua_string_extractor.read_lub (함수 프로토타입 + 상수 테이블 읽기, 최상위 코드의 테이블 생성자 한 번 실행)
+- legacy  : 기존 extract_items_from_bytecode 와 같은 방식 (모든 바이트 위치에서 struct.unpack 으로 길이+문자열 추측)
+- 합성 파일이면 같은 소스를 iteminfo_lua(텍스트 파서)로 읽은 결과와 ItemRecord 가 전부 같은지 확인 (다르면 exit 1)
+  lupa 는 검증용으로만 사용하고 프로젝트 의존성은 아님 (pip install lupa)
+"""
+import os
+import sys
+import time
+import struct
+import argparse
+import tempfile
+
+DEBUG_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.dirname(DEBUG_DIR)
+sys.path.insert(0, SCRIPTS_DIR)
+from iteminfo_lua import iter_items
+from lua_string_extractor import read_lub, items_from_globals, skills_from_globals
+from bench_iteminfo_parser import write_synthetic
+
+
+def legacy_scan(data):
+    """기존 방식: 바이트마다 4바이트 길이 후보를 읽고 \\0 으로 끝나는 EUC-KR 한글 문자열 수집"""
+    strings = []
+    i = 0
+    while i < len(data) - 8:
+        str_len = struct.unpack('<I', data[i:i + 4])[0]
+        if 4 < str_len < 500 and i + 4 + str_len <= len(data) and data[i + 4 + str_len - 1] == 0:
+            try:
+                decoded = data[i + 4:i + 4 + str_len - 1].decode('euc-kr')
+                if len(decoded) >= 2 and any('가' <= c <= '힯' for c in decoded):
+                    strings.append(decoded)
+            except UnicodeDecodeError:
+                pass
+        i += 1
+    return strings
+
+
+def compile_lua(source):
+    """lupa 의 Lua 5.1 로 string.dump (없으면 None)"""
+    try:
+        from lupa import lua51
+    except ImportError:
+        return None
+    runtime = lua51.LuaRuntime(encoding=None)
+    return runtime.eval('function(s) return string.dump(assert(loadstring(s))) end')(source)
+
+
+def decode(data):
+    _, globals_ = read_lub(data)
+    return list(items_from_globals(globals_)), list(skills_from_globals(globals_))
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def report(label, data, legacy):
+    elapsed, (items, skills) = timed(decode, data)
+    size_mb = len(data) / (1024 * 1024)
+    print(f"[Bench] {label} ({size_mb:.1f} MB, size_t {data[8]} bytes)")
+    print(f"  decoder: {elapsed:.3f}s  {size_mb / elapsed:.1f} MB/s  items {len(items):,}  skills {len(skills):,}")
+    if legacy:
+        legacy_time, strings = timed(legacy_scan, data)
+        print(f"  legacy : {legacy_time:.3f}s  {size_mb / legacy_time:.2f} MB/s  한글 문자열 {len(strings):,}개 (구조 없음"
+              f"{', 4바이트 길이만 가정해서 size_t 8 청크에서는 못 찾음' if data[8] != 4 else ''})")
+        print(f"  speedup: {legacy_time / elapsed:.1f}x")
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description=".lub 디코더 벤치마크 / 검증")
+    parser.add_argument("--lub", nargs="+", default=[], help="itemInfo_true.lub, skilldescript.lub 등")
+    parser.add_argument("--synthetic", type=int, default=5000, help="--lub 가 없을 때 합성 아이템 수")
+    parser.add_argument("--no-legacy", action="store_true", help="기존 바이트 단위 스캔 측정 생략 (큰 파일에서 느림)")
+    args = parser.parse_args()
+
+    if args.lub:
+        for path in args.lub:
+            with open(path, "rb") as f:
+                report(path, f.read(), not args.no_legacy)
+        return
+
+    with tempfile.TemporaryDirectory(prefix="bench_lub_") as workdir:
+        lua_path = os.path.join(workdir, "iteminfo.lua")
+        write_synthetic(lua_path, args.synthetic)
+        with open(lua_path, "rb") as f:
+            source = f.read()
+        data = compile_lua(source)
+        if data is None:
+            print("[Bench] lupa 가 없어서 합성 .lub 를 만들 수 없음 → --lub 로 실제 파일을 지정하세요")
+            sys.exit(2)
+
+        items = report(f"합성 {args.synthetic:,}개 아이템 (lupa lua51 string.dump)", data, not args.no_legacy)
+        expected = list(iter_items(source))
+        same = sum(1 for a, b in zip(items, expected) if a == b)
+        print(f"  텍스트 파서와 비교: {same:,}/{len(expected):,} 일치")
+        sys.exit(0 if same == len(expected) == len(items) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,12 @@ from flask_cors import CORS
 import requests
 from bs4 import BeautifulSoup
 import sqlite3
+import os
+import sys
+
+# 공용 수집 모듈(scripts/) 경로 추가
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import gnjoy_client
 
 app = Flask(__name__)
 CORS(app)
@@ -12,10 +18,9 @@ def scrape_and_save_to_db(item_name):
     print(f"--- '{item_name}' 스크래핑 시작 ---")
     url = "https://ro.gnjoy.com/itemDeal/itemDealList.asp"
     params = {'itemFullName': item_name}
-    headers = {'User-Agent': 'Mozilla/5.0'}
 
     try:
-        response = requests.get(url, params=params, headers=headers, timeout=10)
+        response = gnjoy_client.get(url, params=params, timeout=10)
         response.raise_for_status()
         print(f"응답 상태: {response.status_code}")
     except requests.exceptions.RequestException as e:
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+ro.gnjoy.com 노점 목록 로컬 대역 서버 (벤치마크 / 회귀 테스트용, 표준 라이브러리만 사용)
+
+    python scripts/debug/gnjoy_standin.py --port 8765 --rows 95 --latency-ms 80 --throttle-rate 0.05
+    GNJOY_DEAL_URL=http://127.0.0.1:8765/itemdeal/itemDealList.asp python python-crawler-server.py --dev
+
+- /itemdeal/itemDealList.asp : page_content.html 을 틀로 페이지를 합성
+  (검색어/svrID/curpage 마다 결정적인 행, 한 페이지 10행, 마지막 이후 페이지는 검색 결과 없음 화면)
+- /itemdeal/dealSearch.asp, / : dealSearch.html (검색 첫 화면)
+- POST .../upload, .../upload/delta : collector 업로드를 받아서 건수만 세고 savedCount 응답
+- /__stats : 요청/페이지/행/429/업로드 통계 (JSON)
+- 지연: --latency-ms (+ --jitter-ms), 429 주입: --throttle-rate (확률) / --rate-limit (초당 요청 수 초과 시)
+
+debug_vending_output.html 은 인코딩이 깨진 "검색 결과 없음" 응답이라 틀로 쓰지 않고 같은 구조로 직접 만든다.
+"""
+import os
+import re
+import gzip
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from html import escape
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+DEBUG_DIR = os.path.dirname(os.path.abspath(__file__))
+PAGE_TEMPLATE = os.path.join(DEBUG_DIR, "page_content.html")
+SEARCH_PAGE = os.path.join(DEBUG_DIR, "dealSearch.html")
+
+ROWS_PER_PAGE = 10
+DEFAULT_ROWS = 95
+
+SERVER_NAMES = {"129": "바포메트", "130": "이그드라실", "131": "이프리트", "729": "이프리트"}
+
+NO_RESULT_ROW = """
+          <tr>
+            <td class="noList" colspan="5">
+
+              검색 결과가 없습니다.<br /><br />
+
+            </td>
+          </tr>
+"""
+
+_TBODY_RE = re.compile(r"(<tbody>)(.*?)(\s*</tbody>)", re.S)
+_ROW_RE = re.compile(r"\s*<tr>.*?</tr>", re.S)
+_TOTAL_RE = re.compile(r"<strong>\d+건</strong>")
+_PAGING_RE = re.compile(r'(<span class="pagingNav">)(.*?)(</span>\s*</div>)', re.S)
+
+
+class PageTemplate:
+    """page_content.html 을 (앞부분, 행 틀 목록, 뒷부분) 으로 나눠서 페이지 합성"""
+
+    def __init__(self, path=PAGE_TEMPLATE):
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        match = _TBODY_RE.search(html)
+        self.head = html[:match.end(1)]
+        self.rows = _ROW_RE.findall(match.group(2))
+        self.tail = html[match.start(3):]
+
+    def _row(self, keyword, svr_id, index):
+        """index 번째 목록 행 (검색어/svrID/index 로 가격·상점명·거래 ID 가 정해짐)"""
+        row = self.rows[index % len(self.rows)]
+        seed = int(hashlib.md5(f"{svr_id}|{keyword}|{index}".encode("utf-8")).hexdigest()[:8], 16)
+        server_name = SERVER_NAMES.get(svr_id, "바포메트")
+        row = re.sub(r"<td>[^<]*</td>", f"<td>{server_name}</td>", row, count=1)
+        row = re.sub(r"CallItemDealView\((\d+),(\d+),'\d+'", rf"CallItemDealView({svr_id},\2,'{seed}{index:06d}'", row)
+        row = re.sub(r'(<td class="quantity">)\d+', rf"\g<1>{seed % 5 + 1}", row)
+        row = re.sub(r'(<span class="priceLv\d">)[\d,]+', lambda m: f"{m.group(1)}{(seed % 5000 + 1) * 1000:,}", row)
+        row = re.sub(r'(<td class="shop [^"]*">)([^<]*)', lambda m: f"{m.group(1)}{m.group(2)} {index + 1}", row)
+        return row
+
+    def _paging(self, keyword, page, last_page):
+        block = (page - 1) // 10 * 10
+        links = []
+        for n in range(block + 1, min(block + 10, last_page) + 1):
+            if n == page:
+                links.append(f"<em>{n}</em>")
+            else:
+                links.append(f"<a href=\"javascript:CallItemDealList(-1,'{escape(keyword)}', '', '',{n})\" title=\"{n}페이지\">{n}</a>")
+        return '<span class="pageNav_first">첫목록</span><span class="pageNav_prev">이전</span>' + " ".join(links)
+
+    def render(self, keyword, svr_id, page, total):
+        """(HTML, 행 수) 반환. 마지막 페이지 이후면 검색 결과 없음 화면"""
+        start = (page - 1) * ROWS_PER_PAGE
+        count = max(0, min(ROWS_PER_PAGE, total - start))
+        if count:
+            body = "".join(self._row(keyword, svr_id, start + i) for i in range(count))
+            head = _TOTAL_RE.sub(f"<strong>{total}건</strong>", self.head)
+        else:
+            body = NO_RESULT_ROW
+            head = _TOTAL_RE.sub('<span class="noResult"></span>', self.head)
+        last_page = max(1, -(-total // ROWS_PER_PAGE))
+        tail = _PAGING_RE.sub(lambda m: m.group(1) + self._paging(keyword, page, last_page) + m.group(3), self.tail)
+        return head + body + tail, count
+
+
+class StandinStats:
+    """스레드 안전한 카운터 묶음"""
+
+    FIELDS = ("requests", "pages", "rows", "empty_pages", "throttled", "uploads", "uploaded_rows")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.values = dict.fromkeys(self.FIELDS, 0)
+
+    def add(self, **deltas):
+        with self.lock:
+            for key, value in deltas.items():
+                self.values[key] += value
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.values)
+
+
+class RequestLimiter:
+    """초당 요청 수 제한 (넘으면 429). rate 가 0 이면 제한 없음"""
+
+    def __init__(self, rate):
+        self.rate = float(rate)
+        self.tokens = self.rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def allow(self):
+        if self.rate <= 0:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive (gnjoy_client 공유 Session 과 같은 조건)
+    server_version = "gnjoy-standin/1.0"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status, body, content_type="text/html; charset=utf-8", headers=None):
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _delay(self):
+        server = self.server
+        delay = server.latency + random.uniform(-server.jitter, server.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _throttled(self):
+        server = self.server
+        if not server.limiter.allow() or random.random() < server.throttle_rate:
+            server.stats.add(throttled=1)
+            self._send(429, "Too Many Requests", "text/plain; charset=utf-8",
+                       {"Retry-After": str(server.retry_after)})
+            return True
+        return False
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        path = url.path.lower()
+        self.server.stats.add(requests=1)
+
+        if path == "/__stats":
+            self._send(200, json.dumps(self.server.stats.snapshot()), "application/json")
+            return
+
+        if path.endswith("/itemdeallist.asp"):
+            self._delay()
+            if self._throttled():
+                return
+            query = parse_qs(url.query)
+            keyword = query.get("itemFullName", [""])[0]
+            svr_id = query.get("svrID", ["129"])[0]
+            try:
+                page = max(1, int(query.get("curpage", ["1"])[0]))
+            except ValueError:
+                page = 1
+            html, count = self.server.template.render(keyword, svr_id, page, self.server.total_rows)
+            self.server.stats.add(pages=1, rows=count, empty_pages=0 if count else 1)
+            self._send(200, html)
+            return
+
+        if path in ("/", "/itemdeal/", "/itemdeal/dealsearch.asp"):
+            self._delay()
+            self._send(200, self.server.search_page)
+            return
+
+        self._send(404, "Not Found", "text/plain; charset=utf-8")
+
+    def do_POST(self):
+        path = urlsplit(self.path).path.lower()
+        self.server.stats.add(requests=1)
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+        if not (path.endswith("/upload") or path.endswith("/upload/delta")):
+            self._send(404, "Not Found", "text/plain; charset=utf-8")
+            return
+
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        payload = json.loads(body or b"[]")
+        if isinstance(payload, dict):
+            saved, removed = len(payload.get("upserts", [])), len(payload.get("removals", []))
+        else:
+            saved, removed = len(payload), 0
+        self.server.stats.add(uploads=1, uploaded_rows=saved + removed)
+        self._send(200, json.dumps({"savedCount": saved, "removedCount": removed}), "application/json")
+
+
+class StandinServer(ThreadingHTTPServer):
+    """대역 서버. start() 로 백그라운드 스레드 실행 (벤치마크 하네스에서 같은 프로세스로 띄울 때)"""
+
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, total_rows=DEFAULT_ROWS, latency_ms=0.0, jitter_ms=0.0,
+                 throttle_rate=0.0, rate_limit=0.0, retry_after=1, verbose=False):
+        super().__init__((host, port), StandinHandler)
+        self.template = PageTemplate()
+        with open(SEARCH_PAGE, encoding="utf-8") as f:
+            self.search_page = f.read()
+        self.total_rows = total_rows
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.throttle_rate = throttle_rate
+        self.limiter = RequestLimiter(rate_limit)
+        self.retry_after = retry_after
+        self.verbose = verbose
+        self.stats = StandinStats()
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def deal_url(self):
+        return f"{self.base_url}/itemdeal/itemDealList.asp"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, name="gnjoy-standin", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ro.gnjoy.com 노점 목록 로컬 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="검색어마다 합성할 목록 수 (10행/페이지)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="응답 지연 (페이지 요청마다)")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="지연 ± 편차")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="429 를 돌려줄 확률 (0~1)")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="초당 요청 수 제한 (초과 시 429, 0 = 없음)")
+    parser.add_argument("--retry-after", type=int, default=1, help="429 응답의 Retry-After (초)")
+    parser.add_argument("--verbose", action="store_true", help="요청마다 접근 로그 출력")
+    args = parser.parse_args()
+
+    server = StandinServer(args.host, args.port, args.rows, args.latency_ms, args.jitter_ms,
+                           args.throttle_rate, args.rate_limit, args.retry_after, args.verbose)
+    print(f"[Standin] {server.deal_url} rows={args.rows} latency={args.latency_ms}ms "
+          f"throttle={args.throttle_rate} rate_limit={args.rate_limit}/s")
+    print(f"[Standin] GNJOY_DEAL_URL={server.deal_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"[Standin] stats: {server.stats.snapshot()}")
+
+
+if __name__ == "__main__":
+    main()
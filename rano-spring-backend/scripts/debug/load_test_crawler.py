@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+python-crawler-server.py 부하 테스트 (/api/vending 동시 요청 처리량 측정)
+
+    python scripts/debug/load_test_crawler.py --url http://127.0.0.1:5002 --concurrency 32 --duration 15
+
+- 스레드마다 keep-alive 연결 1개로 검색어 목록을 돌아가며 요청
+- 결과: 총 요청 수, 초당 요청 수, 지연시간 p50/p95/p99, 오류 수
+- 같은 DB/검색어로 개발 서버(--dev)와 운영 모드(gunicorn 등)를 각각 실행해서 비교
+  (처음 보는 검색어는 크롤링이 일어나므로 미리 한 번씩 조회해두고 측정)
+"""
+import time
+import json
+import argparse
+import threading
+import http.client
+from urllib.parse import urlsplit, urlencode
+
+DEFAULT_ITEMS = ["천공", "진노", "포링 카드", "데프트", ""]
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def worker(base, items, size, deadline, latencies, errors, offset):
+    url = urlsplit(base)
+    conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=90)
+    i = offset
+    while time.perf_counter() < deadline:
+        item = items[i % len(items)]
+        i += 1
+        path = "/api/vending?" + urlencode({"item": item, "size": size})
+        start = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            resp = conn.getresponse()
+            body = resp.read()
+            if resp.status != 200:
+                errors.append(f"HTTP {resp.status}")
+                continue
+            json.loads(body)
+        except (OSError, http.client.HTTPException, ValueError) as e:
+            errors.append(type(e).__name__)
+            conn.close()
+            conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=90)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+def warmup(base, items, size):
+    """검색어마다 한 번씩 조회 (DB 에 없으면 여기서 크롤링되도록)"""
+    url = urlsplit(base)
+    conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=90)
+    for item in items:
+        conn.request("GET", "/api/vending?" + urlencode({"item": item, "size": size}))
+        conn.getresponse().read()
+    conn.close()
+
+
+def run(base, items, concurrency, duration, size):
+    latencies = []
+    errors = []
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=worker, args=(base, items, size, deadline, latencies, errors, n))
+        for n in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="크롤러 서버 /api/vending 부하 테스트")
+    parser.add_argument("--url", default="http://127.0.0.1:5002")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--size", type=int, default=10)
+    parser.add_argument("--items", nargs="*", default=DEFAULT_ITEMS, help="돌아가며 조회할 검색어")
+    parser.add_argument("--warmup", action="store_true", help="측정 전에 검색어마다 한 번씩 조회")
+    args = parser.parse_args()
+
+    if args.warmup:
+        warmup(args.url, args.items, args.size)
+
+    print(f"[LoadTest] {args.url} concurrency={args.concurrency} duration={args.duration}s")
+    result = run(args.url, args.items, args.concurrency, args.duration, args.size)
+    for key, value in result.items():
+        print(f"  {key:>8}: {value}")
+
+
+if __name__ == "__main__":
+    main()
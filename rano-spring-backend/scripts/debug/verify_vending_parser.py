@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+vending_parser golden-file 검증
+- 저장된 공홈 HTML (page_content.html, debug_vending_output.html, debug_page_structure.html) 을
+  lxml / BeautifulSoup 두 경로로 파싱해서 vending_parser_golden.json 과 비교
+- golden 은 기존 collect_and_upload.parse_vending_page (BeautifulSoup html.parser) 출력으로 생성됨
+  (item_id 는 나중에 추가: 이미지 src 파일명 숫자, 없으면 null)
+- 마지막에 경로별 파싱 속도 출력
+"""
+import os
+import sys
+import json
+import time
+
+DEBUG_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(DEBUG_DIR, '..'))
+import vending_parser
+
+GOLDEN_FILE = os.path.join(DEBUG_DIR, 'vending_parser_golden.json')
+BENCH_ROUNDS = 200
+
+
+def load_html(name):
+    with open(os.path.join(DEBUG_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def check(name, expected, html, use_lxml):
+    label = 'lxml' if use_lxml else 'bs4'
+    failures = []
+
+    items = vending_parser.parse_vending_page(html, 'baphomet', use_lxml=use_lxml)
+    if items != expected['items']:
+        failures.append(f"items: {len(items)}개 (expected {len(expected['items'])}개)")
+
+    rows = [list(row) for row in vending_parser.parse_deal_row_texts(html, use_lxml=use_lxml)]
+    if rows != expected['rows']:
+        failures.append(f"rows: {len(rows)}개 (expected {len(expected['rows'])}개)")
+
+    total = vending_parser.parse_total(html, use_lxml=use_lxml)
+    if total != expected['total']:
+        failures.append(f"total: {total} (expected {expected['total']})")
+
+    status = "[OK]  " if not failures else "[FAIL]"
+    print(f"{status} {name} ({label}): {len(items)} items, total {total}")
+    for failure in failures:
+        print(f"       - {failure}")
+    return not failures
+
+
+def bench(html, use_lxml):
+    start = time.perf_counter()
+    for _ in range(BENCH_ROUNDS):
+        vending_parser.parse_vending_page(html, 'baphomet', use_lxml=use_lxml)
+    return (time.perf_counter() - start) / BENCH_ROUNDS * 1000
+
+
+def main():
+    with open(GOLDEN_FILE, 'r', encoding='utf-8') as f:
+        golden = json.load(f)
+
+    backends = [False]
+    if vending_parser.HAS_LXML:
+        backends.insert(0, True)
+    else:
+        print("[WARN] lxml 미설치 - BeautifulSoup 경로만 검증합니다")
+
+    ok = True
+    for name, expected in golden.items():
+        html = load_html(name)
+        for use_lxml in backends:
+            ok = check(name, expected, html, use_lxml) and ok
+
+    print("\n[Bench] page_content.html 1페이지 파싱 시간")
+    html = load_html('page_content.html')
+    for use_lxml in backends:
+        label = 'lxml' if use_lxml else 'bs4'
+        print(f"  {label}: {bench(html, use_lxml):.3f} ms/page")
+
+    print("\nRESULT:", "PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+gnjoy 페이지 응답 캐시 (디스크, SQLite 파일 1개)
+- 키: URL + 정규화한 파라미터 (빈 값 제거, 이름순 정렬) → svrID/itemFullName/curpage 조합
+- 저장: 본문(zlib), 본문 SHA-256, ETag / Last-Modified, 받은 시각
+- 재요청 시 If-None-Match / If-Modified-Since 를 붙여서 304 면 저장된 본문 재사용
+- parse(): 본문 해시가 지난번과 같으면 저장해 둔 파싱 결과를 그대로 반환 (파서 생략)
+
+collector, Flask 크롤러, compare_v2_vs_gnjoy.py, analyze_set_diff.py 가 같은 캐시를 공유한다.
+경로는 GNJOY_CACHE_PATH 환경변수로 변경 가능.
+"""
+import os
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlencode
+
+import gnjoy_client
+
+DEFAULT_CACHE_PATH = os.environ.get(
+    "GNJOY_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".gnjoy_cache.db")
+)
+
+# 이 기간 동안 조회되지 않은 항목은 prune() 에서 삭제
+MAX_AGE_DAYS = 7
+
+
+def cache_key(url, params=None):
+    """URL + 정규화한 파라미터로 캐시 키 생성"""
+    items = sorted((k, str(v)) for k, v in (params or {}).items() if v not in (None, ""))
+    return f"{url.lower()}?{urlencode(items)}"
+
+
+class ResponseCache:
+    """gnjoy 응답 디스크 캐시"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        with self._db() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    body BLOB,
+                    encoding TEXT,
+                    body_hash TEXT,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL,
+                    parsed_tag TEXT,
+                    parsed_hash TEXT,
+                    parsed_json TEXT
+                )
+            """)
+
+    @contextmanager
+    def _db(self):
+        """잠금 + 연결 열기/커밋/닫기"""
+        with self.lock:
+            conn = sqlite3.connect(self.path, timeout=30)
+            try:
+                yield conn
+                conn.commit()
+            finally:
+                conn.close()
+
+    def _load(self, key):
+        with self._db() as conn:
+            return conn.execute(
+                "SELECT body, encoding, body_hash, etag, last_modified FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+    def fetch(self, url, params=None, timeout=gnjoy_client.DEFAULT_TIMEOUT, **kwargs):
+        """
+        조건부 GET. 반환: requests.Response (+ cache_key, body_hash, unchanged, not_modified 속성)
+        - not_modified: 서버가 304 를 돌려줘서 저장된 본문을 사용했는지
+        - unchanged   : 본문 해시가 지난번 저장한 것과 같은지
+        200/304 가 아니면 캐시를 건드리지 않고 응답을 그대로 반환
+        """
+        key = cache_key(url, params)
+        cached = self._load(key)
+
+        headers = dict(kwargs.pop("headers", None) or {})
+        if cached:
+            if cached[3]:
+                headers["If-None-Match"] = cached[3]
+            if cached[4]:
+                headers["If-Modified-Since"] = cached[4]
+
+        resp = gnjoy_client.get(url, params=params, headers=headers, timeout=timeout, **kwargs)
+        resp.cache_key = key
+        resp.not_modified = False
+        resp.unchanged = False
+        resp.body_hash = None
+
+        if resp.status_code == 304 and cached:
+            # 저장된 본문으로 200 응답처럼 만들어서 반환
+            resp.status_code = 200
+            resp._content = zlib.decompress(cached[0])
+            resp.encoding = cached[1]
+            resp.not_modified = True
+            resp.unchanged = True
+            resp.body_hash = cached[2]
+            self._touch(key)
+            return resp
+
+        if resp.status_code != 200:
+            return resp
+
+        body = resp.content
+        body_hash = hashlib.sha256(body).hexdigest()
+        resp.body_hash = body_hash
+        resp.unchanged = bool(cached) and cached[2] == body_hash
+
+        with self._db() as conn:
+            if resp.unchanged:
+                conn.execute(
+                    "UPDATE responses SET etag = ?, last_modified = ?, fetched_at = ? WHERE key = ?",
+                    (resp.headers.get("ETag"), resp.headers.get("Last-Modified"), time.time(), key)
+                )
+            else:
+                conn.execute("""
+                    INSERT OR REPLACE INTO responses
+                        (key, body, encoding, body_hash, etag, last_modified, fetched_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, (key, zlib.compress(body), resp.encoding, body_hash,
+                      resp.headers.get("ETag"), resp.headers.get("Last-Modified"), time.time()))
+        return resp
+
+    def _touch(self, key):
+        with self._db() as conn:
+            conn.execute("UPDATE responses SET fetched_at = ? WHERE key = ?", (time.time(), key))
+
+    def parse(self, resp, parse_fn, tag):
+        """
+        본문 해시 기준 파싱 결과 memo
+        - tag: 파서 종류 구분 (같은 페이지를 다른 파서로 읽는 경우 대비), 예: 'vending:baphomet'
+        - parse_fn(text) 결과는 JSON 으로 저장 가능해야 함
+        """
+        key = getattr(resp, "cache_key", None)
+        body_hash = getattr(resp, "body_hash", None)
+        if key is None or body_hash is None:
+            return parse_fn(resp.text)
+
+        with self._db() as conn:
+            row = conn.execute(
+                "SELECT parsed_tag, parsed_hash, parsed_json FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row and row[0] == tag and row[1] == body_hash and row[2] is not None:
+            return json.loads(row[2])
+
+        result = parse_fn(resp.text)
+        with self._db() as conn:
+            conn.execute(
+                "UPDATE responses SET parsed_tag = ?, parsed_hash = ?, parsed_json = ? WHERE key = ?",
+                (tag, body_hash, json.dumps(result, ensure_ascii=False), key)
+            )
+        return result
+
+    def prune(self, max_age_days=MAX_AGE_DAYS):
+        """오래된 항목 삭제. 반환: 삭제 건수"""
+        cutoff = time.time() - max_age_days * 86400
+        with self._db() as conn:
+            return conn.execute("DELETE FROM responses WHERE fetched_at < ?", (cutoff,)).rowcount
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """프로세스 공용 ResponseCache 반환"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+    return _cache
+
+
+def fetch(url, params=None, timeout=gnjoy_client.DEFAULT_TIMEOUT, **kwargs):
+    """공용 캐시로 조건부 GET"""
+    return get_cache().fetch(url, params=params, timeout=timeout, **kwargs)
+
+
+def parse(resp, parse_fn, tag):
+    """공용 캐시로 파싱 결과 memo"""
+    return get_cache().parse(resp, parse_fn, tag)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+gnjoy 공용 HTTP 클라이언트
+- 프로세스 전체에서 공유하는 keep-alive Session (TCP/TLS 핸드셰이크 재사용)
+- 기본 헤더 (User-Agent, Accept-Language, Referer)
+- 5xx 재시도 + 지수 backoff. 429 는 재시도하지 않고 바로 반환 (호출자의 429 스킵 / circuit breaker 가 판단)
+- 호스트별 연결 수 제한 (pool_block=True 로 초과 요청은 연결이 빌 때까지 대기)
+
+collector, Flask 크롤러, 분석 스크립트가 모두 이 모듈의 get() 을 사용한다.
+GNJOY_DEAL_URL 환경변수로 노점 목록 URL 을 바꿀 수 있다 (scripts/debug/gnjoy_standin.py 로컬 대역 서버 등).
+"""
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+GNJOY_DEAL_URL = os.environ.get("GNJOY_DEAL_URL", "https://ro.gnjoy.com/itemdeal/itemDealList.asp")
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept-Language": "ko-KR,ko;q=0.9",
+    "Referer": "https://ro.gnjoy.com/"
+}
+
+DEFAULT_TIMEOUT = 15
+
+# 재시도 설정: 5xx 는 최대 2회까지 backoff 후 재시도, 그래도 실패하면 마지막 응답을 그대로 반환
+# 429 는 넣지 않음: 세션 안에서 Retry-After 만큼 기다리면 worker 스레드가 묶이고, 이미 제한 중인 서버에 요청을 더 보냄
+RETRY_TOTAL = 2
+RETRY_BACKOFF = 1.0  # 1s → 2s
+RETRY_STATUSES = (500, 502, 503, 504)
+
+# 호스트당 최대 동시 연결 수 (gnjoy 에 과도한 연결을 열지 않도록 제한)
+MAX_CONNECTIONS_PER_HOST = 4
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _build_session():
+    """재시도/연결 풀 설정이 적용된 Session 생성"""
+    retry = Retry(
+        total=RETRY_TOTAL,
+        backoff_factor=RETRY_BACKOFF,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=False,  # 503 의 긴 Retry-After 로 스레드가 묶이지 않도록 backoff 만 사용
+        raise_on_status=False  # 재시도 소진 시 예외 대신 마지막 응답 반환 (호출자가 429 를 판단)
+    )
+    adapter = HTTPAdapter(
+        max_retries=retry,
+        pool_connections=4,
+        pool_maxsize=MAX_CONNECTIONS_PER_HOST,
+        pool_block=True
+    )
+
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session():
+    """공유 Session 반환 (최초 호출 시 생성)"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def close_session():
+    """공유 Session 종료 (스크립트 종료 시 호출)"""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def get(url, params=None, headers=None, timeout=DEFAULT_TIMEOUT, **kwargs):
+    """공유 Session 으로 GET 요청. headers 는 기본 헤더 위에 덮어쓴다."""
+    return get_session().get(url, params=params, headers=headers, timeout=timeout, **kwargs)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+gnjoy 노점 페이지 동시 수집 엔진
+- asyncio 기반 bounded concurrency window (페이지 N..N+k 병렬 요청)
+- svrID 별 token-bucket rate limiter (프로세스 전체에서 공유)
+- 첫 페이지만 먼저 받아서 마지막 페이지를 정함: 전체 건수(PageResult.total) 또는 짧은 페이지(< page_size)
+  → 없는 페이지에 요청(과 rate-limit 토큰)을 쓰지 않음
+- 건수를 모르면 페이지 N 이 꽉 찬 페이지로 확인되기 전에는 N+concurrency 이후 페이지를 띄우지 않음
+- 빈 페이지/짧은 페이지/오류를 만나면 그 뒤 페이지는 더 이상 요청하지 않음
+
+실제 HTTP 요청/파싱은 호출자가 넘겨주는 동기 함수(fetch_fn)가 담당하고,
+이 모듈은 "언제, 몇 개를 동시에" 요청할지만 결정한다.
+"""
+import time
+import asyncio
+import threading
+from typing import NamedTuple, Optional
+from concurrent.futures import ThreadPoolExecutor
+
+# 기본 설정: 요청 시작 간격을 기존 순차 크롤러의 페이지 간 sleep(0.5초) 이상으로 유지
+# - 기존: 요청(응답 시간 L) + 0.5초 sleep 을 반복 → svrID 당 1 / (L + 0.5) 요청/초 (L=0.3초면 약 1.25)
+# - 현재: svrID 당 최대 1 / OLD_PAGE_DELAY = 2 요청/초, burst 1 (몰아서 보내지 않음)
+#   요청이 겹칠 수 있으므로 응답 시간만큼은 기존보다 빠름 (L=0.3초 기준 최대 1.6배)
+OLD_PAGE_DELAY = 0.5
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RATE = 1 / OLD_PAGE_DELAY   # 초당 토큰 보충 개수 (= svrID 당 초당 최대 요청 수)
+DEFAULT_BURST = 1                   # 버킷 최대 토큰 수 (순간적으로 몰아서 보낼 수 있는 요청 수)
+
+
+class TokenBucket:
+    """
+    스레드 안전한 token-bucket rate limiter
+    - 토큰을 "예약"하는 방식이라 여러 스레드/이벤트 루프에서 동시에 써도 rate 를 넘지 않음
+    - reserve() 는 토큰을 하나 가져가고, 그 토큰을 쓸 수 있을 때까지 기다려야 할 시간(초)을 반환
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, capacity=DEFAULT_BURST):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """토큰 1개 예약 후 대기 시간(초) 반환"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            # 음수가 된 만큼은 미래의 토큰을 미리 당겨쓴 것 → 그만큼 기다려야 함
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        """동기 대기 버전 (스레드에서 사용)"""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        """비동기 대기 버전 (이벤트 루프에서 사용)"""
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class PageResult(NamedTuple):
+    """fetch_fn 반환값 (행 목록만 돌려줘도 됨). total: 검색 결과 전체 건수 (알면, 보통 첫 페이지에서)"""
+    rows: list
+    total: Optional[int] = None
+
+
+# svrID 별 rate limiter (같은 서버에 대한 모든 요청이 하나의 버킷을 공유)
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(svr_id, rate=DEFAULT_RATE, capacity=DEFAULT_BURST):
+    """svrID 에 해당하는 공유 TokenBucket 반환 (없으면 생성)"""
+    with _buckets_lock:
+        bucket = _buckets.get(svr_id)
+        if bucket is None:
+            bucket = TokenBucket(rate, capacity)
+            _buckets[svr_id] = bucket
+        return bucket
+
+
+class PageFetcher:
+    """
+    페이지 범위를 동시에 수집하는 엔진
+
+    fetch_fn(page) -> rows (list) 또는 PageResult. 빈 리스트/None 이면 "마지막 페이지 이후" 로 간주.
+    예외가 발생한 페이지도 기존 크롤러처럼 거기서 수집을 멈춘다.
+    page_size: 한 페이지 최대 행 수 (주면 짧은 페이지를 마지막 페이지로, total 로 마지막 페이지 계산)
+    """
+
+    def __init__(self, fetch_fn, svr_id, concurrency=DEFAULT_CONCURRENCY, bucket=None, page_size=None):
+        self.fetch_fn = fetch_fn
+        self.svr_id = svr_id
+        self.concurrency = max(1, int(concurrency))
+        self.bucket = bucket or get_bucket(svr_id)
+        self.page_size = page_size
+
+    def _is_full(self, rows):
+        return self.page_size is None or len(rows) >= self.page_size
+
+    async def _fetch(self, loop, executor, page):
+        await self.bucket.acquire_async()
+        return await loop.run_in_executor(executor, self.fetch_fn, page)
+
+    async def run(self, start_page=1, max_pages=20, on_page=None):
+        """
+        start_page 부터 최대 max_pages 페이지 수집. 반환: [(page, rows), ...] (페이지 순)
+        on_page(page, rows): 앞 페이지가 모두 도착한 페이지부터 순서대로 즉시 호출 (스트리밍용)
+        """
+        loop = asyncio.get_running_loop()
+        end_page = start_page + max_pages - 1
+        stop_page = end_page + 1  # 첫 빈 페이지 번호 (이 페이지부터는 버림)
+        known_end = False         # total 로 마지막 페이지를 알았는지
+        confirmed = start_page - 1  # 여기까지는 모두 꽉 찬 페이지 (다음 페이지가 있을 수 있음)
+        results = {}
+        pending = {}
+        next_page = start_page
+        next_emit = start_page
+
+        def window_end():
+            """지금 띄워도 되는 마지막 페이지 번호"""
+            if known_end:
+                return stop_page - 1
+            if confirmed < start_page:
+                return start_page  # 첫 페이지는 혼자 먼저
+            return confirmed + self.concurrency
+
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        try:
+            while pending or next_page < min(stop_page, window_end() + 1):
+                # 동시 요청 창(window) 채우기
+                while len(pending) < self.concurrency and next_page < min(stop_page, window_end() + 1):
+                    task = asyncio.ensure_future(self._fetch(loop, executor, next_page))
+                    pending[task] = next_page
+                    next_page += 1
+
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    page = pending.pop(task)
+                    try:
+                        rows = task.result()
+                    except Exception as e:
+                        print(f"[Fetcher] 페이지 {page} 수집 오류: {e}")
+                        rows = None
+
+                    if isinstance(rows, PageResult):
+                        if rows.total is not None and self.page_size:
+                            last_page = max(-(-rows.total // self.page_size), page if rows.rows else 0)
+                            stop_page = min(stop_page, last_page + 1)
+                            known_end = True
+                        rows = rows.rows
+
+                    if rows:
+                        results[page] = rows
+                        if not self._is_full(rows):
+                            stop_page = min(stop_page, page + 1)
+                    else:
+                        stop_page = min(stop_page, page)
+
+                while confirmed + 1 in results and self._is_full(results[confirmed + 1]):
+                    confirmed += 1
+
+                # 연속으로 도착한 페이지는 바로 전달 (이후 빈 페이지가 나와도 이 페이지들은 유효)
+                while on_page is not None and next_emit < stop_page and next_emit in results:
+                    on_page(next_emit, results[next_emit])
+                    next_emit += 1
+
+                # 마지막 페이지 뒤쪽으로 이미 띄워둔 요청은 취소 (아직 토큰 대기 중이면 요청 자체가 안 나감)
+                for task, page in list(pending.items()):
+                    if page >= stop_page:
+                        task.cancel()
+                        del pending[task]
+        finally:
+            executor.shutdown(wait=False)
+
+        return [(page, results[page]) for page in sorted(results) if page < stop_page]
+
+
+def fetch_pages(fetch_fn, svr_id, start_page=1, max_pages=20, concurrency=DEFAULT_CONCURRENCY, on_page=None,
+                page_size=None):
+    """동기 코드(Flask 핸들러 등)에서 호출하는 진입점"""
+    fetcher = PageFetcher(fetch_fn, svr_id, concurrency=concurrency, page_size=page_size)
+    return asyncio.run(fetcher.run(start_page, max_pages, on_page))
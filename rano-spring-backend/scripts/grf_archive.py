@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+GRF(0x200) 아카이브 리더 - mmap + 파일 테이블 인덱스
+- data.grf 를 한 번 열어서 mmap, 헤더와 파일 테이블(zlib)을 한 번만 풀어서 경로 → 엔트리 인덱스를 만든다
+- 경로 검색은 대소문자/구분자('/', '\\') 무시 dict 조회 (O(1)), 파일 이름만으로도 조회 가능
+- 파일 내용은 read() 할 때만 mmap 구간을 잘라서 zlib 해제 (목록만 볼 때는 압축을 풀지 않음)
+- extract_many() 는 여러 경로를 ThreadPoolExecutor 로 동시에 풀어서 저장 (zlib 해제는 GIL 을 놓음)
+- DES 암호화 엔트리(구버전 0x103 계열)는 지원하지 않음
+
+    python scripts/grf_archive.py data.grf list --suffix .lub
+    python scripts/grf_archive.py data.grf extract "data\\luafiles514\\lua files\\datainfo\\iteminfo.lub" --out scripts/extracted
+"""
+import os
+import re
+import mmap
+import zlib
+import struct
+import argparse
+from typing import NamedTuple
+from concurrent.futures import ThreadPoolExecutor
+
+GRF_SIGNATURE = b'Master of Magic'
+HEADER_SIZE = 46
+_HEADER = struct.Struct('<15sx14sIIII')   # signature, key, table offset, seed, raw count, version
+_TABLE_HEADER = struct.Struct('<II')      # compressed size, uncompressed size
+_ENTRY = struct.Struct('<iiiBI')          # compressed, aligned, size, flags, offset
+_TABLE_ENTRY_RE = re.compile(rb'([^\0]*)\0(.{%d})' % _ENTRY.size, re.S)
+
+GRF_FLAG_FILE = 0x01
+GRF_FLAG_MIXCRYPT = 0x02
+GRF_FLAG_DES = 0x04
+
+DEFAULT_WORKERS = 4
+
+
+class GrfEntry(NamedTuple):
+    """파일 테이블 엔트리 1개 (offset 은 헤더 뒤 기준)"""
+    path: str
+    compressed_size: int
+    aligned_size: int
+    size: int
+    flags: int
+    offset: int
+
+    @property
+    def encrypted(self):
+        return bool(self.flags & (GRF_FLAG_MIXCRYPT | GRF_FLAG_DES))
+
+
+def normalize_path(path):
+    """GRF 경로 비교용 키: 구분자 '\\', 소문자"""
+    return path.replace('/', '\\').lower()
+
+
+class GrfArchive:
+    """mmap 한 GRF 아카이브 (with 문으로 사용)"""
+
+    def __init__(self, path, encoding='cp949'):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.entries = self._read_table(encoding)
+        except Exception:
+            self.close()
+            raise
+        self.files = [entry.path for entry in self.entries]
+        keys = normalize_path('\0'.join(self.files)).split('\0') if self.files else []
+        self.index = dict(zip(keys, self.entries))
+        self._by_name = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if getattr(self, '_map', None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, path):
+        return normalize_path(path) in self.index
+
+    # ---------- 파일 테이블 ----------
+
+    def _read_table(self, encoding):
+        data = self._map
+        if len(data) < HEADER_SIZE:
+            raise ValueError(f"GRF 헤더보다 작은 파일: {self.path}")
+        signature, _, table_offset, seed, raw_count, version = _HEADER.unpack_from(data, 0)
+        if signature != GRF_SIGNATURE:
+            raise ValueError(f"GRF 파일이 아님: {self.path}")
+        if version >> 8 != 0x2:
+            raise ValueError(f"지원하지 않는 GRF 버전 0x{version:x} (0x200 만 지원)")
+        self.version = version
+        count = raw_count - seed - 7
+
+        start = HEADER_SIZE + table_offset
+        compressed_size, table_size = _TABLE_HEADER.unpack_from(data, start)
+        start += _TABLE_HEADER.size
+        table = zlib.decompress(data[start:start + compressed_size], 0, table_size)
+
+        # 엔트리 = 이름 + \0 + 17바이트 고정 필드. 이름은 한 번에 디코딩, 고정 필드는 iter_unpack 으로 한 번에
+        records = _TABLE_ENTRY_RE.findall(table)
+        if len(records) != count:
+            raise ValueError(f"파일 테이블 엔트리 수가 다름: header {count:,}, table {len(records):,}")
+        raw_names = [name for name, _ in records]
+        names = b'\0'.join(raw_names).decode(encoding, errors='replace').split('\0')
+        if len(names) != count:
+            names = [name.decode(encoding, errors='replace') for name in raw_names]
+        columns = zip(*_ENTRY.iter_unpack(b''.join([meta for _, meta in records])))
+        entries = map(GrfEntry, names, *columns)
+        return [entry for entry in entries if entry.flags & GRF_FLAG_FILE]
+
+    # ---------- 조회 ----------
+
+    def find(self, path):
+        """경로(대소문자/구분자 무시) → GrfEntry, 없으면 None"""
+        return self.index.get(normalize_path(path))
+
+    def find_name(self, name):
+        """파일 이름만으로 조회 (여러 폴더에 있으면 전부). 이름 인덱스는 처음 부를 때 만든다"""
+        if self._by_name is None:
+            self._by_name = {}
+            for key, entry in self.index.items():
+                self._by_name.setdefault(key[key.rfind('\\') + 1:], []).append(entry)
+        return list(self._by_name.get(normalize_path(name), ()))
+
+    def match(self, prefix='', suffix=''):
+        """prefix 폴더 아래 suffix 로 끝나는 엔트리 (대소문자 무시)"""
+        prefix, suffix = normalize_path(prefix), normalize_path(suffix)
+        return [entry for key, entry in self.index.items() if key.startswith(prefix) and key.endswith(suffix)]
+
+    # ---------- 읽기 ----------
+
+    def read(self, path_or_entry):
+        """파일 내용 (이때만 압축 해제)"""
+        entry = path_or_entry if isinstance(path_or_entry, GrfEntry) else self.find(path_or_entry)
+        if entry is None:
+            raise KeyError(path_or_entry)
+        if entry.encrypted:
+            raise ValueError(f"암호화된 GRF 엔트리는 지원하지 않음: {entry.path}")
+        start = HEADER_SIZE + entry.offset
+        return zlib.decompress(self._map[start:start + entry.compressed_size], 0, entry.size)
+
+    def extract(self, path_or_entry, output_dir, flatten=False):
+        """파일 하나를 output_dir 아래로 저장. 반환: 저장 경로"""
+        entry = path_or_entry if isinstance(path_or_entry, GrfEntry) else self.find(path_or_entry)
+        if entry is None:
+            raise KeyError(path_or_entry)
+        if flatten:
+            output_path = os.path.join(output_dir, entry.path.replace('\\', '_').replace('/', '_'))
+        else:
+            output_path = os.path.join(output_dir, *entry.path.replace('/', '\\').split('\\'))
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        content = self.read(entry)
+        with open(output_path, 'wb') as f:
+            f.write(content)
+        return output_path
+
+    def extract_many(self, paths, output_dir, workers=DEFAULT_WORKERS, flatten=False):
+        """
+        여러 경로(또는 엔트리)를 worker 여러 개로 동시에 저장
+        반환: [(path, 저장 경로 또는 None, 오류 또는 None)] (입력 순서)
+        """
+        def run(item):
+            try:
+                return str(getattr(item, 'path', item)), self.extract(item, output_dir, flatten), None
+            except (KeyError, ValueError, OSError, zlib.error) as e:
+                return str(getattr(item, 'path', item)), None, e
+
+        paths = list(paths)
+        if workers <= 1 or len(paths) <= 1:
+            return [run(item) for item in paths]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(run, paths))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GRF 아카이브 목록/추출 (mmap + 파일 테이블 인덱스)")
+    parser.add_argument("grf")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    listing = sub.add_parser("list", help="파일 목록")
+    listing.add_argument("--prefix", default="")
+    listing.add_argument("--suffix", default="")
+
+    extract = sub.add_parser("extract", help="파일 추출")
+    extract.add_argument("paths", nargs="+", help="GRF 내부 경로 (대소문자 무시)")
+    extract.add_argument("--out", default=".")
+    extract.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    extract.add_argument("--flatten", action="store_true", help="폴더 구조 대신 경로를 '_' 로 이은 파일 이름으로 저장")
+
+    args = parser.parse_args()
+
+    with GrfArchive(args.grf) as grf:
+        print(f"[GRF] {args.grf}: 0x{grf.version:x}, {len(grf):,} files")
+        if args.command == "list":
+            for entry in grf.match(args.prefix, args.suffix):
+                print(f"  {entry.path}  ({entry.size:,} bytes)")
+        else:
+            for path, output_path, error in grf.extract_many(args.paths, args.out, args.workers, args.flatten):
+                print(f"  {'✓' if error is None else '✗'} {path} → {output_path or error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,131 +2,107 @@
 """
 GRF Item Extractor for Ragnarok Online
 게임 클라이언트의 data.grf에서 아이템 정보를 추출합니다.
+(grf_archive.GrfArchive: mmap + 파일 테이블 인덱스, --icons 면 아이콘 스프라이트도 함께 추출)
 """
 
 import os
 import sys
 import json
 import sqlite3
-import re
 from pathlib import Path
 
+from iteminfo_lua import iter_items
+from grf_archive import GrfArchive, DEFAULT_WORKERS
+
 # GRF 파일 경로 설정
 GRF_PATH = r"C:\Users\KJM\Desktop\게임\Ragnarok_250317\data.grf"
 DB_PATH = r"e:\RAG\rano-spring-backend\ro_market.db"
 OUTPUT_DIR = r"e:\RAG\rano-spring-backend\scripts\extracted"
 
-def test_grf_access():
-    """GRF 파일 접근 테스트"""
+# GRF 에서 꺼낼 클라이언트 파일 (폴더와 관계없이 파일 이름으로 찾음)
+CLIENT_FILE_NAMES = {
+    'iteminfo': ('iteminfo.lub', 'iteminfo.lua', 'iteminfo_true.lub'),
+    'skillinfolist': ('skillinfolist.lub', 'skillinfolist.lua'),
+    'skilldescript': ('skilldescript.lub', 'skilldescript.lua'),
+}
+
+# --icons: 아이템 아이콘(bmp) / 아이템 스프라이트
+ICON_FOLDERS = [
+    ('data\\texture\\유저인터페이스\\item\\', '.bmp'),
+    ('data\\sprite\\아이템\\', '.spr'),
+    ('data\\sprite\\아이템\\', '.act'),
+]
+
+
+def test_grf_access(grf):
+    """GRF 파일 접근 테스트 (열린 GrfArchive 의 파일 테이블 인덱스 사용)"""
     print("=" * 50)
     print("GRF 파일 접근 테스트")
     print("=" * 50)
     
-    try:
-        from PyGRF import PyGRF
-        print(f"✓ PyGRF 라이브러리 로드 성공")
-    except ImportError as e:
-        print(f"✗ PyGRF 라이브러리 로드 실패: {e}")
-        return False
+    file_size = os.path.getsize(grf.path) / (1024 * 1024 * 1024)
+    print(f"✓ GRF 파일 열기 성공: {file_size:.2f} GB (0x{grf.version:x})")
+    print(f"  - 총 파일 수: {len(grf):,}")
     
-    if not os.path.exists(GRF_PATH):
-        print(f"✗ GRF 파일을 찾을 수 없습니다: {GRF_PATH}")
-        return False
+    # iteminfo 관련 파일 찾기
+    item_files = [entry.path for entry in grf.entries if 'iteminfo' in entry.path.lower()]
+    system_files = [entry.path for entry in grf.match('system\\', '.lub') + grf.match('system\\', '.lua')]
     
-    file_size = os.path.getsize(GRF_PATH) / (1024 * 1024 * 1024)
-    print(f"✓ GRF 파일 발견: {file_size:.2f} GB")
+    print(f"\n아이템 관련 파일:")
+    for f in item_files[:20]:  # 처음 20개만 표시
+        print(f"  - {f}")
     
-    try:
-        print("GRF 파일 열기 시도 중...")
-        grf = GrfFile(GRF_PATH)
-        file_count = len(grf.files)
-        print(f"✓ GRF 파일 열기 성공")
-        print(f"  - 총 파일 수: {file_count:,}")
-        
-        # iteminfo 관련 파일 찾기
-        item_files = []
-        system_files = []
-        for file_path in grf.files:
-            lower_path = file_path.lower()
-            if 'iteminfo' in lower_path:
-                item_files.append(file_path)
-            if 'system' in lower_path and (lower_path.endswith('.lub') or lower_path.endswith('.lua')):
-                system_files.append(file_path)
-        
-        print(f"\n아이템 관련 파일:")
-        for f in item_files[:20]:  # 처음 20개만 표시
-            print(f"  - {f}")
-        
-        if len(item_files) > 20:
-            print(f"  ... 외 {len(item_files) - 20}개")
-        
-        print(f"\nSystem 폴더 Lua 파일:")
-        for f in system_files[:20]:
-            print(f"  - {f}")
-        
-        if len(system_files) > 20:
-            print(f"  ... 외 {len(system_files) - 20}개")
-        
-        grf.close()
-        return True
-        
-    except Exception as e:
-        print(f"✗ GRF 파일 열기 실패: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+    if len(item_files) > 20:
+        print(f"  ... 외 {len(item_files) - 20}개")
+    
+    print(f"\nSystem 폴더 Lua 파일:")
+    for f in system_files[:20]:
+        print(f"  - {f}")
+    
+    if len(system_files) > 20:
+        print(f"  ... 외 {len(system_files) - 20}개")
+    
+    return True
 
 
-def extract_iteminfo():
-    """iteminfo.lub 파일을 추출합니다."""
-    from pygrf import GrfFile
-    
+def extract_client_files(grf, icons=False, workers=DEFAULT_WORKERS):
+    """
+    iteminfo / skillinfolist / skilldescript (+ icons 면 아이콘 스프라이트)를 한 번에 추출합니다.
+    경로는 파일 테이블 인덱스로 찾고, 압축 해제/저장은 worker 여러 개로 동시에.
+    반환: {종류: [저장 경로]}
+    """
     print("\n" + "=" * 50)
-    print("iteminfo 파일 추출")
+    print("클라이언트 파일 추출")
     print("=" * 50)
     
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     
-    grf = GrfFile(GRF_PATH)
+    kinds = {}
+    for kind, names in CLIENT_FILE_NAMES.items():
+        for name in names:
+            for entry in grf.find_name(name):
+                kinds[entry.path] = kind
     
-    # 찾을 파일 목록
-    target_files = [
-        'data\\lua files\\datainfo\\iteminfo.lub',
-        'data\\lua files\\datainfo\\iteminfo.lua',
-        'data\\luafiles514\\lua files\\datainfo\\iteminfo.lub',
-        'data\\luafiles514\\lua files\\datainfo\\iteminfo.lua',
-        'System\\iteminfo.lub',
-        'System\\iteminfo.lua',
-    ]
+    extracted = {kind: [] for kind in CLIENT_FILE_NAMES}
+    for path, output_path, error in grf.extract_many(list(kinds), OUTPUT_DIR, workers, flatten=True):
+        if error is None:
+            print(f"✓ 추출 완료: {path}")
+            print(f"  -> {output_path} ({os.path.getsize(output_path):,} bytes)")
+            extracted[kinds[path]].append(output_path)
+        else:
+            print(f"✗ 추출 실패 ({path}): {error}")
     
-    extracted = []
-    for target in target_files:
-        # 대소문자 무시하고 검색
-        for file_path in grf.files:
-            if file_path.lower() == target.lower() or file_path.lower().endswith(target.lower().split('\\')[-1]):
-                try:
-                    content = grf.read(file_path)
-                    output_name = file_path.replace('\\', '_').replace('/', '_')
-                    output_path = os.path.join(OUTPUT_DIR, output_name)
-                    
-                    with open(output_path, 'wb') as f:
-                        f.write(content)
-                    
-                    print(f"✓ 추출 완료: {file_path}")
-                    print(f"  -> {output_path} ({len(content):,} bytes)")
-                    extracted.append(output_path)
-                except Exception as e:
-                    print(f"✗ 추출 실패 ({file_path}): {e}")
+    if icons:
+        icon_entries = [entry for prefix, suffix in ICON_FOLDERS for entry in grf.match(prefix, suffix)]
+        icon_dir = os.path.join(OUTPUT_DIR, 'icons')
+        results = grf.extract_many(icon_entries, icon_dir, workers)
+        extracted['icons'] = [output_path for _, output_path, error in results if error is None]
+        print(f"✓ 아이콘 {len(extracted['icons']):,}/{len(icon_entries):,}개 추출 → {icon_dir}")
     
-    grf.close()
-    
-    if not extracted:
+    if not extracted['iteminfo']:
         print("✗ iteminfo 파일을 찾을 수 없습니다.")
-        # 파일 목록에서 유사한 파일 검색
-        print("\n사용 가능한 lua/lub 파일 목록 검색 중...")
-        grf = GrfFile(GRF_PATH)
-        lua_files = [f for f in grf.files if f.lower().endswith(('.lua', '.lub'))]
-        grf.close()
+        # 같은 인덱스에서 lua/lub 파일 목록 검색
+        lua_files = [entry.path for entry in grf.match(suffix='.lua') + grf.match(suffix='.lub')]
         
         print(f"총 {len(lua_files)}개의 Lua 파일 발견")
         for f in lua_files[:50]:
@@ -137,53 +113,31 @@ def extract_iteminfo():
     return extracted
 
 
+def extract_iteminfo(grf):
+    """iteminfo.lub 파일을 추출합니다. (extract_client_files 중 iteminfo 만)"""
+    return extract_client_files(grf)['iteminfo']
+
+
 def parse_iteminfo_lua(lua_content):
-    """Lua 형식의 iteminfo를 파싱합니다."""
+    """
+    Lua 형식의 iteminfo를 파싱합니다. (iteminfo_lua 공용 토크나이저, 문자열 escape 디코딩 포함)
+    컴파일된 .lub 는 lua_string_extractor 의 바이트코드 디코더로 테이블을 복원합니다.
+    """
     items = {}
     
-    # 바이너리인 경우 디코딩 시도
-    if isinstance(lua_content, bytes):
-        try:
-            lua_content = lua_content.decode('utf-8')
-        except:
-            try:
-                lua_content = lua_content.decode('euc-kr')
-            except:
-                print("✗ 파일 디코딩 실패 (바이너리 .lub 파일일 수 있음)")
-                return items
-    
-    # 아이템 정의 패턴 찾기
-    # [아이템ID] = { ... } 형식
-    pattern = r'\[(\d+)\]\s*=\s*\{([^}]+)\}'
-    matches = re.findall(pattern, lua_content, re.DOTALL)
-    
-    for item_id, item_data in matches:
-        item = {'id': int(item_id)}
-        
-        # 각 필드 파싱
-        fields = {
-            'unidentifiedDisplayName': r'unidentifiedDisplayName\s*=\s*"([^"]*)"',
-            'identifiedDisplayName': r'identifiedDisplayName\s*=\s*"([^"]*)"',
-            'slotCount': r'slotCount\s*=\s*(\d+)',
-            'ClassNum': r'ClassNum\s*=\s*(\d+)',
+    for record in iter_items(lua_content):
+        if not record.identified_name:
+            continue
+        item = {
+            'id': record.id,
+            'unidentifiedDisplayName': record.unidentified_name,
+            'identifiedDisplayName': record.identified_name,
+            'slotCount': record.slots,
+            'ClassNum': record.class_num,
         }
-        
-        for field_name, field_pattern in fields.items():
-            match = re.search(field_pattern, item_data)
-            if match:
-                value = match.group(1)
-                if field_name in ['slotCount', 'ClassNum']:
-                    value = int(value)
-                item[field_name] = value
-        
-        # 설명 파싱 (여러 줄)
-        desc_match = re.search(r'identifiedDescriptionName\s*=\s*\{([^}]+)\}', item_data, re.DOTALL)
-        if desc_match:
-            desc_lines = re.findall(r'"([^"]*)"', desc_match.group(1))
-            item['description'] = '\n'.join(desc_lines)
-        
-        if item.get('identifiedDisplayName'):
-            items[int(item_id)] = item
+        if record.identified_description:
+            item['description'] = record.description_text()
+        items[record.id] = item
     
     return items
 
@@ -251,13 +205,16 @@ def main():
     print("  라그나로크 온라인 아이템 추출기")
     print("=" * 60)
     
-    # 1. GRF 접근 테스트
-    if not test_grf_access():
+    if not os.path.exists(GRF_PATH):
+        print(f"✗ GRF 파일을 찾을 수 없습니다: {GRF_PATH}")
         print("\n[실패] GRF 파일에 접근할 수 없습니다.")
         return 1
     
-    # 2. iteminfo 추출
-    extracted_files = extract_iteminfo()
+    # 1~2. GRF 를 한 번만 열어서(mmap) 접근 테스트 + iteminfo/스킬 파일 추출
+    with GrfArchive(GRF_PATH) as grf:
+        test_grf_access(grf)
+        extracted = extract_client_files(grf, icons='--icons' in sys.argv)
+    extracted_files = extracted['iteminfo']
     
     if not extracted_files:
         print("\n[경고] iteminfo 파일을 찾을 수 없습니다.")
@@ -276,12 +233,9 @@ def main():
             with open(file_path, 'rb') as f:
                 content = f.read()
             
-            # 컴파일된 Lua인지 확인
+            # 컴파일된 Lua 바이트코드도 그대로 (상수 테이블 디코더)
             if content.startswith(b'\x1bLua'):
-                print("  -> 컴파일된 Lua 바이트코드입니다.")
-                print("  -> unluac 디컴파일러가 필요합니다.")
-                # TODO: unluac 실행
-                continue
+                print("  -> 컴파일된 Lua 바이트코드 (Lua 5.1 청크 디코딩)")
             
             items = parse_iteminfo_lua(content)
             print(f"  -> {len(items):,}개 아이템 파싱됨")
@@ -296,13 +250,13 @@ def main():
         print("\n[완료] 아이템 추출 및 저장이 완료되었습니다!")
     else:
         print("\n[경고] 파싱된 아이템이 없습니다.")
-        print(".lub 파일의 경우 unluac 디컴파일러가 필요합니다.")
     
     return 0
 
 
 if __name__ == '__main__':
     if len(sys.argv) > 1 and sys.argv[1] == '--test':
-        test_grf_access()
+        with GrfArchive(GRF_PATH) as grf:
+            test_grf_access(grf)
     else:
         sys.exit(main())
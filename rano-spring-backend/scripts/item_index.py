@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+아이템 이름 → ID 인덱스 (collector 파싱 단계에서 item_id 를 채우기 위함)
+- 이름 정규화는 백엔드 VendingCollectorService.normalizeItemName 과 같은 규칙
+- 정확 일치: 정렬된 이름 배열 + bisect (O(log n))
+- prefix 일치: 같은 정렬 배열에서 [prefix, prefix + U+FFFF) 범위의 첫 항목
+- 포함 일치: 글자 3-gram → 이름 위치 목록 (posting), 가장 짧은 posting 의 이름만 실제 포함 여부 확인
+  (3글자 미만 검색어는 전체 순회). 포함하는 이름이 한 아이템뿐일 때만 사용 - 여러 개면 None
+  (백엔드는 item_id 가 있으면 이름 매칭을 건너뛰므로, 애매하면 틀린 ID 보다 null 이 낫다)
+- 같은 이름이 여러 ID 면 가장 작은 ID 사용
+
+items 테이블(id, name_kr)에서 만들어 gzip TSV(ITEM_INDEX_PATH, 기본 scripts/item_index.tsv.gz)로 저장하고,
+collector 는 이 파일만 읽는다 (GitHub Actions 에는 DB 도 iteminfo.lua 도 없으므로).
+→ load_items_from_lua.py 가 다시 만든 파일을 git 에 커밋해야 CI collector 가 사용함
+  (vending-collector.yml 은 파일이 없으면 경고만 하고 이미지 src 의 item_id 로 진행)
+
+    python scripts/item_index.py export --db ro_market.db
+    python scripts/item_index.py lookup "천공의 룬 크라운(임페리얼 가드)[1]"
+"""
+import os
+import re
+import gzip
+import sqlite3
+import argparse
+from array import array
+from bisect import bisect_left
+
+DEFAULT_INDEX_PATH = os.environ.get(
+    "ITEM_INDEX_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "item_index.tsv.gz")
+)
+
+NGRAM = 3
+
+_REFINE_RE = re.compile(r"^\+\d+\s+")
+_GRADE_RE = re.compile(r"\[(RARE|UNIQUE|LEGENDARY|EPIC)\]\s*")
+_SUFFIX_PAREN_RE = re.compile(r"\s*\([^)]*\)\s*$")
+_SUFFIX_SLOT_RE = re.compile(r"\s*\[\d+\]\s*$")
+
+
+def normalize_item_name(name):
+    """'+7 [RARE]천공의 임페리얼 스피어[2]' → '천공의 임페리얼 스피어' (백엔드 normalizeItemName 과 동일)"""
+    if not name:
+        return ""
+    name = _REFINE_RE.sub("", name)
+    name = _GRADE_RE.sub("", name)
+    name = _SUFFIX_PAREN_RE.sub("", name)
+    name = _SUFFIX_SLOT_RE.sub("", name)
+    return name.strip()
+
+
+def _ngrams(text):
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+class ItemIndex:
+    """정렬 배열 + 3-gram posting 기반 이름 → ID 조회"""
+
+    def __init__(self, pairs):
+        """pairs: (name, id) 반복자"""
+        best = {}
+        for name, item_id in pairs:
+            name = (name or "").strip()
+            if name and (name not in best or item_id < best[name]):
+                best[name] = item_id
+        self.names = sorted(best)
+        self.ids = array("i", (best[name] for name in self.names))
+
+        postings = {}
+        for position, name in enumerate(self.names):
+            for gram in _ngrams(name):
+                postings.setdefault(gram, array("I")).append(position)
+        self.postings = postings
+        self.memo = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    # ---------- 조회 ----------
+
+    def exact(self, name):
+        i = bisect_left(self.names, name)
+        if i < len(self.names) and self.names[i] == name:
+            return self.ids[i]
+        return None
+
+    def prefix(self, prefix):
+        i = bisect_left(self.names, prefix)
+        if i < len(self.names) and self.names[i].startswith(prefix):
+            return self.ids[i]
+        return None
+
+    def contains(self, keyword):
+        """keyword 를 포함하는 이름이 한 ID 뿐일 때만 그 ID (여러 아이템이면 엉뚱한 ID 가 되므로 None)"""
+        if len(keyword) < NGRAM:
+            candidates = range(len(self.names))
+        else:
+            # 가장 짧은 posting 만 훑으면서 실제 포함 여부 확인
+            candidates = None
+            for gram in _ngrams(keyword):
+                posting = self.postings.get(gram)
+                if posting is None:
+                    return None
+                if candidates is None or len(posting) < len(candidates):
+                    candidates = posting
+
+        found = None
+        for position in candidates:
+            if keyword in self.names[position]:
+                if found is not None and found != self.ids[position]:
+                    return None
+                found = self.ids[position]
+        return found
+
+    def resolve(self, item_name):
+        """정규화 이름으로 정확 → prefix → 포함(유일할 때만) 순서로 조회 (결과는 이름별로 memo)"""
+        key = normalize_item_name(item_name)
+        if not key:
+            return None
+        if key in self.memo:
+            return self.memo[key]
+        item_id = self.exact(key)
+        if item_id is None:
+            item_id = self.prefix(key)
+        if item_id is None:
+            item_id = self.contains(key)
+        self.memo[key] = item_id
+        return item_id
+
+    # ---------- 저장 / 불러오기 ----------
+
+    @classmethod
+    def from_db(cls, db_path, table="items"):
+        conn = sqlite3.connect(db_path)
+        try:
+            rows = conn.execute(
+                f"SELECT name_kr, id FROM {table} WHERE name_kr IS NOT NULL AND name_kr != ''"
+            ).fetchall()
+        finally:
+            conn.close()
+        return cls(rows)
+
+    def save(self, path=DEFAULT_INDEX_PATH):
+        """id<TAB>name 한 줄씩 (이름 순) gzip 저장. posting 은 불러올 때 다시 만든다"""
+        with gzip.open(path, "wt", encoding="utf-8", newline="\n") as f:
+            for name, item_id in zip(self.names, self.ids):
+                clean = name.replace("\t", " ").replace("\n", " ")
+                f.write(f"{item_id}\t{clean}\n")
+
+    @classmethod
+    def load(cls, path=DEFAULT_INDEX_PATH):
+        def pairs():
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    item_id, _, name = line.rstrip("\n").partition("\t")
+                    yield name, int(item_id)
+        return cls(pairs())
+
+
+def load_item_index(path=DEFAULT_INDEX_PATH):
+    """인덱스 파일이 있으면 ItemIndex, 없으면 None (item_id 는 이미지 src 로만 채움)"""
+    if not os.path.exists(path):
+        return None
+    return ItemIndex.load(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="아이템 이름 → ID 인덱스 생성/조회")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export = sub.add_parser("export", help="items 테이블에서 인덱스 파일 생성")
+    export.add_argument("--db", default="ro_market.db")
+    export.add_argument("--out", default=DEFAULT_INDEX_PATH)
+
+    lookup = sub.add_parser("lookup", help="인덱스 파일로 이름 조회")
+    lookup.add_argument("names", nargs="+")
+    lookup.add_argument("--index", default=DEFAULT_INDEX_PATH)
+
+    args = parser.parse_args()
+
+    if args.command == "export":
+        index = ItemIndex.from_db(args.db)
+        index.save(args.out)
+        print(f"[ItemIndex] {len(index):,} names, {len(index.postings):,} trigrams → {args.out} "
+              f"({os.path.getsize(args.out):,} bytes)")
+    else:
+        index = load_item_index(args.index)
+        if index is None:
+            print(f"[ItemIndex] 인덱스 파일 없음: {args.index}")
+            return
+        for name in args.names:
+            print(f"  {name} → {normalize_item_name(name)} → {index.resolve(name)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+items 테이블 증분 재적재 (iteminfo 기준, SQLite / Postgres 공용)
+- items.content_hash: 아이템 1개의 (name_kr, description, slots) SHA-256. Lua 에서 적재한 행에만 있음
+- item_source_files: 마지막으로 적재한 원본 파일의 SHA-256 / 크기 / 라인 수 / 아이템 수
+  → 파일 해시가 같으면 파싱도 DB 쓰기도 하지 않음
+- 파일이 바뀌었으면 새로 파싱한 아이템 해시를 DB 에 저장된 해시와 비교해서
+  추가(inserted) / 변경(changed) / 삭제(removed) 된 아이템만 쓴다 (나머지 행은 건드리지 않음)
+  · content_hash 가 NULL 인 기존 행(해시 도입 전 적재, 다른 소스에서 추가)은 같은 ID 가 Lua 에 있으면 변경으로 보고,
+    Lua 에 없으면 지우지 않는다
+  · autofill / divine-pride 가 description 을 덮어쓴 행은 Lua 쪽 아이템이 바뀌지 않는 한 그대로 유지
+  · 해시 도입 후 첫 실행은 기존 행이 전부 content_hash NULL 이라 Lua 에 있는 행을 모두 한 번 다시 쓴다
+- update_columns: 기존 행에 덮어쓸 컬럼 (Postgres 는 description / slots 만 - 운영에서 손본 name_kr 유지)
+  해시도 이 컬럼만으로 계산해서 덮어쓰지 않는 컬럼만 바뀐 아이템은 변경으로 보지 않음
+- 쓰기는 한 트랜잭션 (commit 은 호출하는 쪽)
+
+    from item_sync import SQLITE, ensure_item_sync_schema, stored_file_hash, sync_items, record_source_file
+"""
+import hashlib
+from typing import NamedTuple
+
+SOURCE_FILES_TABLE = "item_source_files"
+
+# 아이템 내용 컬럼 (INSERT 는 항상 전부, UPDATE 는 update_columns 만)
+CONTENT_COLUMNS = ('name_kr', 'description', 'slots')
+
+
+class SqlDialect(NamedTuple):
+    """DB 별 차이: placeholder, 일괄 실행 함수 (psycopg2 는 execute_batch)"""
+    name: str
+    placeholder: str
+
+    def executemany(self, cursor, sql, rows):
+        if self.name == "postgres":
+            from psycopg2.extras import execute_batch
+            execute_batch(cursor, sql, rows, page_size=500)
+        else:
+            cursor.executemany(sql, rows)
+
+    def sql(self, text):
+        return text.replace("?", self.placeholder)
+
+
+SQLITE = SqlDialect("sqlite", "?")
+POSTGRES = SqlDialect("postgres", "%s")
+
+
+class ItemDiff(NamedTuple):
+    inserted: list
+    changed: list
+    removed: list
+    unchanged: int
+
+    @property
+    def writes(self):
+        return len(self.inserted) + len(self.changed) + len(self.removed)
+
+
+def item_hash(item, columns=CONTENT_COLUMNS):
+    """item 의 columns 값 → SHA-256 hex (필드 구분자 \\x1f, None 은 \\x00)"""
+    parts = ["\0" if item[column] is None else str(item[column]) for column in columns]
+    return hashlib.sha256("\x1f".join(parts).encode('utf-8')).hexdigest()
+
+
+def hash_items(items, columns=CONTENT_COLUMNS):
+    """{id: item} → {id: content_hash} (sync_items 의 update_columns 와 같은 컬럼으로)"""
+    return {item_id: item_hash(item, columns) for item_id, item in items.items()}
+
+
+# ---------- 스키마 ----------
+
+def ensure_item_sync_schema(conn, dialect=SQLITE):
+    """items.content_hash 컬럼과 item_source_files 테이블 생성 (이미 있으면 그대로)"""
+    cursor = conn.cursor()
+    if dialect.name == "postgres":
+        cursor.execute("ALTER TABLE items ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)")
+    else:
+        cursor.execute("PRAGMA table_info(items)")
+        if 'content_hash' not in {row[1] for row in cursor.fetchall()}:
+            cursor.execute("ALTER TABLE items ADD COLUMN content_hash VARCHAR(64)")
+            print("[SCHEMA] Added 'content_hash' column")
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {SOURCE_FILES_TABLE} (
+            source VARCHAR(20) PRIMARY KEY,
+            path TEXT,
+            sha256 VARCHAR(64),
+            size BIGINT,
+            line_count INTEGER,
+            item_count INTEGER,
+            loaded_at TIMESTAMP
+        )
+    """)
+    conn.commit()
+
+
+# ---------- 원본 파일 해시 ----------
+
+def stored_file_hash(conn, source, dialect=SQLITE):
+    """마지막으로 적재한 원본 파일 SHA-256 (없으면 None)"""
+    cursor = conn.cursor()
+    cursor.execute(dialect.sql(f"SELECT sha256 FROM {SOURCE_FILES_TABLE} WHERE source = ?"), (source,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def record_source_file(conn, source, path, info, item_count, loaded_at, dialect=SQLITE):
+    """적재한 원본 파일 정보 저장 (get_file_info 결과)"""
+    cursor = conn.cursor()
+    cursor.execute(dialect.sql(f"""
+        INSERT INTO {SOURCE_FILES_TABLE} (source, path, sha256, size, line_count, item_count, loaded_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (source) DO UPDATE SET
+            path = excluded.path, sha256 = excluded.sha256, size = excluded.size,
+            line_count = excluded.line_count, item_count = excluded.item_count, loaded_at = excluded.loaded_at
+    """), (source, path, info['sha256'], info['size'], info['line_count'], item_count, loaded_at))
+
+
+# ---------- 아이템 diff ----------
+
+def stored_item_hashes(conn):
+    """items 의 {id: content_hash} (해시 없는 행은 None)"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT id, content_hash FROM items")
+    return dict(cursor.fetchall())
+
+
+def diff_items(hashes, stored):
+    """새 해시 {id: hash} 와 DB 해시 {id: hash | None} 비교"""
+    inserted, changed = [], []
+    for item_id, content_hash in hashes.items():
+        if item_id not in stored:
+            inserted.append(item_id)
+        elif stored[item_id] != content_hash:
+            changed.append(item_id)
+    removed = [item_id for item_id, old in stored.items() if old is not None and item_id not in hashes]
+    unchanged = len(hashes) - len(inserted) - len(changed)
+    return ItemDiff(sorted(inserted), sorted(changed), sorted(removed), unchanged)
+
+
+def sync_items(conn, items, hashes, diff, now, extra_columns=None, update_columns=CONTENT_COLUMNS, dialect=SQLITE):
+    """
+    diff 대상 행만 INSERT / UPDATE / DELETE (commit 은 호출하는 쪽)
+    extra_columns: 같이 쓸 고정 컬럼 {'source': 'LUA', 'source_updated_at': now} 등
+    update_columns: 기존 행(changed, INSERT 충돌)에서 덮어쓸 내용 컬럼 (새 행은 CONTENT_COLUMNS 전부 INSERT)
+    """
+    extra_columns = extra_columns or {}
+    tail = ['content_hash', *extra_columns, 'updated_at']
+    constants = [*extra_columns.values(), now]
+    insert_columns = [*CONTENT_COLUMNS, *tail]
+    update_set = [*update_columns, *tail]
+
+    def values(item_id, columns):
+        item = items[item_id]
+        return [item[column] for column in columns] + [hashes[item_id], *constants]
+
+    cursor = conn.cursor()
+    if diff.inserted:
+        # 해시 조회 뒤에 다른 프로세스가 넣은 행이 있어도 실패하지 않도록 UPSERT
+        placeholders = ", ".join("?" for _ in range(len(insert_columns) + 1))
+        updates = ", ".join(f"{column} = excluded.{column}" for column in update_set)
+        dialect.executemany(cursor, dialect.sql(
+            f"INSERT INTO items (id, {', '.join(insert_columns)}) VALUES ({placeholders}) "
+            f"ON CONFLICT (id) DO UPDATE SET {updates}"
+        ), [[item_id, *values(item_id, CONTENT_COLUMNS)] for item_id in diff.inserted])
+    if diff.changed:
+        assignments = ", ".join(f"{column} = ?" for column in update_set)
+        dialect.executemany(cursor, dialect.sql(
+            f"UPDATE items SET {assignments} WHERE id = ?"
+        ), [[*values(item_id, update_columns), item_id] for item_id in diff.changed])
+    if diff.removed:
+        dialect.executemany(cursor, dialect.sql("DELETE FROM items WHERE id = ?"),
+                            [(item_id,) for item_id in diff.removed])
+    return diff.writes
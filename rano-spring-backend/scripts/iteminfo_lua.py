@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+iteminfo.lua 공용 파서 (토크나이저 한 번 통과)
+- 파일을 bytes 로 읽어서 토큰 정규식 하나로 앞에서부터 한 번만 훑음 (아이템 블록마다 re.search 반복 없음)
+- `tbl = { [ID] = { 필드 = 값, ... }, ... }` 의 최상위 테이블만 읽고, 그 뒤(main 함수 등)는 보지 않음
+- 중첩 중괄호는 깊이로 추적, 문자열 안의 { } " 는 문자열 토큰이 통째로 먹으므로 설명 테이블이 잘리지 않음
+- 문자열의 \\NNN(10진수 바이트) / \\n 등 escape 는 아이템 DECODE_BATCH 개씩 모아서 한 번에 풀고 (decode_lua_strings),
+  UTF-8 이 아니면 CP949(EUC-KR 상위 호환)로 디코딩
+- iter_items() 는 ItemRecord 를 파일 순서대로 yield (스트리밍, 묶음 단위)
+- workers > 1 을 넘기면 아이템 시작 줄에서 샤드로 나눠 ProcessPoolExecutor + SharedMemory 로 병렬 파싱 (parse_sharded)
+  기본은 한 프로세스: 프로세스 생성 + 결과 pickle 비용 때문에 코어가 충분하지 않으면 오히려 느림
+- 컴파일된 .lub(itemInfo_true.lub 등)를 넘기면 lua_string_extractor 의 Lua 5.1 청크 디코더 결과를 같은 형태로 yield
+
+load_items_from_lua, parse_iteminfo, restore_from_lua, grf_item_extractor, autofill_remaining 이 이 모듈을 사용한다.
+벤치마크: scripts/debug/bench_iteminfo_parser.py
+"""
+import os
+import re
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+from typing import NamedTuple, Tuple
+
+LUA_SIGNATURE = b'\x1bLua'
+
+# 문자열 본문: unrolled loop (문자 클래스가 서로 겹치지 않아 되돌아가지 않음).
+# 소유 수량자(*+)는 Python 3.11 부터라 쓰지 않음
+_STRING = rb'"([^"\\]*(?:\\.[^"\\]*)*)"'
+
+# 토큰 (그룹 순서가 iter_items 의 groups() 언패킹 순서). 앞의 공백/쉼표는 토큰에 포함시켜 C 쪽에서 건너뜀
+#   1 [정수] = {
+#   2 필드 이름 =, 3~7 그 값 (문자열 / 문자열만 있는 테이블 본문 / { / 숫자 / true·false·nil)
+#   8 문자열 (배열 원소), 9 {, 10 }
+#   주석은 그룹 없이 매칭해서 건너뜀
+# 설명 테이블 `name = { "..", ".." }` 은 통째로 토큰 하나 (줄마다 토큰을 만들지 않음)
+_TOKEN_RE = re.compile(
+    rb'[\s,;]*(?:'
+    rb'\[\s*(-?\d+)\s*\]\s*=\s*\{'
+    rb'|([A-Za-z_]\w*)\s*=\s*(?:' + _STRING +
+    rb'|\{((?:[\s,;]*"[^"\\]*(?:\\.[^"\\]*)*")*)[\s,;]*\}'
+    rb'|(\{)|(-?\d+(?:\.\d+)?)|(true|false|nil))?'
+    rb'|' + _STRING +
+    rb'|(\{)|(\})'
+    rb'|--\[\[.*?\]\]|--[^\n]*)',
+    re.S
+)
+_LIST_STRING_RE = re.compile(_STRING)
+
+_ESCAPE_RE = re.compile(rb'\\(\d{1,3}|.)', re.S)
+_SIMPLE_ESCAPES = {
+    b'n': b'\n', b't': b'\t', b'r': b'\r', b'a': b'\a', b'b': b'\b', b'f': b'\f', b'v': b'\v',
+    b'\\': b'\\', b'"': b'"', b"'": b"'", b'\n': b'\n',
+}
+_ESCAPES = dict(_SIMPLE_ESCAPES)
+for _n in range(256):
+    for _text in {b'%d' % _n, b'%02d' % _n, b'%03d' % _n}:
+        _ESCAPES[_text] = bytes([_n])
+
+
+def _unescape(match):
+    return _ESCAPES.get(match.group(1), match.group(1))
+
+
+def _decode_bytes(raw):
+    try:
+        return raw.decode('utf-8')
+    except UnicodeDecodeError:
+        return raw.decode('cp949', errors='replace')
+
+
+def decode_lua_string(raw):
+    """Lua 문자열 리터럴 내용(bytes, 따옴표 제외) → str"""
+    if not raw:
+        return ''
+    if isinstance(raw, str):
+        raw = raw.encode('utf-8', errors='surrogateescape')
+    if b'\\' in raw:
+        raw = _ESCAPE_RE.sub(_unescape, raw)
+    return _decode_bytes(raw)
+
+
+# ---------- 여러 문자열 한 번에 디코딩 ----------
+# unluac 출력은 한글 바이트가 전부 \NNN 이라 escape 가 문자열 길이의 대부분이다.
+# escape 마다 파이썬 콜백을 부르지 않도록, 문자열들을 \x00 으로 이어 붙인 뒤
+#   1) \\ 와 \" 는 bytes.replace 로 \092 / \034 로 바꾸고, 그 밖의 3자리 10진수가 아닌 escape(\n, \7 ...)가
+#      남아 있으면 그때만 정규식으로 \NNN 형태로 맞춤 (드묾)
+#   2) b'\\' 로 split → 각 조각의 앞 3글자가 10진수 → 자릿수별 translate + 큰 정수 덧셈으로 전부 한 번에 바이트 변환
+#   3) 나머지 조각을 b'%c' 로 이어 붙인 서식 문자열에 변환된 바이트를 % 로 채우고, 통째로 디코딩한 뒤 \x00 으로 다시 나눔
+_IRREGULAR_ESCAPE_RE = re.compile(rb'\\(\d\d?(?!\d)|\D|25[6-9]|2[6-9]\d|[3-9]\d\d)', re.S)
+_DIGIT_TABLES = tuple(
+    bytes.maketrans(b'0123456789', bytes(min(d * scale, 255) for d in range(10)))
+    for scale in (100, 10, 1)
+)
+_HEAD = itemgetter(slice(None, 3))
+_TAIL = itemgetter(slice(3, None))
+
+
+def _regular_escape(match):
+    value = _ESCAPES.get(match.group(1))
+    if value is None:
+        return match.group(1)  # \256 이상 등 잘못된 escape 는 글자 그대로
+    return b'\\%03d' % value[0]
+
+
+def _split_escapes(joined):
+    """
+    b'\\' 로 나눈 조각과 escape 숫자들 (조각마다 앞 3글자). 3자리 10진수가 아닌 escape 가 있으면 digits=None
+    (\\256 이상은 Lua 에서도 문법 오류라 따로 검사하지 않음)
+    """
+    pieces = joined.split(b'\\')
+    digits = b''.join(map(_HEAD, pieces[1:]))
+    if len(digits) != 3 * (len(pieces) - 1) or not digits.isdigit() or max(digits[0::3]) > ord('2'):
+        return pieces, None
+    return pieces, digits
+
+
+def decode_lua_strings(raws):
+    """decode_lua_string 을 여러 문자열에 한 번에 적용 (결과는 같은 순서의 list)"""
+    if not raws:
+        return []
+    joined = b'\x00'.join(raws)
+    if b'\\' in joined:
+        if joined.count(b'\x00') != len(raws) - 1:
+            return [decode_lua_string(raw) for raw in raws]
+        template = joined.replace(b'%', b'%%')
+        pieces, digits = _split_escapes(template.replace(b'\\\\', b'\\092').replace(b'\\"', b'\\034'))
+        if digits is None:
+            pieces, digits = _split_escapes(_IRREGULAR_ESCAPE_RE.sub(_regular_escape, template))
+        if digits is None:
+            return [decode_lua_string(raw) for raw in raws]
+        values = sum(
+            int.from_bytes(digits[i::3].translate(table), 'big') for i, table in enumerate(_DIGIT_TABLES)
+        ).to_bytes(len(pieces) - 1, 'big')
+        if b'\x00' in values:
+            return [decode_lua_string(raw) for raw in raws]  # \0 바이트가 섞이면 구분자와 겹치므로 하나씩
+        pieces[1:] = map(_TAIL, pieces[1:])
+        joined = b'%c'.join(pieces) % tuple(values)
+    return _decode_joined(joined)
+
+
+def decode_raw_strings(raws):
+    """escape 가 없는 원본 바이트 문자열들(.lub 상수 등) → str list (UTF-8, 아니면 CP949)"""
+    if not raws:
+        return []
+    joined = b'\x00'.join(raws)
+    if joined.count(b'\x00') != len(raws) - 1:
+        return [_decode_bytes(raw) for raw in raws]
+    return _decode_joined(joined)
+
+
+def _decode_joined(joined):
+    """\x00 으로 이어 붙인 바이트 → 통째로 디코딩한 뒤 다시 나눔"""
+    for encoding in ('utf-8', 'cp949'):
+        try:
+            return joined.decode(encoding).split('\x00')
+        except UnicodeDecodeError:
+            pass
+    return [_decode_bytes(raw) for raw in joined.split(b'\x00')]  # 인코딩이 섞인 파일
+
+
+class ItemRecord(NamedTuple):
+    """iteminfo.lua 아이템 1개 (없는 필드는 None / 빈 tuple / 0)"""
+    id: int
+    unidentified_name: str
+    identified_name: str
+    unidentified_description: Tuple[str, ...]
+    identified_description: Tuple[str, ...]
+    slots: int
+    class_num: int
+    costume: bool
+
+    @property
+    def name(self):
+        """표시 이름 (identified 우선)"""
+        return self.identified_name or self.unidentified_name
+
+    def description_text(self, separator='\n', fallback=False):
+        """identifiedDescriptionName 줄을 합친 문자열 (없으면 None, fallback 이면 unidentified 설명 사용)"""
+        lines = self.identified_description or (self.unidentified_description if fallback else ())
+        return separator.join(lines) if lines else None
+
+
+_TEXT_FIELDS = (b'unidentifiedDisplayName', b'identifiedDisplayName')
+_LINES_FIELDS = (b'unidentifiedDescriptionName', b'identifiedDescriptionName')
+
+# 문자열 디코딩을 몇 개 아이템씩 모아서 한 번에 (decode_lua_strings)
+DECODE_BATCH = 1024
+
+
+def _number(value):
+    return int(float(value)) if isinstance(value, bytes) else 0
+
+
+def _records(pending):
+    """(item_id, fields) 목록 → ItemRecord 목록 (문자열은 한 번에 디코딩)"""
+    raws = []
+    for _, fields in pending:
+        for key in _TEXT_FIELDS:
+            raw = fields.get(key)
+            if isinstance(raw, bytes):
+                raws.append(raw)
+        for key in _LINES_FIELDS:
+            raw = fields.get(key)
+            if isinstance(raw, list):
+                raws.extend(raw)
+    decoded = iter(decode_lua_strings(raws))
+
+    records = []
+    for item_id, fields in pending:
+        texts = [next(decoded) if isinstance(fields.get(key), bytes) else None for key in _TEXT_FIELDS]
+        lines = [
+            tuple(next(decoded) for _ in fields[key]) if isinstance(fields.get(key), list) else ()
+            for key in _LINES_FIELDS
+        ]
+        records.append(ItemRecord(
+            id=item_id,
+            unidentified_name=texts[0],
+            identified_name=texts[1],
+            unidentified_description=lines[0],
+            identified_description=lines[1],
+            slots=_number(fields.get(b'slotCount')),
+            class_num=_number(fields.get(b'ClassNum')),
+            costume=fields.get(b'costume') == b'true',
+        ))
+    return records
+
+
+def _scan(data, pos=0, endpos=None, depth=0, started=False, state=None):
+    """
+    data[pos:endpos] 의 토큰을 훑으면서 ItemRecord 를 DECODE_BATCH 개씩 yield
+    depth / started: 시작 위치의 중괄호 깊이 (샤드는 최상위 테이블 안 depth 1 에서 시작)
+    state: 넘기면 끝난 뒤 {'depth', 'item_open', 'closed'} 를 채움 (샤드 경계 검증용)
+    """
+    item_id = None
+    fields = None
+    list_field = None
+    lines = None
+    pending = []
+    closed = False
+
+    for match in _TOKEN_RE.finditer(data, pos, len(data) if endpos is None else endpos):
+        key, name, value_str, value_list, value_open, value_num, value_word, string, open_brace, close_brace = \
+            match.groups()
+
+        if name is not None:
+            if depth == 2 and item_id is not None:
+                if value_str is not None:
+                    fields[name] = value_str
+                elif value_list is not None:
+                    fields[name] = _LIST_STRING_RE.findall(value_list)
+                elif value_num is not None:
+                    fields[name] = value_num
+                elif value_word is not None:
+                    fields[name] = value_word
+            if value_open is not None:
+                depth += 1
+                if depth == 1:
+                    started = True
+                elif depth == 3 and item_id is not None:
+                    # 문자열 외의 값이 섞인 테이블: 같은 깊이의 문자열만 모음
+                    list_field, lines = name, []
+
+        elif key is not None:
+            depth += 1
+            if depth == 2 and started:
+                item_id = int(key)
+                fields = {}
+
+        elif string is not None:
+            if lines is not None and depth == 3:
+                lines.append(string)
+
+        elif open_brace is not None:
+            depth += 1
+            if depth == 1:
+                started = True
+
+        elif close_brace is not None:
+            if lines is not None and depth == 3:
+                fields[list_field] = lines
+                list_field, lines = None, None
+            depth -= 1
+            if depth == 1 and item_id is not None:
+                pending.append((item_id, fields))
+                item_id, fields = None, None
+                if len(pending) >= DECODE_BATCH:
+                    yield from _records(pending)
+                    pending = []
+            elif depth == 0 and started:
+                closed = True
+                break
+
+    yield from _records(pending)
+    if state is not None:
+        state.update(depth=depth, item_open=item_id is not None, closed=closed)
+
+
+def iter_items(data, workers=1):
+    """
+    iteminfo.lua 내용(bytes 또는 str) → ItemRecord 를 파일 순서대로 yield (중복 ID 도 그대로)
+    최상위 테이블이 닫히면 멈춤. 컴파일된 .lub(\\x1bLua) 내용이면 lua_string_extractor.iter_lub_items 결과
+    workers > 1 이면 아이템 경계에서 나눠 프로세스 여러 개로 파싱 (parse_sharded, 결과 순서는 같음)
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8', errors='surrogateescape')
+    if data.startswith(LUA_SIGNATURE):
+        # 컴파일된 .lub 는 상수 테이블 디코더로 (lua_string_extractor 가 이 모듈을 import 하므로 여기서 import)
+        from lua_string_extractor import iter_lub_items
+        yield from iter_lub_items(data)
+        return
+    if workers > 1:
+        yield from parse_sharded(data, workers)
+        return
+    yield from _scan(data)
+
+
+# ---------- 샤드 병렬 파싱 ----------
+
+# 샤드 경계 후보: 줄 맨 앞의 `[ID] = {` (따옴표 문자열은 줄을 넘지 않으므로 문자열 안일 수 없음)
+_ITEM_LINE_RE = re.compile(rb'\n[ \t]*\[\s*-?\d+\s*\]\s*=\s*\{')
+
+# 샤드 하나의 최소 크기: 프로세스 생성 + 결과 pickle 비용을 넘길 만큼 커야 함
+# (30k 아이템 / 37MB 파일에서 pickle 왕복만 약 0.5s)
+MIN_SHARD_BYTES = 8 << 20
+
+
+def _block_comment_end(data, pos):
+    """pos 가 여러 줄 --[[ ]] 주석 안이면 주석이 끝난 위치, 아니면 None"""
+    opening = data.rfind(b'--[[', 0, pos)
+    if opening == -1:
+        return None
+    closing = data.find(b']]', opening + 4)
+    if closing != -1 and closing < pos:
+        return None
+    return len(data) if closing == -1 else closing + 2
+
+
+def shard_bounds(data, shards):
+    """
+    data 를 아이템 시작 줄에서 shards 개 이하로 나눈 [(start, end)] (비슷한 크기, 경계는 줄 맨 앞)
+    --[[ ]] 주석 안의 `[ID] = {` 줄은 경계로 쓰지 않음
+    """
+    bounds = [0]
+    for n in range(1, shards):
+        position = max(len(data) * n // shards, bounds[-1] + 1)
+        while True:
+            match = _ITEM_LINE_RE.search(data, position)
+            if match is None:
+                break
+            comment_end = _block_comment_end(data, match.start())
+            if comment_end is None:
+                break
+            position = comment_end
+        if match is None:
+            break
+        bounds.append(match.start() + 1)
+    bounds.append(len(data))
+    return list(zip(bounds, bounds[1:]))
+
+
+def _parse_shard(shm_name, start, end, first, last):
+    """(worker) 공유 메모리의 data[start:end] 파싱. 반환: (records, 경계가 아이템 사이였는지)"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        data = bytes(shm.buf[start:end])
+    finally:
+        shm.close()
+    state = {}
+    if first:
+        records = list(_scan(data, state=state))
+    else:
+        records = list(_scan(data, depth=1, started=True, state=state))
+    # 마지막이 아닌 샤드는 최상위 테이블 안(depth 1)에서 아이템을 다 닫고 끝나야 함
+    valid = last or (state['depth'] == 1 and not state['item_open'] and not state['closed'])
+    return records, valid
+
+
+def parse_sharded(data, workers=None):
+    """
+    iteminfo.lua 내용(bytes)을 아이템 경계에서 샤드로 나눠 ProcessPoolExecutor 로 파싱 → ItemRecord 목록 (파일 순서)
+    - 원본은 SharedMemory 에 한 번만 올리고 worker 는 (이름, 구간)만 받음 (샤드 bytes 를 pickle 하지 않음)
+    - 샤드마다 토큰 훑기 + escape 디코딩을 따로 하므로 코어 수만큼 나뉨
+    - 경계가 중첩 테이블 안에 걸렸으면(검증 실패) 한 프로세스로 다시 파싱
+    - 샤드가 MIN_SHARD_BYTES 보다 작아지면 한 프로세스로 파싱
+    workers: 프로세스 수 (None 이면 CPU 수)
+    """
+    shards = min(workers or os.cpu_count() or 1, len(data) // MIN_SHARD_BYTES)
+    if shards < 2:
+        return list(_scan(data))
+    bounds = shard_bounds(data, shards)
+    if len(bounds) < 2:
+        return list(_scan(data))
+
+    shm = shared_memory.SharedMemory(create=True, size=len(data))
+    try:
+        shm.buf[:len(data)] = data
+        with ProcessPoolExecutor(max_workers=len(bounds)) as executor:
+            futures = [
+                executor.submit(_parse_shard, shm.name, start, end, i == 0, i == len(bounds) - 1)
+                for i, (start, end) in enumerate(bounds)
+            ]
+            results = [future.result() for future in futures]
+    finally:
+        shm.close()
+        shm.unlink()
+
+    if not all(valid for _, valid in results):
+        return list(_scan(data))
+    return [record for records, _ in results for record in records]
+
+
+def read_items(path, workers=1):
+    """
+    파일에서 아이템 읽기. 반환: ({id: ItemRecord}, 중복 수)
+    같은 ID 가 여러 번 나오면 처음 것을 사용 (workers > 1 이어도 파일 순서 기준)
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    items = {}
+    duplicates = 0
+    for record in iter_items(data, workers):
+        if record.id in items:
+            duplicates += 1
+            continue
+        items[record.id] = record
+    return items, duplicates
@@ -3,17 +3,31 @@ Item DB Loader - Lua 기반 재적재 스크립트 (v2 - Fixed parser)
 Source of Truth: iteminfo.lua (클라이언트 Lua 파일)
 
 Fixed: Nested brace handling for identifiedDescriptionName
+v3: 파싱은 iteminfo_lua.iter_items (공용 단일 통과 토크나이저)
+v4: 증분 재적재 (item_sync) - 파일 SHA-256 이 지난 적재와 같으면 건너뛰고,
+    다르면 아이템별 content_hash 를 비교해서 추가/변경/삭제된 행만 쓴다
+    --force: 파일 해시가 같아도 파싱해서 비교, --full: 예전처럼 백업 후 전체 삭제/재삽입
+v5: --workers N - 아이템 경계에서 샤드로 나눠 프로세스 N 개로 파싱 (기본 1 = 한 프로세스, 코어가 많을 때만 지정)
 """
 
 import sqlite3
-import re
 import hashlib
 import os
+import sys
 from datetime import datetime
 
+from market_db import ensure_fts, fts_table
+from item_index import ItemIndex, DEFAULT_INDEX_PATH
+from iteminfo_lua import iter_items
+from item_sync import (
+    ensure_item_sync_schema, stored_file_hash, stored_item_hashes, hash_items, diff_items, sync_items,
+    record_source_file,
+)
+
 # 설정
 LUA_FILE_PATH = "scripts/extracted/iteminfo.lua"
 DB_PATH = "ro_market.db"
+SOURCE = "LUA"
 
 def get_file_info(filepath):
     """파일 정보 수집: 크기, 라인수, SHA256"""
@@ -33,105 +47,34 @@ def get_file_info(filepath):
         'sha256': sha256
     }
 
-def decode_euckr_escape(text):
-    """Lua escape sequence를 EUC-KR로 디코딩"""
-    if not text:
-        return text
-    
-    def replace_escape(match):
-        byte_val = int(match.group(1))
-        return chr(byte_val)
-    
-    # \NNN 형태의 escape sequence 처리
-    decoded = re.sub(r'\\(\d{1,3})', replace_escape, text)
-    
-    try:
-        # Latin-1 바이트 시퀀스를 EUC-KR로 디코딩
-        byte_seq = decoded.encode('latin-1')
-        return byte_seq.decode('euc-kr', errors='replace')
-    except:
-        return decoded
-
-def parse_lua_items(filepath):
-    """Lua 파일에서 아이템 정보 추출 (v2 - 개선된 파서)"""
+def parse_lua_items(filepath, workers=1):
+    """Lua 파일에서 아이템 정보 추출 (v3 - iteminfo_lua 공용 토크나이저, workers > 1 이면 샤드 병렬)"""
     items = {}
     duplicates = 0
     parse_errors = 0
-    
-    with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+
+    with open(filepath, 'rb') as f:
         content = f.read()
-    
-    # 아이템 블록 분리: [id] = { ... } 패턴으로 분리
-    # 각 아이템은 '  [숫자] = {' 로 시작
-    item_pattern = r'\[(\d+)\]\s*=\s*\{'
-    
-    # 모든 아이템 시작 위치 찾기
-    item_starts = [(m.group(1), m.start(), m.end()) for m in re.finditer(item_pattern, content)]
-    
-    for i, (item_id_str, start, block_start) in enumerate(item_starts):
-        item_id = int(item_id_str)
-        
-        if item_id in items:
-            duplicates += 1
-            continue
-        
-        # 다음 아이템이나 파일 끝까지의 블록 찾기
-        if i + 1 < len(item_starts):
-            next_start = item_starts[i + 1][1]
-            block = content[block_start:next_start]
-        else:
-            block = content[block_start:]
-        
-        try:
-            # identifiedDisplayName 추출
-            name_match = re.search(r'identifiedDisplayName\s*=\s*"([^"]*)"', block)
-            name = decode_euckr_escape(name_match.group(1)) if name_match else None
-            
-            # identifiedDescriptionName 추출 (중첩 브레이스 처리)
-            desc_start_match = re.search(r'identifiedDescriptionName\s*=\s*\{', block)
-            description = None
-            
-            if desc_start_match:
-                # 시작 위치부터 매칭되는 닫는 브레이스 찾기
-                desc_start = desc_start_match.end()
-                brace_count = 1
-                desc_end = desc_start
-                
-                for j in range(desc_start, len(block)):
-                    if block[j] == '{':
-                        brace_count += 1
-                    elif block[j] == '}':
-                        brace_count -= 1
-                        if brace_count == 0:
-                            desc_end = j
-                            break
-                
-                desc_block = block[desc_start:desc_end]
-                
-                # 문자열 추출 (따옴표 안의 내용)
-                desc_lines = re.findall(r'"([^"]*)"', desc_block)
-                decoded_lines = [decode_euckr_escape(line) for line in desc_lines]
-                description = '\n'.join(decoded_lines) if decoded_lines else None
-            
-            # slotCount 추출
-            slot_match = re.search(r'slotCount\s*=\s*(\d+)', block)
-            slots = int(slot_match.group(1)) if slot_match else 0
-            
-            items[item_id] = {
-                'id': item_id,
-                'name_kr': name,
-                'description': description,
-                'slots': slots
+
+    try:
+        for record in iter_items(content, workers):
+            if record.id in items:
+                duplicates += 1
+                continue
+            items[record.id] = {
+                'id': record.id,
+                'name_kr': record.identified_name,
+                'description': record.description_text(),
+                'slots': record.slots
             }
-        except Exception as e:
-            parse_errors += 1
-            if parse_errors <= 5:
-                print(f"  Parse error for item {item_id}: {e}")
-    
+    except Exception as e:
+        parse_errors += 1
+        print(f"  Parse error after {len(items):,} items: {e}")
+
     return items, duplicates, parse_errors
 
-def backup_items_table(conn):
-    """items 테이블 백업"""
+def backup_items_table(conn, item_ids=None):
+    """items 테이블 백업 (item_ids 가 있으면 그 행만 - 증분 재적재에서 바뀌거나 지워질 행)"""
     timestamp = datetime.now().strftime('%Y%m%d%H%M')
     backup_table = f"items_backup_{timestamp}"
     
@@ -140,8 +83,12 @@ def backup_items_table(conn):
     # 기존 테이블 구조 복사
     cursor.execute(f"""
         CREATE TABLE IF NOT EXISTS {backup_table} AS 
-        SELECT * FROM items
+        SELECT * FROM items{" WHERE 0" if item_ids is not None else ""}
     """)
+    if item_ids is not None:
+        cursor.executemany(
+            f"INSERT INTO {backup_table} SELECT * FROM items WHERE id = ?", [(item_id,) for item_id in item_ids]
+        )
     
     cursor.execute(f"SELECT COUNT(*) FROM {backup_table}")
     backup_count = cursor.fetchone()[0]
@@ -166,6 +113,13 @@ def ensure_schema(conn):
         print("[SCHEMA] Added 'source_updated_at' column")
     
     conn.commit()
+    
+    # 증분 재적재용 content_hash 컬럼 / 원본 파일 해시 테이블
+    ensure_item_sync_schema(conn)
+    
+    # name_kr 부분검색용 FTS5 trigram 인덱스 (트리거로 reload 시 자동 동기화)
+    if ensure_fts(conn, 'items', 'name_kr'):
+        print(f"[SCHEMA] FTS index ready: {fts_table('items', 'name_kr')}")
 
 def truncate_items(conn):
     """items 테이블 TRUNCATE (SQLite에서는 DELETE 사용)"""
@@ -174,8 +128,8 @@ def truncate_items(conn):
     conn.commit()
     print("[TRUNCATE] items table cleared")
 
-def insert_items(conn, items):
-    """아이템 bulk insert"""
+def insert_items(conn, items, hashes):
+    """아이템 bulk insert (--full)"""
     cursor = conn.cursor()
     
     now = datetime.now().isoformat()
@@ -185,7 +139,8 @@ def insert_items(conn, items):
             item['name_kr'],
             item['description'],
             item['slots'],
-            'LUA',
+            hashes[item['id']],
+            SOURCE,
             now,
             now
         )
@@ -194,8 +149,8 @@ def insert_items(conn, items):
     
     cursor.executemany("""
         INSERT OR REPLACE INTO items 
-        (id, name_kr, description, slots, source, source_updated_at, updated_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
+        (id, name_kr, description, slots, content_hash, source, source_updated_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
     """, data)
     
     conn.commit()
@@ -247,22 +202,33 @@ def verify_results(conn):
         'samples': samples
     }
 
-def main():
+def main(lua_path=LUA_FILE_PATH, db_path=DB_PATH, force=False, full=False, index_path=DEFAULT_INDEX_PATH,
+         workers=1):
     print("=" * 60)
-    print("ITEM DB RELOAD FROM LUA SOURCE (v2 - Fixed Parser)")
+    print("ITEM DB RELOAD FROM LUA SOURCE (v4 - Incremental)")
     print("=" * 60)
     
     # 1. Lua 파일 검증
     print("\n[PHASE 1] Lua File Validation")
-    info = get_file_info(LUA_FILE_PATH)
-    print(f"  File: {LUA_FILE_PATH}")
+    info = get_file_info(lua_path)
+    print(f"  File: {lua_path}")
     print(f"  Size: {info['size_mb']} MB ({info['size']:,} bytes)")
     print(f"  Lines: {info['line_count']:,}")
     print(f"  SHA256: {info['sha256'][:16]}...{info['sha256'][-16:]}")
     
+    conn = sqlite3.connect(db_path)
+    ensure_schema(conn)
+    
+    # 지난 적재와 같은 파일이면 파싱/쓰기 없이 종료
+    previous_sha256 = stored_file_hash(conn, SOURCE)
+    if previous_sha256 == info['sha256'] and not (force or full):
+        print(f"  Unchanged since last load → skip (use --force to re-diff)")
+        conn.close()
+        return None
+    
     # 2. Lua 파싱
-    print("\n[PHASE 2] Lua Parsing (v2)")
-    items, duplicates, parse_errors = parse_lua_items(LUA_FILE_PATH)
+    print(f"\n[PHASE 2] Lua Parsing (v3 - single pass, workers={workers})")
+    items, duplicates, parse_errors = parse_lua_items(lua_path, workers)
     
     item_ids = sorted(items.keys())
     print(f"  Total items parsed: {len(items):,}")
@@ -281,25 +247,41 @@ def main():
     
     # 파싱된 description 통계
     with_desc = sum(1 for item in items.values() if item['description'])
-    print(f"  Items with description: {with_desc:,} ({round(100*with_desc/len(items),1)}%)")
+    print(f"  Items with description: {with_desc:,} ({round(100*with_desc/max(len(items), 1),1)}%)")
+    
+    if parse_errors and not full:
+        # 일부만 파싱된 상태로 diff 하면 나머지 아이템이 전부 삭제로 잡힘
+        print("  Parse errors → DB 는 건드리지 않음 (--full 이면 파싱된 만큼 재적재)")
+        conn.close()
+        return None
     
     # 3. DB 작업
     print("\n[PHASE 3] Database Operations")
-    conn = sqlite3.connect(DB_PATH)
-    
-    # 스키마 확인/추가
-    ensure_schema(conn)
-    
-    # 백업 (이미 있으면 스킵)
-    backup_table, backup_count = backup_items_table(conn)
-    print(f"  Backup created: {backup_table} ({backup_count:,} rows)")
-    
-    # TRUNCATE
-    truncate_items(conn)
+    hashes = hash_items(items)
+    now = datetime.now().isoformat()
     
-    # Insert
-    inserted = insert_items(conn, items)
-    print(f"  Inserted: {inserted:,} items")
+    if full:
+        # 백업 후 전체 재적재 (v2 방식)
+        backup_table, backup_count = backup_items_table(conn)
+        print(f"  Backup created: {backup_table} ({backup_count:,} rows)")
+        truncate_items(conn)
+        inserted = insert_items(conn, items, hashes)
+        print(f"  Inserted: {inserted:,} items")
+        writes = inserted
+    else:
+        diff = diff_items(hashes, stored_item_hashes(conn))
+        print(f"  Inserted: {len(diff.inserted):,}, Changed: {len(diff.changed):,}, "
+              f"Removed: {len(diff.removed):,}, Unchanged: {diff.unchanged:,}")
+        writes = diff.writes
+        if writes:
+            backup_table, backup_count = backup_items_table(conn, diff.changed + diff.removed)
+            print(f"  Backup created: {backup_table} ({backup_count:,} changed/removed rows)")
+            sync_items(conn, items, hashes, diff, now,
+                       extra_columns={'source': SOURCE, 'source_updated_at': now})
+    
+    record_source_file(conn, SOURCE, lua_path, info, len(items), now)
+    conn.commit()
+    print(f"  Rows written: {writes:,}")
     
     # 4. 검증
     print("\n[PHASE 4] Verification")
@@ -319,11 +301,20 @@ def main():
     
     conn.close()
     
+    # 5. collector 용 이름 → ID 인덱스 갱신 (쓴 행이 있을 때만)
+    if writes:
+        print("\n[PHASE 5] Item Index Export")
+        index = ItemIndex.from_db(db_path)
+        index.save(index_path)
+        print(f"  {len(index):,} names → {index_path}")
+        print(f"  (GitHub Actions collector 는 커밋된 파일을 읽음 - 바뀌었으면 git 에 커밋)")
+    
     print("\n" + "=" * 60)
-    print("RELOAD COMPLETE (v2)")
+    print("RELOAD COMPLETE (v4)")
     print("=" * 60)
     
     return results
 
 if __name__ == "__main__":
-    main()
+    workers = int(sys.argv[sys.argv.index('--workers') + 1]) if '--workers' in sys.argv else 1
+    main(force='--force' in sys.argv, full='--full' in sys.argv, workers=workers)
@@ -2,13 +2,28 @@
 """
 Lua 5.1 Bytecode String Extractor for Ragnarok Online iteminfo
 Lua bytecode에서 아이템 정보 문자열을 직접 추출합니다.
+
+itemInfo_true.lub / skilldescript.lub 는 unluac 없이 청크를 직접 읽는다:
+- 헤더 → 함수 프로토타입(코드, 상수 테이블, 하위 함수)을 순서대로 한 번 읽음 (read_chunk)
+- 최상위 함수의 코드를 앞에서부터 한 번 실행하면서 테이블 생성자 관련 명령
+  (NEWTABLE / LOADK / SETTABLE / SETLIST / GETGLOBAL / GETTABLE / SETGLOBAL 등)만 흉내 내서
+  `tbl = { [ID] = { ... } }`, `SKILL_DESCRIPT = { [SKID.XXX] = { ... } }` 테이블을 그대로 복원 (run_table_constructors)
+- 복원한 테이블 → iteminfo_lua.ItemRecord / SkillDescription
+
+    python scripts/lua_string_extractor.py itemInfo_true.lub
+    python scripts/lua_string_extractor.py skilldescript.lub
 """
 
 import struct
 import os
+import sys
 import json
 import sqlite3
 import re
+from array import array
+from typing import NamedTuple, Tuple
+
+from iteminfo_lua import ItemRecord, LUA_SIGNATURE, decode_raw_strings
 
 # 설정
 ITEMINFO_PATH = r"C:\Users\KJM\Desktop\게임\Ragnarok_250317\System\itemInfo_true.lub"
@@ -83,52 +98,341 @@ class Lua51BytecodeParser:
             'lua_number_integral': lua_number_integral
         }
     
-    def extract_all_strings(self):
-        """바이트코드에서 모든 문자열 추출"""
+    def read_chunk(self):
+        """헤더 + 최상위 함수 프로토타입 (하위 함수 포함) 읽기"""
         header = self.parse_header()
-        print(f"Lua version: 0x{header['version']:02x}")
-        print(f"size_t size: {header['size_t_size']}")
-        
-        size_t_size = header['size_t_size']
-        
-        # 간단한 방법: 전체 데이터에서 문자열 패턴 찾기
+        if header['version'] != 0x51 or header['format'] != 0:
+            raise ValueError(f"Lua 5.1 bytecode 가 아님 (version 0x{header['version']:02x})")
+        if header['instruction_size'] != 4:
+            raise ValueError(f"지원하지 않는 instruction 크기: {header['instruction_size']}")
+
+        order = '<' if header['endianness'] == 1 else '>'
+        self.header = header
+        self._int = struct.Struct(order + ('i' if header['int_size'] == 4 else 'q'))
+        self._size_t = struct.Struct(order + ('I' if header['size_t_size'] == 4 else 'Q'))
+        number_format = {(8, 0): 'd', (4, 0): 'f', (8, 1): 'q', (4, 1): 'i'}[
+            (header['lua_number_size'], header['lua_number_integral'])]
+        self._number = struct.Struct(order + number_format)
+        self._swap = (order == '<') != (sys.byteorder == 'little')
+        return self.read_function()
+
+    def _unpack(self, fmt):
+        value = fmt.unpack_from(self.data, self.pos)[0]
+        self.pos += fmt.size
+        return value
+
+    def read_raw_string(self):
+        """Lua 문자열 (bytes, 끝의 \\0 제외). 길이 0 이면 None"""
+        length = self._unpack(self._size_t)
+        if length == 0:
+            return None
+        value = self.data[self.pos:self.pos + length - 1]
+        self.pos += length
+        return value
+
+    def read_function(self):
+        """함수 프로토타입 1개 (lundump.c LoadFunction 과 같은 순서)"""
+        self.read_raw_string()                      # source
+        self.pos += 2 * self._int.size              # linedefined, lastlinedefined
+        nups, num_params, is_vararg, max_stack = self.data[self.pos:self.pos + 4]
+        self.pos += 4
+
+        count = self._unpack(self._int)
+        code = array('I')
+        code.frombytes(self.data[self.pos:self.pos + 4 * count])
+        if self._swap:
+            code.byteswap()
+        self.pos += 4 * count
+
+        count = self._unpack(self._int)
+        constants = []
         strings = []
-        
-        # Lua bytecode에서 문자열은 size + data 형태로 저장됨
-        # 문자열과 관련된 패턴을 찾아봄
-        pos = self.pos
-        
-        while pos < len(self.data) - 10:
-            # 문자열 길이 후보 읽기
-            try:
-                str_len = struct.unpack('<I', self.data[pos:pos+4])[0]
-                
-                # 합리적인 문자열 길이 (1 ~ 1000)
-                if 1 < str_len < 1000 and pos + 4 + str_len <= len(self.data):
-                    str_data = self.data[pos+4:pos+4+str_len-1]  # -1 for null
-                    
-                    # 유효한 문자열인지 확인
-                    if str_len > 1 and self.data[pos+4+str_len-1:pos+4+str_len] == b'\x00':
-                        try:
-                            decoded = str_data.decode('euc-kr')
-                            # 한국어가 포함된 문자열만 저장
-                            if re.search(r'[\uac00-\ud7af]', decoded):
-                                strings.append({
-                                    'pos': pos,
-                                    'text': decoded
-                                })
-                                pos += 4 + str_len
-                                continue
-                        except:
-                            pass
-            except:
-                pass
-            
-            pos += 1
-        
+        for _ in range(count):
+            kind = self.data[self.pos]
+            self.pos += 1
+            if kind == LUA_TSTRING:
+                strings.append((len(constants), self.read_raw_string() or b''))
+                constants.append(None)
+            elif kind == LUA_TNUMBER:
+                value = self._unpack(self._number)
+                constants.append(int(value) if isinstance(value, float) and value.is_integer() else value)
+            elif kind == LUA_TBOOLEAN:
+                constants.append(self.data[self.pos] != 0)
+                self.pos += 1
+            elif kind == LUA_TNIL:
+                constants.append(None)
+            else:
+                raise ValueError(f"알 수 없는 상수 타입 {kind} (offset {self.pos - 1})")
+        # 문자열 상수는 함수마다 한 번에 디코딩 (같은 상수를 여러 번 참조해도 디코딩은 한 번)
+        for (index, _), text in zip(strings, decode_raw_strings([raw for _, raw in strings])):
+            constants[index] = text
+
+        count = self._unpack(self._int)
+        protos = [self.read_function() for _ in range(count)]
+
+        # debug 정보: lineinfo, locvars, upvalue 이름 (건너뜀)
+        count = self._unpack(self._int)
+        self.pos += count * self._int.size
+        for _ in range(self._unpack(self._int)):
+            self.read_raw_string()
+            self.pos += 2 * self._int.size
+        for _ in range(self._unpack(self._int)):
+            self.read_raw_string()
+
+        return LuaFunction(code, constants, protos, nups, max_stack)
+
+    def extract_all_strings(self):
+        """바이트코드에서 모든 문자열 상수 추출 (함수 프로토타입의 상수 테이블을 순서대로)"""
+        main = self.read_chunk()
+        print(f"Lua version: 0x{self.header['version']:02x}")
+        print(f"size_t size: {self.header['size_t_size']}")
+
+        strings = []
+        stack = [main]
+        while stack:
+            function = stack.pop()
+            strings.extend({'text': text} for text in function.constants if type(text) is str)
+            stack.extend(reversed(function.protos))
         return strings
 
 
+# ---------- Lua 5.1 청크 → 테이블 복원 ----------
+
+LUA_TNIL, LUA_TBOOLEAN, LUA_TNUMBER, LUA_TSTRING = 0, 1, 3, 4
+
+# lopcodes.h (Lua 5.1)
+(OP_MOVE, OP_LOADK, OP_LOADBOOL, OP_LOADNIL, OP_GETUPVAL, OP_GETGLOBAL, OP_GETTABLE, OP_SETGLOBAL,
+ OP_SETUPVAL, OP_SETTABLE, OP_NEWTABLE, OP_SELF, OP_ADD, OP_SUB, OP_MUL, OP_DIV, OP_MOD, OP_POW,
+ OP_UNM, OP_NOT, OP_LEN, OP_CONCAT, OP_JMP, OP_EQ, OP_LT, OP_LE, OP_TEST, OP_TESTSET, OP_CALL,
+ OP_TAILCALL, OP_RETURN, OP_FORLOOP, OP_FORPREP, OP_TFORLOOP, OP_SETLIST, OP_CLOSE, OP_CLOSURE,
+ OP_VARARG) = range(38)
+
+LFIELDS_PER_FLUSH = 50
+BITRK = 256
+
+# R(A) 에 알 수 없는 값을 쓰는 명령 (테이블 생성과 무관, 결과만 None 으로)
+_CLOBBER_A = frozenset((
+    OP_GETUPVAL, OP_ADD, OP_SUB, OP_MUL, OP_DIV, OP_MOD, OP_POW, OP_UNM, OP_NOT, OP_LEN, OP_CONCAT,
+    OP_TESTSET, OP_FORLOOP, OP_FORPREP,
+))
+
+
+class LuaFunction(NamedTuple):
+    """함수 프로토타입 (constants 의 문자열은 디코딩된 str)"""
+    code: array
+    constants: list
+    protos: list
+    nups: int
+    max_stack: int
+
+
+class LuaName(str):
+    """값을 알 수 없는 전역 변수 참조 (예: SKID.ABC_DEFT_STAB). 테이블 키로 그대로 사용"""
+
+
+class LuaFunctionValue:
+    """CLOSURE 로 만든 함수 (실행하지 않음)"""
+
+    def __init__(self, function):
+        self.function = function
+
+
+def run_table_constructors(function):
+    """
+    최상위 함수 코드를 앞에서부터 한 번 실행해서 전역 변수에 대입된 테이블을 복원
+    - 분기/반복/함수 호출은 따라가지 않음 (iteminfo / skilldescript 의 최상위 코드는 테이블 생성 + 대입뿐)
+    - 테이블은 dict (배열 부분은 1, 2, ... 정수 키), 모르는 전역은 LuaName
+    반환: {전역 이름: 값}
+    """
+    code = function.code
+    constants = function.constants
+    protos = function.protos
+    regs = [None] * 256
+    globals_ = {}
+
+    pc = 0
+    size = len(code)
+    while pc < size:
+        instruction = code[pc]
+        pc += 1
+        op = instruction & 0x3F
+        a = (instruction >> 6) & 0xFF
+
+        if op == OP_SETTABLE:
+            table = regs[a]
+            if type(table) is dict:
+                b = instruction >> 23
+                c = (instruction >> 14) & 0x1FF
+                key = constants[b - BITRK] if b >= BITRK else regs[b]
+                value = constants[c - BITRK] if c >= BITRK else regs[c]
+                if key is not None:
+                    if value is None:
+                        table.pop(key, None)
+                    else:
+                        table[key] = value
+        elif op == OP_LOADK:
+            regs[a] = constants[instruction >> 14]
+        elif op == OP_NEWTABLE:
+            regs[a] = {}
+        elif op == OP_SETLIST:
+            b = instruction >> 23
+            c = (instruction >> 14) & 0x1FF
+            if c == 0:
+                c = code[pc]
+                pc += 1
+            table = regs[a]
+            if type(table) is dict and b:
+                base = (c - 1) * LFIELDS_PER_FLUSH
+                for i in range(1, b + 1):
+                    if regs[a + i] is not None:
+                        table[base + i] = regs[a + i]
+        elif op == OP_MOVE:
+            regs[a] = regs[(instruction >> 23)]
+        elif op == OP_GETGLOBAL:
+            name = constants[instruction >> 14]
+            regs[a] = globals_.get(name, LuaName(name))
+        elif op == OP_SETGLOBAL:
+            globals_[constants[instruction >> 14]] = regs[a]
+        elif op == OP_GETTABLE:
+            table = regs[instruction >> 23]
+            c = (instruction >> 14) & 0x1FF
+            key = constants[c - BITRK] if c >= BITRK else regs[c]
+            if type(table) is dict:
+                regs[a] = table.get(key)
+            elif isinstance(table, LuaName):
+                regs[a] = LuaName(f"{table}.{key}")
+            else:
+                regs[a] = None
+        elif op == OP_LOADBOOL:
+            regs[a] = bool(instruction >> 23)
+            if (instruction >> 14) & 0x1FF:
+                pc += 1
+        elif op == OP_LOADNIL:
+            for i in range(a, (instruction >> 23) + 1):
+                regs[i] = None
+        elif op == OP_CLOSURE:
+            proto = protos[instruction >> 14]
+            regs[a] = LuaFunctionValue(proto)
+            pc += proto.nups  # upvalue 를 지정하는 MOVE / GETUPVAL 의사 명령
+        elif op == OP_SELF:
+            regs[a] = regs[a + 1] = None
+        elif op in (OP_CALL, OP_TAILCALL):
+            c = (instruction >> 14) & 0x1FF
+            for i in range(a, a + max(c - 1, 1)):
+                regs[i] = None
+        elif op == OP_VARARG:
+            for i in range(a, a + max((instruction >> 23) - 1, 1)):
+                regs[i] = None
+        elif op == OP_TFORLOOP:
+            for i in range(a + 3, a + 3 + ((instruction >> 14) & 0x1FF)):
+                regs[i] = None
+        elif op in _CLOBBER_A:
+            regs[a] = None
+        # JMP / EQ / LT / LE / TEST / RETURN / CLOSE / SETUPVAL: 따라가지 않음
+
+    return globals_
+
+
+def read_lub(data):
+    """.lub 내용(bytes) → (최상위 함수, 전역 테이블)"""
+    if not data.startswith(LUA_SIGNATURE):
+        raise ValueError("Not a Lua bytecode file")
+    main = Lua51BytecodeParser(data).read_chunk()
+    return main, run_table_constructors(main)
+
+
+def _array(table):
+    """배열 부분(1, 2, ...)의 문자열 → tuple"""
+    if type(table) is not dict:
+        return ()
+    lines = []
+    index = 1
+    while index in table:
+        value = table[index]
+        if type(value) is str:
+            lines.append(value)
+        index += 1
+    return tuple(lines)
+
+
+def _text(value):
+    return value if type(value) is str else None
+
+
+def _int(value):
+    return int(value) if type(value) in (int, float) else 0
+
+
+def _find_table(globals_, preferred, looks_like):
+    """preferred 이름의 전역 테이블, 없으면 looks_like(값) 인 항목이 있는 첫 전역 테이블"""
+    table = globals_.get(preferred)
+    if type(table) is dict:
+        return table
+    for table in globals_.values():
+        if type(table) is dict and any(looks_like(value) for value in table.values()):
+            return table
+    return {}
+
+
+def _is_item(value):
+    return type(value) is dict and ('identifiedDisplayName' in value or 'unidentifiedDisplayName' in value)
+
+
+def iter_lub_items(data):
+    """itemInfo .lub 내용 → ItemRecord (iteminfo_lua.iter_items 와 같은 형태, 테이블 순서대로)"""
+    return items_from_globals(read_lub(data)[1])
+
+
+def items_from_globals(globals_):
+    for item_id, fields in _find_table(globals_, 'tbl', _is_item).items():
+        if type(item_id) is not int or type(fields) is not dict:
+            continue
+        yield ItemRecord(
+            id=item_id,
+            unidentified_name=_text(fields.get('unidentifiedDisplayName')),
+            identified_name=_text(fields.get('identifiedDisplayName')),
+            unidentified_description=_array(fields.get('unidentifiedDescriptionName')),
+            identified_description=_array(fields.get('identifiedDescriptionName')),
+            slots=_int(fields.get('slotCount')),
+            class_num=_int(fields.get('ClassNum')),
+            costume=fields.get('costume') is True,
+        )
+
+
+class SkillDescription(NamedTuple):
+    """skilldescript 항목 1개. skill_id 는 SKID 상수 이름 (예: ABC_DEFT_STAB), 숫자 키면 그 숫자 문자열"""
+    skill_id: str
+    lines: Tuple[str, ...]
+
+    @property
+    def name(self):
+        """첫 줄 (스킬 이름)"""
+        return self.lines[0] if self.lines else None
+
+    def description_text(self, separator='\n'):
+        return separator.join(self.lines) if self.lines else None
+
+
+def _is_skill_lines(value):
+    return type(value) is dict and type(value.get(1)) is str
+
+
+def iter_skill_descriptions(data):
+    """skilldescript .lub 내용 → SkillDescription (테이블 순서대로)"""
+    return skills_from_globals(read_lub(data)[1])
+
+
+def skills_from_globals(globals_):
+    for key, lines in _find_table(globals_, 'SKILL_DESCRIPT', _is_skill_lines).items():
+        if isinstance(key, LuaName):
+            skill_id = key.rpartition('.')[2]
+        elif type(key) is int:
+            skill_id = str(key)
+        else:
+            continue
+        yield SkillDescription(skill_id, _array(lines))
+
+
 def extract_strings_simple(filepath):
     """간단한 문자열 추출 - 정규식 기반"""
     with open(filepath, 'rb') as f:
@@ -185,110 +489,76 @@ def extract_strings_simple(filepath):
 
 
 def extract_items_from_bytecode(filepath):
-    """Lua bytecode에서 아이템 정보 추출"""
+    """Lua bytecode에서 아이템 정보 추출 → {아이템ID: ItemRecord}"""
     with open(filepath, 'rb') as f:
         data = f.read()
     
     print(f"File size: {len(data):,} bytes")
-    print(f"Header: {data[:4]}")
-    
-    # 아이템 정보 추출
-    items = {}
-    
-    # Lua 5.1 bytecode에서 문자열 상수 테이블 파싱
-    # String format: [size_t: length][bytes: string_data][0x00]
-    
-    pos = 12  # 헤더 건너뛰기
-    item_names = []
-    item_descs = []
-    
-    # 문자열 상수들을 순서대로 추출
-    # iteminfo의 구조상 아이템 이름과 설명이 연속으로 나옴
-    
-    # 더 정교한 방법: Lua 바이트코드 구조 분석
-    # 일단 모든 문자열 추출
-    all_strings = []
-    
-    i = 0
-    while i < len(data) - 8:
-        # 4바이트 길이 + 문자열 + null 패턴 검색
-        try:
-            str_len = struct.unpack('<I', data[i:i+4])[0]
-            
-            if 4 < str_len < 500 and i + 4 + str_len <= len(data):
-                str_data = data[i+4:i+4+str_len-1]
-                
-                # null로 끝나는지 확인
-                if data[i+4+str_len-1:i+4+str_len] == b'\x00':
-                    try:
-                        decoded = str_data.decode('euc-kr')
-                        
-                        # 아이템 이름 패턴 (한국어 + 영어/숫자 혼합)
-                        if len(decoded) >= 2 and any('\uac00' <= c <= '\ud7af' for c in decoded):
-                            all_strings.append({
-                                'pos': i,
-                                'len': str_len,
-                                'text': decoded
-                            })
-                    except:
-                        pass
-        except:
-            pass
-        
-        i += 1
-    
-    print(f"Extracted {len(all_strings)} Korean strings from bytecode")
-    
-    # 아이템 이름 후보 필터링
-    # 일반적으로 아이템 이름은 특정 패턴을 따름 (예: 끝에 [N] 슬롯 표시)
-    item_name_candidates = []
-    for s in all_strings:
-        text = s['text']
-        # 아이템 이름 패턴: 한국어 + 선택적 [숫자] 슬롯
-        if re.match(r'^[\uac00-\ud7af\u3130-\u318fa-zA-Z0-9\s\[\]()_+-]+$', text):
-            if 2 <= len(text) <= 50:
-                item_name_candidates.append(text)
-    
-    print(f"Found {len(item_name_candidates)} item name candidates")
+    return {record.id: record for record in iter_lub_items(data)}
+
+
+def extract_skills_from_bytecode(filepath):
+    """skilldescript bytecode에서 스킬 설명 추출 → {SKID 이름: SkillDescription}"""
+    with open(filepath, 'rb') as f:
+        data = f.read()
     
-    return item_name_candidates, all_strings
+    print(f"File size: {len(data):,} bytes")
+    return {skill.skill_id: skill for skill in iter_skill_descriptions(data)}
 
 
 def main():
-    """메인 실행"""
+    """메인 실행: .lub 하나를 읽어서 아이템/스킬 테이블을 JSON 으로 저장"""
     print("=" * 60)
     print("  라그나로크 아이템 정보 추출기 (Lua Bytecode Parser)")
     print("=" * 60)
     
-    if not os.path.exists(ITEMINFO_PATH):
-        print(f"Error: File not found: {ITEMINFO_PATH}")
+    filepath = sys.argv[1] if len(sys.argv) > 1 else ITEMINFO_PATH
+    if not os.path.exists(filepath):
+        print(f"Error: File not found: {filepath}")
         return 1
     
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     
-    # 아이템 이름 추출
-    item_names, all_strings = extract_items_from_bytecode(ITEMINFO_PATH)
+    with open(filepath, 'rb') as f:
+        data = f.read()
+    print(f"File size: {len(data):,} bytes")
     
-    # 결과 저장
-    output_file = os.path.join(OUTPUT_DIR, 'extracted_strings.json')
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump({
-            'item_name_candidates': item_names[:1000],  # 처음 1000개
-            'total_strings': len(all_strings),
-            'sample_strings': [s['text'] for s in all_strings[:500]]
-        }, f, ensure_ascii=False, indent=2)
+    _, globals_ = read_lub(data)
+    items = {record.id: record for record in items_from_globals(globals_)}
+    skills = {skill.skill_id: skill for skill in skills_from_globals(globals_)}
+    base = os.path.splitext(os.path.basename(filepath))[0]
     
-    print(f"\nResults saved to: {output_file}")
+    if items:
+        output_file = os.path.join(OUTPUT_DIR, f'{base}_items.json')
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                str(item_id): {
+                    'name': record.name,
+                    'unidentified_name': record.unidentified_name,
+                    'description': record.description_text(),
+                    'slots': record.slots,
+                    'class_num': record.class_num,
+                }
+                for item_id, record in items.items()
+            }, f, ensure_ascii=False, indent=2)
+        print(f"\n{len(items):,} items → {output_file}")
+        for record in list(items.values())[:20]:
+            print(f"  [{record.id}] {record.name}")
     
-    # 샘플 출력
-    print("\n" + "=" * 40)
-    print("Sample item names (first 50):")
-    print("=" * 40)
-    for name in item_names[:50]:
-        print(f"  - {name}")
+    if skills:
+        output_file = os.path.join(OUTPUT_DIR, f'{base}_skills.json')
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump({skill_id: list(skill.lines) for skill_id, skill in skills.items()},
+                      f, ensure_ascii=False, indent=2)
+        print(f"\n{len(skills):,} skills → {output_file}")
+        for skill in list(skills.values())[:20]:
+            print(f"  {skill.skill_id}: {skill.name}")
     
+    if not items and not skills:
+        print(f"아이템/스킬 테이블을 찾지 못함 (전역: {', '.join(globals_)})")
+        return 1
     return 0
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+ro_market.db 노점 데이터 접근 계층 (Flask 크롤러 서버용)
+- 스키마는 서버 시작 시 init_db() 에서 한 번만 생성
+- 스레드별 연결 재사용 (요청마다 connect/CREATE TABLE 하지 않음)
+  → sqlite3 의 연결 단위 statement 캐시로 같은 SQL 은 prepare 를 다시 하지 않는다
+- WAL 모드: 크롤링 결과를 쓰는 동안에도 조회 요청은 막히지 않음
+- 쓰기는 전용 writer 스레드 1개에서 실행 (SQLite writer 는 1개, submit_listings)
+  크롤링 결과는 (server, item_name, price, vendor_info) 키로 executemany UPSERT 한 트랜잭션
+  → 검색어 LIKE 로 전부 지우고 다시 넣지 않으므로 갱신 중에 목록이 비어 보이지 않음
+- 부분검색('%x%')은 FTS5 trigram 인덱스(items_item_name_fts) 사용
+  (Postgres 의 pg_trgm GIN 인덱스와 같은 역할, create_vending_indexes.py 참고)
+  SQLite 가 FTS5/trigram 을 지원하지 않으면(3.34 미만) 기존 LIKE 풀스캔으로 동작
+- 페이지 조회는 keyset 방식: (item_name, price, rowid) 순 정렬 후 마지막 행 다음부터 LIMIT
+  → OFFSET 없이 50페이지도 1페이지와 같은 비용, 커서는 불투명 문자열(encode_cursor)로 전달
+  sort='price' 면 (price, item_name, rowid) 순
+  · 검색어 페이지: 일치 건수(count_items, 캐시)가 SORT_MATCH_LIMIT 이하면 FTS 로 찾은 행만 정렬하고,
+    그보다 많으면 정렬 인덱스(idx_items_name_price / idx_items_price_name)를 커서 위치부터 순서대로 훑으며
+    item_name LIKE 로 거름 (정렬용 임시 B-tree 없음, 일치 행이 많을수록 빨리 LIMIT 을 채움)
+- price / quantity 는 INTEGER (이전 TEXT 스키마 '1,000z' 는 init_db 에서 변환)
+  → 가격 정렬/범위 필터(min_price, max_price)를 SQL 과 인덱스로 처리
+- 전체 건수는 캐시: 쓰기마다 market_meta.items_version 을 올리고, 버전이 같으면 COUNT 생략
+
+경로는 RO_MARKET_DB 환경변수로 변경 가능 (기본: 실행 위치의 ro_market.db).
+"""
+import os
+import json
+import base64
+import time
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DB_PATH = os.environ.get("RO_MARKET_DB", "ro_market.db")
+
+BUSY_TIMEOUT_MS = 5000
+STATEMENT_CACHE_SIZE = 128
+COUNT_CACHE_SIZE = 1024
+
+# 검색어 일치 건수가 이보다 많으면 FTS 결과를 전부 정렬하지 않고 정렬 인덱스를 순서대로 훑음
+SORT_MATCH_LIMIT = 1000
+
+ITEMS_TABLE = """
+    CREATE TABLE IF NOT EXISTS {name} (
+        server TEXT, item_name TEXT, quantity INTEGER, price INTEGER, vendor_info TEXT,
+        crawled_at REAL DEFAULT 0
+    )
+"""
+
+# 노점 목록 자연키 (크롤러의 중복 판단 기준 shop|item|price + 서버)
+LISTING_KEY = ("server", "item_name", "price", "vendor_info")
+
+SCHEMA = [
+    ITEMS_TABLE.format(name="items"),
+    # keyset 정렬/커서 비교용 인덱스: 인덱스 끝에 rowid 가 붙어 있어서 (정렬 컬럼, rowid) 순서를
+    # 인덱스만으로 만족 (정렬용 임시 B-tree 없음, 테이블은 LIMIT 건만 조회)
+    "DROP INDEX IF EXISTS idx_items_server",
+    "DROP INDEX IF EXISTS idx_items_server_seek",
+    "CREATE INDEX IF NOT EXISTS idx_items_server_name_price ON items (server, item_name, price)",
+    # 가격순 정렬 / 가격 범위 필터용
+    "CREATE INDEX IF NOT EXISTS idx_items_server_price_name ON items (server, price, item_name)",
+    # 검색어(서버 무관) 페이지를 정렬 순서대로 훑기 위한 인덱스
+    "CREATE INDEX IF NOT EXISTS idx_items_name_price ON items (item_name, price)",
+    "CREATE INDEX IF NOT EXISTS idx_items_price_name ON items (price, item_name)",
+    # UPSERT 충돌 대상
+    f"CREATE UNIQUE INDEX IF NOT EXISTS uq_items_listing ON items ({', '.join(LISTING_KEY)})",
+    # 데이터 버전 (다른 프로세스의 쓰기도 감지할 수 있도록 DB 에 저장)
+    "CREATE TABLE IF NOT EXISTS market_meta (key TEXT PRIMARY KEY, value INTEGER)",
+    "INSERT OR IGNORE INTO market_meta VALUES ('items_version', 0)",
+]
+
+# 정렬 방식 → 정렬 컬럼 (뒤에 rowid 를 붙인 것이 커서 키)
+SORT_COLUMNS = {
+    "name": ("item_name", "price"),
+    "price": ("price", "item_name"),
+}
+_ROW_INDEX = {"item_name": 1, "price": 3}
+
+_local = threading.local()
+_write_lock = threading.Lock()
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="market-db-writer")
+
+# init_db() 에서 FTS 인덱스 생성에 성공하면 True
+FTS_ENABLED = False
+
+# (item, server_display) → (items_version, count)
+_count_cache = {}
+_count_lock = threading.Lock()
+
+
+def _connect():
+    conn = sqlite3.connect(DB_PATH, timeout=BUSY_TIMEOUT_MS / 1000, cached_statements=STATEMENT_CACHE_SIZE)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    return conn
+
+
+def get_conn():
+    """현재 스레드 전용 연결 (없으면 생성)"""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _connect()
+        _local.conn = conn
+    return conn
+
+
+def fts_table(table, column):
+    """부분검색용 FTS 테이블 이름 (예: items_item_name_fts)"""
+    return f"{table}_{column}_fts"
+
+
+def ensure_fts(conn, table, column):
+    """
+    table.column 에 대한 FTS5 trigram 인덱스 + 동기화 트리거 생성
+    - external content 방식이라 본문은 원래 테이블에만 저장 (인덱스만 추가)
+    - 처음 만들 때 기존 행으로 rebuild
+    반환: 인덱스 사용 가능 여부 (FTS5/trigram 미지원이면 False)
+    """
+    fts = fts_table(table, column)
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts,)
+    ).fetchone()
+    if exists:
+        return True
+
+    # 같은 이름의 다른 스키마 테이블일 수 있으므로 컬럼 확인
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if column not in columns:
+        return False
+
+    try:
+        conn.execute(f"""
+            CREATE VIRTUAL TABLE {fts} USING fts5(
+                {column}, content='{table}', content_rowid='rowid', tokenize='trigram'
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        print(f"[market_db] FTS5 trigram 미지원, LIKE 검색 사용: {e}")
+        return False
+
+    conn.executescript(f"""
+        CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts} (rowid, {column}) VALUES (new.rowid, new.{column});
+        END;
+        CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN
+            INSERT INTO {fts} ({fts}, rowid, {column}) VALUES ('delete', old.rowid, old.{column});
+        END;
+        CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {column} ON {table} BEGIN
+            INSERT INTO {fts} ({fts}, rowid, {column}) VALUES ('delete', old.rowid, old.{column});
+            INSERT INTO {fts} (rowid, {column}) VALUES (new.rowid, new.{column});
+        END;
+    """)
+    conn.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+    conn.commit()
+    return True
+
+
+def drop_fts(conn, table, column):
+    """ensure_fts 로 만든 FTS 테이블과 트리거 삭제"""
+    fts = fts_table(table, column)
+    for suffix in ("ai", "ad", "au"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+    conn.execute(f"DROP TABLE IF EXISTS {fts}")
+
+
+def substring_filter(table, column, keyword, use_fts=True):
+    """
+    부분검색 WHERE 조건. 반환: (조건 SQL, 파라미터)
+    FTS 가 있고 검색어가 3글자 이상이면 trigram 인덱스 사용
+    (trigram 은 3글자 미만 검색어를 찾지 못하므로 '천공' 같은 2글자는 기존 LIKE 로 처리)
+    """
+    pattern = f"%{keyword}%"
+    if use_fts and len(keyword) >= 3:
+        return f"rowid IN (SELECT rowid FROM {fts_table(table, column)} WHERE {column} LIKE ?)", (pattern,)
+    return f"{column} LIKE ?", (pattern,)
+
+
+def init_db():
+    """스키마 생성 + WAL 설정 + FTS 인덱스 (서버 시작 시 1회)"""
+    global FTS_ENABLED
+    with _write_lock:
+        conn = get_conn()
+        with conn:
+            conn.execute(SCHEMA[0])
+            _check_listing_table(conn)
+            _migrate_numeric_columns(conn)
+            _migrate_listing_key(conn)
+            for statement in SCHEMA[1:]:
+                conn.execute(statement)
+        FTS_ENABLED = ensure_fts(conn, "items", "item_name")
+        # gunicorn preload 후 fork 되는 워커에 연결을 물려주지 않도록 닫아둠 (필요하면 다시 열림)
+        close_conn()
+
+
+def _check_listing_table(conn):
+    """
+    items 가 노점 목록 테이블인지 확인 (마이그레이션 전에)
+    같은 경로의 ro_market.db 에 아이템 DB(id, name_kr, ...) 의 items 가 있으면 건드리지 않고 중단
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(items)")}
+    missing = [column for column in LISTING_KEY if column not in columns]
+    if missing:
+        raise RuntimeError(
+            f"{DB_PATH} 의 items 테이블이 노점 목록 스키마가 아님 (없는 컬럼: {', '.join(missing)}). "
+            f"아이템 DB 로 보이므로 변경하지 않음 - RO_MARKET_DB 로 노점 DB 경로를 따로 지정하세요"
+        )
+
+
+def _migrate_listing_key(conn):
+    """crawled_at 컬럼 추가 + UNIQUE 인덱스 생성 전에 같은 자연키 중복 행 정리 (가장 먼저 들어온 행 유지)"""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(items)")}
+    if "crawled_at" not in columns:
+        conn.execute("ALTER TABLE items ADD COLUMN crawled_at REAL DEFAULT 0")
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'uq_items_listing'").fetchone():
+        return
+    key = ", ".join(LISTING_KEY)
+    removed = conn.execute(
+        f"DELETE FROM items WHERE rowid NOT IN (SELECT MIN(rowid) FROM items GROUP BY {key})"
+    ).rowcount
+    if removed:
+        print(f"[market_db] 중복 노점 목록 {removed}건 정리")
+
+
+def _to_int_sql(column, default):
+    """'1,000z' 같은 TEXT 값을 정수로 바꾸는 SQL 식 (parse_int 와 같은 규칙)"""
+    digits = f"REPLACE(REPLACE(REPLACE(TRIM({column}), ',', ''), 'z', ''), ' ', '')"
+    return f"CASE WHEN {digits} GLOB '[0-9]*' AND {digits} NOT GLOB '*[^0-9]*' THEN CAST({digits} AS INTEGER) ELSE {default} END"
+
+
+def _migrate_numeric_columns(conn):
+    """
+    이전 TEXT 스키마(price/quantity TEXT)를 INTEGER 로 변환 (rowid 유지)
+    FTS 인덱스와 트리거는 테이블과 함께 다시 만든다 (init_db 의 ensure_fts)
+    """
+    columns = {row[1]: row[2].upper() for row in conn.execute("PRAGMA table_info(items)")}
+    if columns.get("price") != "TEXT":
+        return
+
+    print("[market_db] items.price/quantity TEXT → INTEGER 변환 중...")
+    drop_fts(conn, "items", "item_name")
+    conn.execute("DROP TABLE IF EXISTS items_numeric")
+    conn.execute(ITEMS_TABLE.format(name="items_numeric"))
+    conn.execute(f"""
+        INSERT INTO items_numeric (rowid, server, item_name, quantity, price, vendor_info)
+        SELECT rowid, server, item_name, {_to_int_sql('quantity', 1)}, {_to_int_sql('price', 0)}, vendor_info
+        FROM items
+    """)
+    conn.execute("DROP TABLE items")
+    conn.execute("ALTER TABLE items_numeric RENAME TO items")
+
+
+def close_conn():
+    """현재 스레드 연결 닫기"""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+
+
+def _where(item=None, server_display=None, min_price=None, max_price=None, scan_sort=None):
+    """
+    scan_sort: 정렬 인덱스를 순서대로 훑을 때의 sort 이름 → 검색어를 FTS rowid 목록 대신 행마다 LIKE 로 거름
+    (이름순이면 가격 조건 앞에 + 를 붙여서 가격 인덱스 + 정렬로 바뀌지 않게 함)
+    """
+    if item:
+        where, params = substring_filter("items", "item_name", item, FTS_ENABLED and scan_sort is None)
+    else:
+        where, params = "server = ?", (server_display,)
+    price = "+price" if scan_sort == "name" else "price"
+    if min_price is not None:
+        where += f" AND {price} >= ?"
+        params += (min_price,)
+    if max_price is not None:
+        where += f" AND {price} <= ?"
+        params += (max_price,)
+    return where, params
+
+
+def items_version():
+    """노점 데이터 버전 (크롤링 결과 저장마다 1 증가)"""
+    return get_conn().execute("SELECT value FROM market_meta WHERE key = 'items_version'").fetchone()[0]
+
+
+def count_items(item=None, server_display=None, min_price=None, max_price=None):
+    """
+    검색 조건에 맞는 노점 목록 수 (item 이 있으면 이름 검색, 없으면 서버 전체)
+    데이터 버전이 그대로면 이전 결과 재사용
+    """
+    key = (item or "", "" if item else server_display, min_price, max_price)
+    version = items_version()
+    cached = _count_cache.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    where, params = _where(item, server_display, min_price, max_price)
+    count = get_conn().execute(f"SELECT COUNT(*) FROM items WHERE {where}", params).fetchone()[0]
+    with _count_lock:
+        if len(_count_cache) >= COUNT_CACHE_SIZE:
+            _count_cache.clear()
+        _count_cache[key] = (version, count)
+    return count
+
+
+def encode_cursor(row, position, sort="name"):
+    """
+    다음 페이지 커서 (불투명 문자열)
+    row: fetch_items 결과의 마지막 행, position: 다음 페이지 첫 행의 순번 (응답의 id 계산용)
+    """
+    key = [row[_ROW_INDEX[column]] for column in SORT_COLUMNS[sort]] + [row[5]]
+    raw = json.dumps([sort, key, position], ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """커서 → (sort, 정렬 키 tuple, position), 형식이 잘못되면 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort, key, position = json.loads(raw.decode("utf-8"))
+        if sort not in SORT_COLUMNS or len(key) != len(SORT_COLUMNS[sort]) + 1:
+            raise ValueError(sort)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"invalid cursor: {cursor}") from e
+    return sort, tuple(key), int(position)
+
+
+def fetch_items(item=None, server_display=None, limit=10, after=None, offset=0,
+                sort="name", min_price=None, max_price=None):
+    """
+    검색 조건에 맞는 노점 목록 1페이지 (server, item_name, quantity, price, vendor_info, rowid)
+    after: decode_cursor 의 키 → 그 다음 행부터 (keyset), 없으면 offset 사용 (커서 없는 page 요청용)
+    sort: 'name' (이름, 가격순) / 'price' (가격, 이름순)
+    검색어가 있고 일치 건수가 SORT_MATCH_LIMIT 보다 많으면 정렬 인덱스 순서대로 훑음 (페이지 깊이와 무관한 비용)
+    """
+    order_columns = SORT_COLUMNS[sort] + ("rowid",)
+    ordered_scan = bool(item) and count_items(item, server_display, min_price, max_price) > SORT_MATCH_LIMIT
+    where, params = _where(item, server_display, min_price, max_price, sort if ordered_scan else None)
+    if after is not None:
+        where += f" AND ({', '.join(order_columns)}) > ({', '.join('?' * len(order_columns))})"
+        params += tuple(after)
+        offset = 0
+    return get_conn().execute(
+        f"""
+        SELECT server, item_name, quantity, price, vendor_info, rowid FROM items
+        WHERE {where} ORDER BY {', '.join(order_columns)} LIMIT ? OFFSET ?
+        """,
+        params + (limit, offset)
+    ).fetchall()
+
+
+def _save_listings(keyword, server_display, rows, complete):
+    """writer 스레드에서 실행: UPSERT + (전체를 본 경우) 사라진 목록 삭제"""
+    crawled_at = time.time()
+    conn = get_conn()
+    with conn:
+        conn.executemany(f"""
+            INSERT INTO items (server, item_name, quantity, price, vendor_info, crawled_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT ({', '.join(LISTING_KEY)})
+            DO UPDATE SET quantity = excluded.quantity, crawled_at = excluded.crawled_at
+        """, [tuple(row) + (crawled_at,) for row in rows])
+
+        removed = 0
+        if complete:
+            # 이번 검색 범위(같은 서버 + 검색어 포함)에서 이번에 보이지 않은 목록만 삭제
+            where, params = substring_filter("items", "item_name", keyword, FTS_ENABLED)
+            removed = conn.execute(
+                f"DELETE FROM items WHERE {where} AND server = ? AND crawled_at < ?",
+                params + (server_display, crawled_at)
+            ).rowcount
+        conn.execute("UPDATE market_meta SET value = value + 1 WHERE key = 'items_version'")
+    return len(rows), removed
+
+
+def submit_listings(keyword, server_display, rows, complete=True):
+    """
+    크롤링 결과 저장을 writer 스레드에 요청. 반환: Future → (저장 건수, 삭제 건수)
+    rows: [(server, item_name, quantity, price, vendor_info), ...]
+    complete: 검색 결과를 끝까지 봤는지 (False 면 사라진 목록을 판단할 수 없으므로 삭제하지 않음)
+    """
+    return _writer.submit(_save_listings, keyword, server_display, rows, complete)
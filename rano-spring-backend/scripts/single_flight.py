@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+single-flight 작업 실행기 (같은 키의 중복 작업 합치기)
+- 같은 키(예: (server, keyword))로 이미 실행 중인 작업이 있으면 새로 실행하지 않고 그 Future 를 돌려준다
+- 작업은 백그라운드 스레드 풀에서 실행 → 요청 스레드는 기다리거나(result) 바로 응답할 수 있음
+- 작업이 끝나면 키를 비워서 다음 요청은 다시 실행
+
+swr_cache 의 백그라운드 갱신에서 사용 (같은 응답 키의 갱신은 1번만 실행).
+크롤링 자체의 중복 제거는 프로세스 간에도 동작하는 crawl_jobs 작업 큐가 담당한다.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class SingleFlight:
+    """키별로 동시에 1개만 실행되는 백그라운드 작업 실행기"""
+
+    def __init__(self, max_workers=2, thread_name_prefix="single-flight"):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self.lock = threading.Lock()
+        self.in_flight = {}
+
+    def submit(self, key, fn, *args, **kwargs):
+        """
+        키에 해당하는 작업 실행 (이미 실행 중이면 합류)
+        반환: (Future, started) - started 가 False 면 기존 작업에 합류한 것
+        """
+        with self.lock:
+            future = self.in_flight.get(key)
+            if future is not None:
+                return future, False
+            future = self.executor.submit(fn, *args, **kwargs)
+            self.in_flight[key] = future
+        future.add_done_callback(lambda f: self._done(key, f))
+        return future, True
+
+    def _done(self, key, future):
+        with self.lock:
+            if self.in_flight.get(key) is future:
+                del self.in_flight[key]
+
+    def is_running(self, key):
+        with self.lock:
+            return key in self.in_flight
+
+    def running_keys(self):
+        with self.lock:
+            return list(self.in_flight)
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+in-process LRU + TTL 응답 캐시 (stale-while-revalidate)
+- soft TTL 이 지난 항목: 저장된 값을 바로 반환하고 백그라운드에서 다시 계산
+- hard TTL 이 지난 항목: 버리고 요청 스레드에서 다시 계산
+- max_entries 를 넘으면 가장 오래 안 쓴 항목부터 제거 (LRU)
+- 같은 키의 백그라운드 갱신은 SingleFlight 로 1번만 실행
+- 백그라운드 갱신은 refresh_loader (가벼운 경로, 예: DB 조회만) 로 실행해서 느린 작업이 갱신 스레드를 막지 않게 함
+- clear() / invalidate(predicate) 마다 generation 이 올라가고, 그 전에 시작한 계산 결과 중
+  무효화된 키의 결과는 put() 에서 버림 (무효화 후 옛 값이 되살아나지 않음, 다른 키의 계산은 그대로 저장)
+
+Flask 크롤러 서버의 /api/vending 응답(직렬화된 JSON)을 (server, item, page, size, cursor, sort, 가격 필터) 키로 저장한다.
+"""
+import time
+import threading
+from collections import OrderedDict, deque
+
+from single_flight import SingleFlight
+
+MAX_ENTRIES = 1000
+SOFT_TTL_SECONDS = 30
+HARD_TTL_SECONDS = 300
+INVALIDATION_HISTORY = 256  # put() 에서 확인할 최근 무효화 수 (이보다 오래 걸린 계산은 버림)
+
+
+class SWRCache:
+    """LRU + soft/hard TTL 캐시"""
+
+    def __init__(self, max_entries=MAX_ENTRIES, soft_ttl=SOFT_TTL_SECONDS, hard_ttl=HARD_TTL_SECONDS,
+                 refresh_workers=2):
+        self.max_entries = max_entries
+        self.soft_ttl = soft_ttl
+        self.hard_ttl = hard_ttl
+        self.entries = OrderedDict()  # key → (value, stored_at)
+        self.generation = 0  # clear() / invalidate() 할 때마다 증가
+        self.invalidations = deque(maxlen=INVALIDATION_HISTORY)  # (generation, predicate - None 이면 전체)
+        self.lock = threading.Lock()
+        self.refresher = SingleFlight(max_workers=refresh_workers, thread_name_prefix="swr-refresh")
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "evictions": 0, "errors": 0}
+
+    def get(self, key, loader, refresh_loader=None):
+        """
+        캐시 조회 (없거나 hard TTL 초과면 loader() 실행 후 저장)
+        loader 가 예외를 던지면 저장하지 않고 그대로 전달
+        refresh_loader: soft TTL 이 지난 항목의 백그라운드 갱신용 (없으면 loader)
+        """
+        now = time.monotonic()
+        with self.lock:
+            generation = self.generation
+            entry = self.entries.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                age = now - stored_at
+                if age < self.hard_ttl:
+                    self.entries.move_to_end(key)
+                    if age < self.soft_ttl:
+                        self.stats["hits"] += 1
+                        return value
+                    self.stats["stale_hits"] += 1
+                    stale = value
+                else:
+                    del self.entries[key]
+                    entry = None
+            if entry is None:
+                self.stats["misses"] += 1
+
+        if entry is not None:
+            # stale: 바로 반환하고 갱신은 백그라운드에서
+            self.refresher.submit(key, self._refresh, key, refresh_loader or loader, generation)
+            return stale
+
+        value = loader()
+        self.put(key, value, generation)
+        return value
+
+    def _refresh(self, key, loader, generation):
+        try:
+            value = loader()
+        except Exception as e:
+            with self.lock:
+                self.stats["errors"] += 1
+            print(f"[SWRCache] refresh failed for {key}: {e}")
+            return
+        if self.put(key, value, generation):
+            with self.lock:
+                self.stats["refreshes"] += 1
+
+    def put(self, key, value, generation=None):
+        """
+        저장. generation: 계산을 시작할 때의 self.generation (그 사이 이 키가 무효화됐으면 저장하지 않음)
+        반환: 저장했는지
+        """
+        with self.lock:
+            if generation is not None and self._invalidated_since(key, generation):
+                return False
+            self.entries[key] = (value, time.monotonic())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats["evictions"] += 1
+        return True
+
+    def _invalidated_since(self, key, generation):
+        """generation 이후의 무효화가 key 에 해당하는지 (lock 안에서 호출, 기록이 잘렸으면 True)"""
+        if generation == self.generation:
+            return False
+        if not self.invalidations or self.invalidations[0][0] > generation + 1:
+            return True
+        return any(predicate is None or predicate(key)
+                   for invalidated_at, predicate in self.invalidations if invalidated_at > generation)
+
+    def invalidate(self, predicate):
+        """predicate(key) 가 참인 항목만 무효화. 그 키로 진행 중인 계산 결과도 저장되지 않음. 반환: 지운 수"""
+        with self.lock:
+            self.generation += 1
+            self.invalidations.append((self.generation, predicate))
+            keys = [key for key in self.entries if predicate(key)]
+            for key in keys:
+                del self.entries[key]
+        return len(keys)
+
+    def clear(self):
+        """전체 무효화. 진행 중인 계산 결과도 저장되지 않음"""
+        with self.lock:
+            self.generation += 1
+            self.invalidations.append((self.generation, None))
+            self.entries.clear()
+
+    def snapshot(self):
+        """통계 (stats 엔드포인트용)"""
+        with self.lock:
+            stats = dict(self.stats)
+            stats["size"] = len(self.entries)
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((stats["hits"] + stats["stale_hits"]) / lookups, 4) if lookups else 0.0
+        stats["max_entries"] = self.max_entries
+        stats["soft_ttl"] = self.soft_ttl
+        stats["hard_ttl"] = self.hard_ttl
+        return stats
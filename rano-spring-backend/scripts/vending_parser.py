@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+gnjoy 노점 목록(itemDealList.asp) 파서
+- lxml 이 있으면 미리 컴파일한 XPath 로 table.listTypeOfDefault.dealList 의 행만 추출
+- lxml 이 없으면 기존과 동일한 BeautifulSoup(html.parser) 경로로 동작
+- 두 경로 모두 collect_and_upload.parse_vending_page 와 같은 dict 를 반환
+
+검증: scripts/debug/verify_vending_parser.py (저장된 HTML 에 대한 golden-file 비교)
+"""
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+from bs4 import BeautifulSoup
+
+
+def _has_class(name):
+    return f'contains(concat(" ", normalize-space(@class), " "), " {name} ")'
+
+
+if HAS_LXML:
+    # 첫 번째 dealList 테이블의 모든 tr (헤더 포함, 헤더는 호출부에서 건너뜀)
+    _ROWS_XPATH = etree.XPath(
+        f'(//table[{_has_class("listTypeOfDefault")} and {_has_class("dealList")}])[1]//tr'
+    )
+    _TOTAL_XPATH = etree.XPath('//*[@id="searchResult"]//strong')
+
+
+def _text(elem):
+    """BeautifulSoup get_text(strip=True) 와 같은 규칙으로 텍스트 추출"""
+    return ''.join(s.strip() for s in elem.itertext() if s.strip())
+
+
+def _first(elem, tag):
+    return next(elem.iter(tag), None)
+
+
+def _iter_rows_lxml(html_content):
+    """(셀 텍스트 목록, item <a>, item <img>, shop <a>) 튜플을 행 단위로 반환 (lxml)"""
+    if not html_content or not html_content.strip():
+        return
+    doc = lxml_html.fromstring(html_content)
+    rows = _ROWS_XPATH(doc)
+    for row in rows[1:]:
+        cols = list(row.iter('td'))
+        if len(cols) < 5:
+            continue
+        link = _first(cols[1], 'a')
+        img = _first(cols[1], 'img')
+        shop_link = _first(cols[4], 'a')
+        yield (
+            [_text(col) for col in cols],
+            link.get('onclick', '') if link is not None else None,
+            (img.get('alt'), img.get('src')) if img is not None else (None, None),
+            _text(shop_link) if shop_link is not None else None
+        )
+
+
+def _iter_rows_bs4(html_content):
+    """_iter_rows_lxml 과 같은 튜플을 반환하는 BeautifulSoup 경로"""
+    soup = BeautifulSoup(html_content, 'html.parser')
+    table = soup.select_one('table.listTypeOfDefault.dealList')
+    if not table:
+        return
+    for row in table.select('tr')[1:]:
+        cols = row.select('td')
+        if len(cols) < 5:
+            continue
+        link = cols[1].select_one('a')
+        img = cols[1].select_one('img')
+        shop_link = cols[4].select_one('a')
+        yield (
+            [col.get_text(strip=True) for col in cols],
+            link.get('onclick', '') if link else None,
+            (img.get('alt'), img.get('src')) if img else (None, None),
+            shop_link.get_text(strip=True) if shop_link else None
+        )
+
+
+def iter_deal_rows(html_content, use_lxml=None):
+    """행 단위 원시 데이터 반환. use_lxml=None 이면 lxml 설치 여부로 자동 선택"""
+    if use_lxml is None:
+        use_lxml = HAS_LXML
+    if use_lxml:
+        return _iter_rows_lxml(html_content)
+    return _iter_rows_bs4(html_content)
+
+
+def parse_int(text, default=0):
+    """'1,000,000z' / '10' 같은 표시용 숫자 → int (숫자가 아니면 default)"""
+    digits = str(text).replace(',', '').replace('z', '').strip()
+    return int(digits) if digits.isdigit() else default
+
+
+def item_id_from_src(src):
+    """아이템 이미지 src ('.../object/201306/401058.png') 의 파일명 숫자 → item_id (없으면 None)"""
+    if not src:
+        return None
+    stem = src.rsplit('/', 1)[-1].split('.', 1)[0]
+    return int(stem) if stem.isdigit() else None
+
+
+def parse_vending_page(html_content, server, use_lxml=None):
+    """공홈 HTML에서 노점 데이터 파싱"""
+    items = []
+
+    for texts, onclick, (img_alt, img_src), shop_text in iter_deal_rows(html_content, use_lxml):
+        try:
+            if onclick is None:
+                continue
+
+            ssi = ""
+            map_id = ""
+            if 'popup_info' in onclick:
+                parts = onclick.split("'")
+                if len(parts) >= 4:
+                    ssi = parts[1]
+                    map_id = parts[3]
+
+            item_name = img_alt if img_alt else texts[1]
+
+            quantity = parse_int(texts[2], 1)
+            price = parse_int(texts[3], 0)
+
+            vendor_info = shop_text if shop_text is not None else ""
+
+            items.append({
+                "item_name": item_name,
+                "item_id": item_id_from_src(img_src),
+                "price": price,
+                "quantity": quantity,
+                "vendor_info": vendor_info,
+                "vendor_name": "",
+                "ssi": ssi,
+                "map_id": map_id,
+                "server_name": server
+            })
+
+        except Exception as e:
+            print(f"[Parser] Error: {e}")
+            continue
+
+    return items
+
+
+def parse_deal_row_texts(html_content, use_lxml=None):
+    """Flask 크롤러용: 각 행의 (서버, 아이템, 수량, 가격, 상점명) 텍스트 튜플 목록"""
+    return [tuple(texts[:5]) for texts, _, _, _ in iter_deal_rows(html_content, use_lxml)]
+
+
+def parse_total(html_content, use_lxml=None):
+    """#searchResult strong 의 '검색결과 : N건' 에서 N 추출 (없으면 0)"""
+    if use_lxml is None:
+        use_lxml = HAS_LXML
+    if use_lxml:
+        if not html_content or not html_content.strip():
+            return 0
+        found = _TOTAL_XPATH(lxml_html.fromstring(html_content))
+        text = _text(found[0]) if found else ''
+    else:
+        elem = BeautifulSoup(html_content, 'html.parser').select_one('#searchResult strong')
+        text = elem.get_text() if elem else ''
+    digits = ''.join(c for c in text if c.isdigit())
+    return int(digits) if digits else 0
@@ -1,7 +1,12 @@
 # -*- coding: utf-8 -*-
 import sqlite3
+from market_db import fts_table, substring_filter
 
-conn = sqlite3.connect(r'e:\RAG\rano-spring-backend\ro_market.db')
+DB_PATH = r'e:\RAG\rano-spring-backend\ro_market.db'
+DB_URI = 'file:' + DB_PATH.replace('\\', '/') + '?mode=ro'
+
+# 확인만 하는 스크립트이므로 읽기 전용으로 열기 (FTS 인덱스 등을 만들지 않음)
+conn = sqlite3.connect(DB_URI, uri=True)
 cursor = conn.cursor()
 
 # 총 아이템 수
@@ -9,9 +14,15 @@ cursor.execute('SELECT COUNT(*) FROM items')
 total = cursor.fetchone()[0]
 print(f'총 아이템 수: {total:,}')
 
+# name_kr FTS 인덱스 (load_items_from_lua 가 생성)
+fts = fts_table('items', 'name_kr')
+has_fts = cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts,)).fetchone() is not None
+print(f'FTS 인덱스 {fts}: {"있음" if has_fts else "없음 (LIKE 검색으로 확인, load_items_from_lua 실행 시 생성)"}')
+
 # 천공 검색
 print('\n=== 천공 검색 결과 ===')
-cursor.execute('SELECT id, name_kr FROM items WHERE name_kr LIKE ? ORDER BY id', ('%천공%',))
+where, params = substring_filter('items', 'name_kr', '천공', has_fts)
+cursor.execute(f'SELECT id, name_kr FROM items WHERE {where} ORDER BY id', params)
 results = cursor.fetchall()
 print(f'검색 결과: {len(results)}개')
 for row in results:
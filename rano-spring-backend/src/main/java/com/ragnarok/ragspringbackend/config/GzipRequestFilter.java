@@ -0,0 +1,125 @@
+package com.ragnarok.ragspringbackend.config;
+
+import jakarta.servlet.FilterChain;
+import jakarta.servlet.ReadListener;
+import jakarta.servlet.ServletException;
+import jakarta.servlet.ServletInputStream;
+import jakarta.servlet.http.HttpServletRequest;
+import jakarta.servlet.http.HttpServletRequestWrapper;
+import jakarta.servlet.http.HttpServletResponse;
+import org.springframework.stereotype.Component;
+import org.springframework.web.filter.OncePerRequestFilter;
+
+import java.io.BufferedReader;
+import java.io.IOException;
+import java.io.InputStreamReader;
+import java.nio.charset.StandardCharsets;
+import java.util.Collections;
+import java.util.Enumeration;
+import java.util.zip.GZIPInputStream;
+
+/**
+ * gzip 압축 요청 본문 해제 필터
+ * - collector 의 chunk 업로드 (/api/vending/upload/**) 에만 적용
+ * - Content-Encoding: gzip 이면 본문을 풀어서 컨트롤러에는 일반 JSON 으로 전달
+ */
+@Component
+public class GzipRequestFilter extends OncePerRequestFilter {
+
+    private static final String UPLOAD_PATH_PREFIX = "/api/vending/upload";
+
+    @Override
+    protected boolean shouldNotFilter(HttpServletRequest request) {
+        return !request.getRequestURI().startsWith(UPLOAD_PATH_PREFIX);
+    }
+
+    @Override
+    protected void doFilterInternal(HttpServletRequest request, HttpServletResponse response, FilterChain chain)
+            throws ServletException, IOException {
+        String encoding = request.getHeader("Content-Encoding");
+        if (encoding == null || !encoding.toLowerCase().contains("gzip")) {
+            chain.doFilter(request, response);
+            return;
+        }
+        chain.doFilter(new GzipRequestWrapper(request), response);
+    }
+
+    /**
+     * 본문을 GZIPInputStream 으로 감싼 요청 래퍼
+     */
+    private static class GzipRequestWrapper extends HttpServletRequestWrapper {
+
+        private final GZIPInputStream gzipStream;
+
+        GzipRequestWrapper(HttpServletRequest request) throws IOException {
+            super(request);
+            this.gzipStream = new GZIPInputStream(request.getInputStream());
+        }
+
+        @Override
+        public ServletInputStream getInputStream() {
+            return new ServletInputStream() {
+                @Override
+                public int read() throws IOException {
+                    return gzipStream.read();
+                }
+
+                @Override
+                public int read(byte[] b, int off, int len) throws IOException {
+                    return gzipStream.read(b, off, len);
+                }
+
+                @Override
+                public boolean isFinished() {
+                    try {
+                        return gzipStream.available() == 0;
+                    } catch (IOException e) {
+                        return true;
+                    }
+                }
+
+                @Override
+                public boolean isReady() {
+                    return true;
+                }
+
+                @Override
+                public void setReadListener(ReadListener readListener) {
+                    throw new UnsupportedOperationException();
+                }
+            };
+        }
+
+        @Override
+        public BufferedReader getReader() {
+            return new BufferedReader(new InputStreamReader(gzipStream, StandardCharsets.UTF_8));
+        }
+
+        // 압축 해제 후 길이는 알 수 없으므로 -1
+        @Override
+        public int getContentLength() {
+            return -1;
+        }
+
+        @Override
+        public long getContentLengthLong() {
+            return -1L;
+        }
+
+        @Override
+        public String getHeader(String name) {
+            if ("Content-Encoding".equalsIgnoreCase(name) || "Content-Length".equalsIgnoreCase(name)) {
+                return null;
+            }
+            return super.getHeader(name);
+        }
+
+        @Override
+        public Enumeration<String> getHeaders(String name) {
+            if ("Content-Encoding".equalsIgnoreCase(name) || "Content-Length".equalsIgnoreCase(name)) {
+                return Collections.emptyEnumeration();
+            }
+            return super.getHeaders(name);
+        }
+    }
+}
@@ -188,6 +188,62 @@ public class VendingController {
         }
     }
 
+    // ========== 외부 delta 업로드 API (GitHub Actions 전용, 변경분만) ==========
+    @PostMapping("/vending/upload/delta")
+    public ResponseEntity<Map<String, Object>> uploadVendingDelta(
+            @RequestHeader(value = "X-API-KEY", required = false) String apiKey,
+            @RequestParam String server,
+            @RequestBody DeltaUploadRequest request) {
+        
+        // 1. API 키 검증 (upload 와 동일한 키 사용)
+        String expectedKey = System.getenv("VENDING_UPLOAD_KEY");
+        if (expectedKey == null || expectedKey.isEmpty()) {
+            System.out.println("[VendingUpload] DISABLED: missing VENDING_UPLOAD_KEY env var");
+            return ResponseEntity.status(HttpStatus.SERVICE_UNAVAILABLE)
+                .body(Map.of("error", "upload disabled: missing VENDING_UPLOAD_KEY"));
+        }
+        
+        if (apiKey == null || !apiKey.equals(expectedKey)) {
+            return ResponseEntity.status(HttpStatus.UNAUTHORIZED)
+                .body(Map.of("error", "Invalid API key"));
+        }
+        
+        // 2. 서버 허용 목록 검증
+        if (server == null || !ALLOWED_SERVERS.contains(server.toLowerCase())) {
+            return ResponseEntity.status(HttpStatus.BAD_REQUEST)
+                .body(Map.of("error", "Invalid server. Allowed: baphomet, yggdrasil, ifrit"));
+        }
+        
+        // 3. 아이템 개수 제한 (upserts + removals 합계)
+        List<VendingItemDto> upserts = request.getUpserts() != null ? request.getUpserts() : List.of();
+        List<VendingItemDto> removals = request.getRemovals() != null ? request.getRemovals() : List.of();
+        
+        if (upserts.isEmpty() && removals.isEmpty()) {
+            return ResponseEntity.status(HttpStatus.BAD_REQUEST)
+                .body(Map.of("error", "No changes provided"));
+        }
+        
+        if (upserts.size() + removals.size() > MAX_UPLOAD_ITEMS) {
+            return ResponseEntity.status(HttpStatus.PAYLOAD_TOO_LARGE)
+                .body(Map.of("error", "Too many items. Max: " + MAX_UPLOAD_ITEMS));
+        }
+        
+        try {
+            int[] counts = vendingCollectorService.uploadDelta(server.toLowerCase(), upserts, removals);
+            return ResponseEntity.ok(Map.of(
+                "status", "completed",
+                "server", server.toLowerCase(),
+                "receivedCount", upserts.size() + removals.size(),
+                "savedCount", counts[0],
+                "removedCount", counts[1]
+            ));
+        } catch (Exception e) {
+            e.printStackTrace();
+            return ResponseEntity.status(HttpStatus.INTERNAL_SERVER_ERROR)
+                .body(Map.of("error", e.getMessage()));
+        }
+    }
+
     // ========== Cache Warmup (관리용) ==========
     @PostMapping("/vending/warmup")
     public ResponseEntity<?> warmupCache(
@@ -271,6 +327,16 @@ public class VendingController {
         ));
     }
     
+    // Delta 업로드 요청 DTO
+    public static class DeltaUploadRequest {
+        private List<VendingItemDto> upserts;
+        private List<VendingItemDto> removals;
+        public List<VendingItemDto> getUpserts() { return upserts; }
+        public void setUpserts(List<VendingItemDto> upserts) { this.upserts = upserts; }
+        public List<VendingItemDto> getRemovals() { return removals; }
+        public void setRemovals(List<VendingItemDto> removals) { this.removals = removals; }
+    }
+    
     // Warmup 요청 DTO
     public static class WarmupRequest {
         private List<WarmupTarget> targets;
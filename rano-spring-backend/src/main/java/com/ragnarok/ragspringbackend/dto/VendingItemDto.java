@@ -20,6 +20,7 @@ public class VendingItemDto {
     private List<String> cards_equipped = new ArrayList<>(); // Cards and enchants
     private String item_icon_url; // DB-provided item icon URL (DivinePrice based on item_id)
     private String shop_type; // "sell" or "buy"
+    private Integer item_id; // Collector-resolved item ID (image src or name index), null if unknown
 
     // Constructors
     public VendingItemDto() {
@@ -176,4 +177,12 @@ public class VendingItemDto {
     public void setShop_type(String shop_type) {
         this.shop_type = shop_type;
     }
+
+    public Integer getItem_id() {
+        return item_id;
+    }
+
+    public void setItem_id(Integer item_id) {
+        this.item_id = item_id;
+    }
 }
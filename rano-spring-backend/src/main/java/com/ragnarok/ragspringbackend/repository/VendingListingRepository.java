@@ -72,6 +72,17 @@ public interface VendingListingRepository extends JpaRepository<VendingListing,
         String server, String mapId, String ssi, String itemName, Long price
     );
 
+    // 7b. Delta 업로드의 사라진 목록 삭제 (uq_vending_listing 키 기준)
+    @Modifying
+    @Query("DELETE FROM VendingListing v WHERE v.server = :server AND v.mapId = :mapId AND v.ssi = :ssi AND v.itemName = :itemName AND v.price = :price")
+    int deleteByListingKey(
+        @Param("server") String server,
+        @Param("mapId") String mapId,
+        @Param("ssi") String ssi,
+        @Param("itemName") String itemName,
+        @Param("price") Long price
+    );
+
     // 8. 오래된 데이터 삭제 (정리용)
     @Modifying
     @Query("DELETE FROM VendingListing v WHERE v.scrapedAt < :cutoff")
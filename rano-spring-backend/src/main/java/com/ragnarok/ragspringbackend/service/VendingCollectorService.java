@@ -171,6 +171,34 @@ public class VendingCollectorService {
         return saved;
     }
 
+    /**
+     * 외부 업로드 API용 delta 저장 (collector 가 변경분만 전송)
+     * @param server 서버명
+     * @param upserts 신규/가격 변경/수량 변경 목록
+     * @param removals 사라진 목록 (map_id, ssi, item_name, price 만 사용)
+     * @return {저장된 레코드 수, 삭제된 레코드 수}
+     */
+    @Transactional
+    public int[] uploadDelta(String server, List<VendingItemDto> upserts, List<VendingItemDto> removals) {
+        int removed = 0;
+        for (VendingItemDto dto : removals) {
+            if (dto.getMap_id() == null || dto.getSsi() == null) {
+                continue;
+            }
+            removed += listingRepository.deleteByListingKey(
+                server, dto.getMap_id(), dto.getSsi(), dto.getItem_name(), dto.getPrice()
+            );
+        }
+
+        int saved = 0;
+        for (VendingItemDto dto : upserts) {
+            saved += upsertListing(server, dto, 0, false);
+        }
+        System.out.println("[VendingUpload] DELTA server=" + server + " upserts=" + upserts.size()
+            + " removals=" + removals.size() + " saved=" + saved + " removed=" + removed);
+        return new int[] { saved, removed };
+    }
+
     /**
      * DB upsert (기존 레코드 업데이트 or 신규 삽입)
      */
@@ -200,6 +228,9 @@ public class VendingCollectorService {
             listing.setPrice(dto.getPrice());
             listing.setAmount(dto.getQuantity());
             listing.setScrapedAt(LocalDateTime.now());
+            if (dto.getItem_id() != null) {
+                listing.setItemId(dto.getItem_id());
+            }
             if (debugLog) {
                 System.out.println("[VendingCollector] ACTION: UPDATE existing row");
             }
@@ -221,8 +252,11 @@ public class VendingCollectorService {
             listing.setSellerName(dto.getVendor_name());
             listing.setSourcePage(page);
             
-            // Item ID 매칭
-            Integer itemId = itemCacheService.getIdByName(normalizedName);
+            // Item ID 매칭 (collector 가 보낸 item_id 우선, 없을 때만 이름 매칭)
+            Integer itemId = dto.getItem_id();
+            if (itemId == null) {
+                itemId = itemCacheService.getIdByName(normalizedName);
+            }
             if (itemId == null) {
                 itemId = itemCacheService.getIdByPrefix(normalizedName);
             }